@@ -0,0 +1,97 @@
+# File: benchmarks/__main__.py
+"""Run the benchmark suite on a generated corpus and emit JSON results.
+
+Run with `python -m benchmarks [--scenario rules scan fix] [--files 200] [--output results.json]
+[--compare baseline.json]`. The same options always produce the same corpus, so result files from
+different commits can be compared directly.
+"""
+import os # Import os for CPU information.
+import sys # Import sys to write the summary to stderr.
+import json # Import json for results.
+import argparse # Import argparse for command-line options.
+import platform # Import platform to record the environment.
+import tempfile # Import tempfile for the corpus directory.
+from .corpus import generate_corpus # Import the corpus generator.
+from .suite import SCENARIOS, read_corpus, bench_rules, bench_scan, bench_fix # Import the scenarios.
+
+RESULTS_VERSION = 1 # Format version of the JSON results.
+
+def _parser() -> argparse.ArgumentParser: # Command-line options.
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), help="Scenarios to run.")
+    corpus = parser.add_argument_group("corpus")
+    corpus.add_argument("--files", type=int, default=200, help="Number of prompt files.")
+    corpus.add_argument("--median-bytes", type=int, default=4000, help="Median file size.")
+    corpus.add_argument("--size-sigma", type=float, default=1.0, help="Log-normal spread of file sizes (0: all files the median size).")
+    corpus.add_argument("--max-bytes", type=int, default=1_000_000, help="Largest file size.")
+    corpus.add_argument("--pii-per-kb", type=float, default=0.5, help="Average PII values per KB.")
+    corpus.add_argument("--missing-section-rate", type=float, default=0.3, help="Probability that each required section is left out.")
+    corpus.add_argument("--duplicate-rate", type=float, default=0.05, help="Fraction of sentences that repeat an earlier one.")
+    corpus.add_argument("--seed", type=int, default=0, help="Corpus seed.")
+    corpus.add_argument("--corpus-dir", help="Write the corpus here and keep it (default: a temporary directory).")
+    run = parser.add_argument_group("run")
+    run.add_argument("--repeat", type=int, default=3, help="Timed runs per in-memory measurement (best is kept).")
+    run.add_argument("--latency", type=float, default=0.05, help="Seconds per fake LLM request.")
+    run.add_argument("--concurrency", type=int, default=8, help="Files in flight in LLM scans.")
+    run.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4), help="Processes in the parallel local scan.")
+    run.add_argument("--batch-size", type=int, default=8, help="Prompts per request in the batched LLM scan.")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Print the speed change against an earlier results file.")
+    return parser
+
+def _config(args) -> dict: # Options that affect results, recorded so runs can be matched up.
+    return {name: value for name, value in vars(args).items() if name not in ("output", "compare", "corpus_dir")}
+
+def _summary(results, baseline=None) -> str: # Human-readable table.
+    previous = {(row["scenario"], row["name"]): row for row in (baseline or {}).get("results", [])}
+    lines = [f"{'scenario':<8} {'name':<28} {'seconds':>10} {'files/s':>10} {'MB/s':>9}" + ("  change" if baseline else "")]
+    for row in results:
+        line = f"{row['scenario']:<8} {row['name']:<28} {row['seconds']:>10.4f} {row['files_per_s'] or 0:>10.1f} {row['mb_per_s'] or 0:>9.2f}"
+        old = previous.get((row["scenario"], row["name"]))
+        if old and old["seconds"] and row["seconds"]: # Positive means faster than the baseline.
+            line += f"  {old['seconds'] / row['seconds'] - 1:+.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main(argv=None) -> None:
+    args = _parser().parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("files") != args.files or baseline.get("config", {}).get("seed") != args.seed:
+            print("warning: baseline was produced with a different corpus", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix="prompt-validator-bench-") as scratch:
+        directory = args.corpus_dir or scratch
+        corpus = generate_corpus(directory, files=args.files, median_bytes=args.median_bytes, size_sigma=args.size_sigma,
+                                 max_bytes=args.max_bytes, pii_per_kb=args.pii_per_kb,
+                                 missing_section_rate=args.missing_section_rate,
+                                 duplicate_rate=args.duplicate_rate, seed=args.seed)
+        contents = read_corpus(corpus["paths"])
+        results = []
+        if "rules" in args.scenario:
+            results += bench_rules(contents, repeat=args.repeat)
+        if "scan" in args.scenario:
+            results += bench_scan(directory, corpus["bytes"], latency=args.latency, concurrency=args.concurrency,
+                                  workers=args.workers, batch_size=args.batch_size)
+        if "fix" in args.scenario:
+            results += bench_fix(contents, repeat=args.repeat)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "config": _config(args),
+        "corpus": {"files": corpus["files"], "bytes": corpus["bytes"]},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    print(_summary(results, baseline), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# File: benchmarks/bench_fix_engine.py
+"""Benchmark: sequential per-issue fixes vs. the single-pass offset-based fix engine.
+
+Run with `python -m benchmarks.bench_fix_engine [--size-mb 2] [--findings 1000 5000] [--repeat 3]`.
+"""
+import time # Import time for timing.
+import random # Import random for deterministic text generation.
+import argparse # Import argparse for command-line options.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+
+WORDS = "the model should answer every question clearly and cite each source it uses when asked".split() # Filler vocabulary.
+
+def legacy_fix(content, issues): # The previous fix_file: one full-string rewrite per issue.
+    for issue in issues:
+        details = issue["details"]
+        if issue["type"] == "PII_CHECK":
+            content = content.replace(details["value"], f"[REDACTED_{details['pii_type']}]")
+        else:
+            content = content.strip() + f"\n\n## {details['missing_section']}:\n- [Add details here]\n"
+    return content
+
+def generate(size_bytes, findings, seed=0): # Build a prompt of roughly size_bytes with distinct PII values spread evenly.
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < size_bytes:
+        line = " ".join(rng.choice(WORDS) for _ in range(10)) + "."
+        lines.append(line)
+        size += len(line) + 1
+    for i in range(findings): # Every finding has a unique value, so a global replace cannot fix several at once.
+        index = i * len(lines) // findings
+        lines[index] += f" Mail user{i}@example.com." if i % 2 else f" Key sk_{i:020d}abcd."
+    return "\n".join(lines)
+
+def best_time(function, repeat): # Best-of-n wall time in seconds.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=2.0, help="Size of each generated prompt in MB.")
+    parser.add_argument("--findings", type=int, nargs="+", default=[1000, 5000], help="PII findings per prompt.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement (best is kept).")
+    args = parser.parse_args()
+
+    validator = PromptValidator(rule_ids=["PII_CHECK", "COMPLETENESS_CHECK"])
+    print(f"{'findings':>9} {'issues':>7} {'before s':>10} {'after s':>10} {'speedup':>8}")
+    for findings in args.findings:
+        content = generate(int(args.size_mb * 1_000_000), findings)
+        issues = [issue for rule in validator.rules for issue in rule.validate(content)]
+        fixed = validator.fix_content(content, issues)
+        assert fixed == legacy_fix(content, issues), "single-pass output differs from sequential fixes"
+        old = best_time(lambda: legacy_fix(content, issues), args.repeat)
+        new = best_time(lambda: validator.fix_content(content, issues), args.repeat)
+        print(f"{findings:>9} {len(issues):>7} {old:>10.3f} {new:>10.3f} {old / new:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# File: benchmarks/bench_scanners.py
+"""Micro-benchmark: per-pattern regex scans vs. the single-pass compiled scanners.
+
+Run with `python -m benchmarks.bench_scanners [--size-mb 4] [--repeat 3]`.
+"""
+import re # Import re for the legacy implementations.
+import time # Import time for timing.
+import random # Import random for deterministic text generation.
+import argparse # Import argparse for command-line options.
+from prompt_validator.rules.pii import PIIRule # Import the PII rule.
+from prompt_validator.rules.completeness import CompletenessRule # Import the completeness rule.
+
+WORDS = "the model should answer every question clearly and cite each source it uses when asked".split() # Filler vocabulary.
+
+def legacy_pii(content): # The previous PIIRule.validate: one uncompiled finditer per pattern.
+    return [match.group(0) for pattern in PIIRule.PII_PATTERNS.values() for match in re.finditer(pattern, content)]
+
+def legacy_completeness(content): # The previous CompletenessRule.validate: one search per section.
+    return [section for section in CompletenessRule.REQUIRED_SECTIONS
+            if not re.search(fr"^\s*#+\s*{re.escape(section)}(\s*:|\s*$)", content, re.IGNORECASE | re.MULTILINE)]
+
+def generate(size_bytes, pii_per_mb, seed=0): # Build a prompt of roughly size_bytes with sparse PII.
+    rng = random.Random(seed)
+    lines = ["## Task:"]
+    size = 0
+    pii_every = max(1, int(1_000_000 / 60 / max(pii_per_mb, 1))) # Lines between PII hits (about 60 bytes per line).
+    while size < size_bytes:
+        line = " ".join(rng.choice(WORDS) for _ in range(10)) + "."
+        if pii_per_mb and len(lines) % pii_every == 0:
+            line += rng.choice([" Mail ann@example.com.", " Call 555-867-5309.", " Key sk_0123456789abcdefghijKLMN."])
+        lines.append(line)
+        size += len(line) + 1
+    lines.append("## Examples:\n- one")
+    return "\n".join(lines)
+
+def throughput(function, content, repeat): # Best-of-n throughput in MB/s.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(content)
+        best = min(best, time.perf_counter() - start)
+    return len(content) / 1_000_000 / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Size of each generated prompt in MB.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement (best is kept).")
+    args = parser.parse_args()
+
+    pii, completeness = PIIRule(), CompletenessRule()
+    scenarios = [ # (name, content)
+        ("clean text", generate(int(args.size_mb * 1_000_000), pii_per_mb=0)),
+        ("sparse PII", generate(int(args.size_mb * 1_000_000), pii_per_mb=50)),
+        ("dense PII", generate(int(args.size_mb * 1_000_000), pii_per_mb=5000)),
+    ]
+    print(f"{'scenario':<12} {'check':<13} {'before MB/s':>12} {'after MB/s':>12} {'speedup':>8}")
+    for name, content in scenarios:
+        for check, before, after in (("pii", legacy_pii, pii.validate), ("completeness", legacy_completeness, completeness.validate)):
+            old, new = throughput(before, content, args.repeat), throughput(after, content, args.repeat)
+            print(f"{name:<12} {check:<13} {old:>12.1f} {new:>12.1f} {new / old:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
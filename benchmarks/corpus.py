@@ -0,0 +1,80 @@
+# File: benchmarks/corpus.py
+"""Deterministic synthetic prompt corpus: the same arguments always produce byte-identical files."""
+import os # Import os to create the corpus tree.
+import math # Import math for the size distribution.
+import random # Import random for seeded generation.
+from typing import List, Dict # Import typing hints.
+from prompt_validator.rules.completeness import CompletenessRule # Import the required section names.
+
+WORDS = ( # Common words shaped like prompt instructions, most frequent first.
+    "the model should answer every question clearly and cite each source it uses when asked about "
+    "policy pricing refunds shipping customers orders summary tone format bullet list steps example "
+    "detailed concise friendly formal reply include avoid never always review check verify context"
+).split()
+_vocabulary_rng = random.Random("vocabulary") # Fixed, so the vocabulary never depends on the corpus seed.
+VOCABULARY = WORDS + ["".join(_vocabulary_rng.choice("abcdefghiklmnoprstuvw") for _ in range(_vocabulary_rng.randint(4, 10)))
+                      for _ in range(2000)] # Rarer domain terms after the common words.
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)] # Zipf-like word frequencies, as in natural text.
+
+def _sentence(rng: random.Random) -> str: # One filler instruction.
+    words = rng.choices(VOCABULARY, WEIGHTS, k=rng.randint(6, 14))
+    return " ".join(words).capitalize() + "."
+
+def _pii(rng: random.Random, index: int) -> str: # A distinct PII value, so every finding is unique.
+    kind = rng.randrange(3)
+    if kind == 0:
+        return f"user{index}@example.com"
+    if kind == 1:
+        return f"555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}"
+    return f"sk_{index:08d}{rng.getrandbits(64):016x}"
+
+def generate_prompt(rng: random.Random, size_bytes: int, pii_per_kb: float = 0.5,
+                    missing_section_rate: float = 0.3, duplicate_rate: float = 0.05) -> str: # One prompt.
+    """Build a prompt of about `size_bytes` split across the required sections.
+
+    Each section is left out with probability `missing_section_rate`; PII values are sprinkled in at
+    `pii_per_kb` on average, and `duplicate_rate` of the sentences repeat an earlier one with a small change.
+    """
+    sections = [section for section in CompletenessRule.REQUIRED_SECTIONS if rng.random() >= missing_section_rate]
+    sections = sections or ["Notes"] # Always keep at least one header.
+    lines, pii_index, written = [], 0, []
+    per_section = max(size_bytes // len(sections), 1)
+    for section in sections:
+        lines.append(f"## {section}:")
+        section_size = 0
+        while section_size < per_section:
+            if written and rng.random() < duplicate_rate: # Near-duplicate of an earlier instruction.
+                line = rng.choice(written).rstrip(".") + " again."
+            else:
+                line = _sentence(rng)
+                written.append(line)
+            expected = pii_per_kb * (len(line) + 1) / 1000 # Expected PII values on this line.
+            while expected > 0 and rng.random() < expected:
+                line += f" Contact {_pii(rng, pii_index)} for details."
+                pii_index += 1
+                expected -= 1
+            lines.append(line)
+            section_size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+def sample_sizes(rng: random.Random, files: int, median_bytes: int, size_sigma: float,
+                 max_bytes: int) -> List[int]: # Log-normal file sizes (size_sigma=0 gives fixed sizes).
+    return [min(max(int(median_bytes * math.exp(rng.gauss(0, size_sigma))), 200), max_bytes) for _ in range(files)]
+
+def generate_corpus(directory: str, files: int = 200, median_bytes: int = 4000, size_sigma: float = 1.0,
+                    max_bytes: int = 1_000_000, pii_per_kb: float = 0.5, missing_section_rate: float = 0.3,
+                    duplicate_rate: float = 0.05, files_per_directory: int = 50, seed: int = 0) -> Dict:
+    """Write the corpus under `directory` (nested every `files_per_directory` files) and describe it."""
+    rng = random.Random(seed)
+    sizes = sample_sizes(rng, files, median_bytes, size_sigma, max_bytes)
+    paths, total_bytes = [], 0
+    for index, size in enumerate(sizes):
+        subdirectory = os.path.join(directory, f"group{index // files_per_directory:03d}")
+        os.makedirs(subdirectory, exist_ok=True)
+        content = generate_prompt(random.Random(f"{seed}:{index}"), size, pii_per_kb, missing_section_rate, duplicate_rate)
+        path = os.path.join(subdirectory, f"prompt{index:05d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        paths.append(path)
+        total_bytes += len(content.encode("utf-8"))
+    return {"directory": directory, "paths": paths, "files": files, "bytes": total_bytes, "seed": seed}
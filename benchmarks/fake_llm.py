@@ -0,0 +1,63 @@
+# File: benchmarks/fake_llm.py
+"""OpenAI-shaped stub with configurable latency and errors, shared by the benchmarks and the tests."""
+import time # Import time for blocking latency.
+import random # Import random for seeded latency jitter.
+import asyncio # Import asyncio for non-blocking latency.
+import json # Import json to answer batched requests.
+from types import SimpleNamespace # Import SimpleNamespace to mimic OpenAI response objects.
+from prompt_validator.llm_client import LLMClient, AsyncLLMClient # Import the real LLM clients.
+from prompt_validator.rules import ALL_RULES # Import the rule registry.
+
+class FakeRateLimitError(Exception): # Mimics an HTTP 429 from the API.
+    status_code = 429
+
+def empty_verdicts(system: str, user: str) -> str: # Default reply: no findings, per prompt or per batch.
+    if '{"results"' not in system: # A per-prompt request.
+        return "None"
+    empty = {Rule.rule_id: [] for Rule in ALL_RULES if Rule.requires_llm}
+    return json.dumps({"results": [dict(empty, id=item["id"]) for item in json.loads(user)]})
+
+class FakeLLM: # Exposes `chat.completions.create` like the OpenAI SDK.
+    def __init__(self, responder=None, latency: float = 0.0, jitter: float = 0.0, rate_limit_every: int = 0,
+                 rate_limit_first: int = 0, is_async: bool = True, seed: int = 0): # Initialize the stub.
+        self.responder = responder or empty_verdicts # Maps (system, user) to the reply text.
+        self.latency = latency # Mean seconds per request.
+        self.jitter = jitter # Latency varies uniformly by up to this many seconds either way.
+        self.rate_limit_every = rate_limit_every # Fail every n-th request with a 429 (0 disables).
+        self.rate_limit_first = rate_limit_first # Fail the first n requests with a 429.
+        self.rng = random.Random(seed) # Seeded so runs are comparable.
+        self.calls = 0 # Total requests received, including failed ones.
+        self.in_flight = 0 # Requests currently being served.
+        self.max_in_flight = 0 # Peak observed concurrency.
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_async if is_async else self._create))
+
+    def _delay(self) -> float: # Latency of the next request.
+        return max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0.0) if self.jitter else self.latency
+
+    def _reply(self, messages): # Build the response object or raise an injected error.
+        if self.calls <= self.rate_limit_first or (self.rate_limit_every and self.calls % self.rate_limit_every == 0):
+            raise FakeRateLimitError("rate limited")
+        text = self.responder(messages[0]["content"], messages[1]["content"])
+        usage = SimpleNamespace(prompt_tokens=sum(len(message["content"]) for message in messages) // 4,
+                                completion_tokens=len(text) // 4) # Rough token counts, four characters per token.
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=usage)
+
+    def _create(self, model, messages, temperature, **kwargs): # Blocking chat completion.
+        self.calls += 1
+        time.sleep(self._delay())
+        return self._reply(messages)
+
+    async def _create_async(self, model, messages, temperature, **kwargs): # Non-blocking chat completion.
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay())
+            return self._reply(messages)
+        finally:
+            self.in_flight -= 1
+
+def fake_clients(latency: float = 0.05, jitter: float = 0.0, seed: int = 0): # Real clients backed by the stub.
+    """Return (LLMClient, AsyncLLMClient) that never touch the network."""
+    return (LLMClient(client=FakeLLM(latency=latency, jitter=jitter, is_async=False, seed=seed)),
+            AsyncLLMClient(client=FakeLLM(latency=latency, jitter=jitter, seed=seed)))
@@ -0,0 +1,132 @@
+# File: benchmarks/suite.py
+"""Benchmark scenarios. Each returns a list of result dicts with a stable shape, so runs can be diffed."""
+import io # Import io to discard report output.
+import time # Import time for timing.
+import asyncio # Import asyncio to drive the async engine.
+from typing import List, Dict, Callable # Import typing hints.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+from prompt_validator.reporter import StreamingReporter # Import the incremental reporter.
+from prompt_validator.discovery import iter_prompt_files # Import file discovery.
+from prompt_validator.rules import LOCAL_RULES # Import the rules that run without an LLM.
+from prompt_validator.rules.semantic import RedundancyRule # Import the rule with a local pre-filter.
+from .fake_llm import fake_clients # Import the latency-configurable fake LLM.
+
+def best_time(function: Callable[[], object], repeat: int) -> float: # Best-of-n wall time in seconds.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def result(scenario: str, name: str, seconds: float, files: int, total_bytes: int, **extra) -> Dict: # One result row.
+    return dict({
+        "scenario": scenario,
+        "name": name,
+        "seconds": round(seconds, 6),
+        "files": files,
+        "bytes": total_bytes,
+        "files_per_s": round(files / seconds, 2) if seconds else None,
+        "mb_per_s": round(total_bytes / 1_000_000 / seconds, 3) if seconds else None,
+    }, **extra)
+
+def read_corpus(paths: List[str]) -> List[str]: # Load every prompt up front so rule timings exclude I/O.
+    contents = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            contents.append(f.read())
+    return contents
+
+def bench_rules(contents: List[str], repeat: int = 3, similarity_threshold: float = RedundancyRule.DEFAULT_SIMILARITY_THRESHOLD) -> List[Dict]:
+    """Per-rule throughput over in-memory prompts: every local rule, plus the redundancy pre-filter."""
+    total_bytes = sum(len(content.encode("utf-8")) for content in contents)
+    results = []
+    for Rule in LOCAL_RULES:
+        rule = Rule()
+        seconds = best_time(lambda: [rule.validate(content) for content in contents], repeat)
+        issues = sum(len(rule.validate(content)) for content in contents)
+        results.append(result("rules", rule.rule_id, seconds, len(contents), total_bytes, issues=issues))
+    llm_client, _ = fake_clients(latency=0.0)
+    prefilter = RedundancyRule(llm_client=llm_client, similarity_threshold=similarity_threshold)
+    seconds = best_time(lambda: [prefilter.prepare_content(content) for content in contents], repeat)
+    escalated = sum(prefilter.prepare_content(content) is not None for content in contents)
+    results.append(result("rules", f"{RedundancyRule.rule_id}:prefilter", seconds, len(contents), total_bytes,
+                          escalated=escalated))
+    return results
+
+def _scan(directory: str, validate: Callable[[Callable], None]) -> int: # Discovery, validation and a JSON report.
+    reporter = StreamingReporter('json', stream=io.StringIO()) # Rendered but discarded.
+    reported = 0
+
+    def handle(file_path, issues): # Mirror the CLI's per-file handling.
+        nonlocal reported
+        reporter.add(file_path, issues)
+        reported += 1
+
+    validate(handle)
+    reporter.finish({})
+    return reported
+
+def bench_scan(directory: str, total_bytes: int, latency: float = 0.05, concurrency: int = 8,
+               workers: int = 4, batch_size: int = 8, repeat: int = 1) -> List[Dict]:
+    """End-to-end directory scans, the way the CLI runs them, with a fake LLM for semantic rules."""
+    local_ids = [Rule.rule_id for Rule in LOCAL_RULES]
+    results = []
+
+    def local_serial(handle): # --offline --workers 1
+        validator = PromptValidator(rule_ids=local_ids)
+        for file_path in iter_prompt_files(directory):
+            handle(file_path, validator.validate_file(file_path)[1])
+
+    def local_parallel(handle): # --offline
+        validator = PromptValidator(rule_ids=local_ids)
+        for file_path, issues in validator.validate_parallel(iter_prompt_files(directory), workers=workers):
+            handle(file_path, issues)
+
+    for name, validate in (("local-serial", local_serial), (f"local-parallel-{workers}", local_parallel)):
+        files = 0
+        def run():
+            nonlocal files
+            files = _scan(directory, validate)
+        results.append(result("scan", name, best_time(run, repeat), files, total_bytes))
+
+    def llm_scan(batch: int, prefilter: bool) -> Dict: # Every rule, with the fake LLM behind the async engine.
+        stats = {}
+        def run():
+            llm_client, async_client = fake_clients(latency)
+            validator = PromptValidator(llm_client=llm_client, async_llm_client=async_client, batch_size=batch,
+                                        similarity_threshold=RedundancyRule.DEFAULT_SIMILARITY_THRESHOLD if prefilter else None)
+            def validate(handle):
+                if batch > 1:
+                    validated = asyncio.run(validator.validate_many(iter_prompt_files(directory), concurrency=concurrency))
+                    for file_path, (_, issues) in validated.items():
+                        handle(file_path, issues)
+                else:
+                    async def stream():
+                        async for file_path, _, issues in validator.validate_iter(iter_prompt_files(directory), concurrency=concurrency):
+                            handle(file_path, issues)
+                    asyncio.run(stream())
+            stats["files"] = _scan(directory, validate)
+            stats["llm_requests"] = async_client.requests
+            stats["llm_calls_avoided"] = validator.llm_calls_avoided()
+        seconds = best_time(run, repeat)
+        label = f"llm-batch-{batch}" if batch > 1 else "llm-async"
+        return result("scan", label + ("-prefilter" if prefilter else ""), seconds, stats.pop("files"), total_bytes,
+                      latency=latency, concurrency=concurrency, **stats)
+
+    results.append(llm_scan(1, prefilter=False))
+    results.append(llm_scan(1, prefilter=True))
+    results.append(llm_scan(batch_size, prefilter=False))
+    return results
+
+def bench_fix(contents: List[str], repeat: int = 3) -> List[Dict]:
+    """Fix application: every local-rule issue of every prompt, applied in memory."""
+    validator = PromptValidator(rule_ids=[Rule.rule_id for Rule in LOCAL_RULES])
+    plans = [(content, [issue for rule in validator.rules for issue in rule.validate(content)]) for content in contents]
+    total_bytes = sum(len(content.encode("utf-8")) for content in contents)
+    fixes = sum(len(issues) for _, issues in plans)
+    seconds = best_time(lambda: [validator.fix_content(content, issues) for content, issues in plans], repeat)
+    return [result("fix", "fix_content", seconds, len(contents), total_bytes, fixes=fixes,
+                   fixes_per_s=round(fixes / seconds, 1) if seconds else None)]
+
+SCENARIOS = ("rules", "scan", "fix") # Scenario names accepted on the command line, in run order.
@@ -0,0 +1,73 @@
+# File: prompt_validator/batching.py
+import json # Import json to build and parse batched requests.
+from typing import List, Dict, Tuple, Sequence # Import typing hints.
+from .rules.semantic import SemanticRule # Import the base class of LLM-backed rules.
+from .chunking import estimate_tokens # Import the offline token counter.
+
+ITEM_OVERHEAD_TOKENS = 12 # JSON framing cost of one prompt inside a batch.
+
+def build_system_prompt(rules: Sequence[SemanticRule]) -> str: # System prompt asking every rule's question at once.
+    fields = "\n".join(f'- "{rule.rule_id}": {rule.BATCH_INSTRUCTION}.' for rule in rules) # One field per rule.
+    return (
+        "You are an expert at reviewing prompts. The user message is a JSON array of objects, each with an "
+        "\"id\" and a \"text\". Analyze each text independently of the others. For every text, report:\n"
+        f"{fields}\n"
+        "Quote phrases exactly as they appear in the text. Respond with ONLY a JSON object of the form "
+        "{\"results\": [{\"id\": \"<id>\", ...}]} containing exactly one entry per input id."
+    )
+
+def build_user_prompt(items: Sequence[Tuple[str, str]]) -> str: # Encode (id, text) pairs as a JSON array.
+    return json.dumps([{"id": item_id, "text": text} for item_id, text in items])
+
+def pack_batches(items: Sequence[Tuple[str, str]], max_batch_size: int,
+                 token_budget: int, reserved_tokens: int = 0) -> List[List[Tuple[str, str]]]: # Group items into requests.
+    """Greedily pack (id, text) items into batches bounded by item count and estimated tokens."""
+    budget = max(token_budget - reserved_tokens, 1) # Tokens left for the prompts themselves.
+    batches = [] # Completed batches.
+    current = [] # Batch being filled.
+    used = 0 # Estimated tokens in the current batch.
+    for item in items: # Keep input order so results stay predictable.
+        cost = estimate_tokens(item[1]) + ITEM_OVERHEAD_TOKENS # Estimated cost of this item.
+        if current and (len(current) >= max_batch_size or used + cost > budget): # Start a new batch when full.
+            batches.append(current)
+            current, used = [], 0
+        current.append(item) # Oversized items still get a batch of their own.
+        used += cost
+    if current: # Flush the final batch.
+        batches.append(current)
+    return batches
+
+def parse_batch_response(response: str, rules: Sequence[SemanticRule],
+                         item_ids: Sequence[str]) -> Dict[str, Dict[str, List[Dict]]]: # Map a batched reply back to issues.
+    """Return {item_id: {rule_id: issues}} for every entry that parsed; missing or malformed entries are omitted."""
+    text = response.strip() # Tolerate surrounding whitespace.
+    if text.startswith("```"): # Tolerate a fenced code block around the JSON.
+        text = text.strip("`")
+        text = text[text.find("{"):] if "{" in text else text
+    try: # A reply that is not JSON cannot be used at all.
+        entries = json.loads(text).get("results")
+    except (ValueError, AttributeError):
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    wanted = set(item_ids) # Ignore ids the model invented.
+    parsed = {} # Successfully parsed verdicts.
+    for entry in entries: # Parse each per-prompt entry independently.
+        if not isinstance(entry, dict) or str(entry.get("id")) not in wanted:
+            continue
+        verdicts = {} # Issues per rule for this entry.
+        for rule in rules: # Each rule parses its own field.
+            if rule.rule_id not in entry:
+                continue
+            try:
+                verdicts[rule.rule_id] = rule.issues_from_batch(entry[rule.rule_id])
+            except ValueError: # Malformed values fall back to a per-file query.
+                continue
+        parsed[str(entry["id"])] = verdicts
+    return parsed
+
+async def run_batch(client, rules: Sequence[SemanticRule],
+                    items: Sequence[Tuple[str, str]]) -> Dict[str, Dict[str, List[Dict]]]: # Send one batched request.
+    response = await client.query(build_system_prompt(rules), build_user_prompt(items)) # Query LLM.
+    return parse_batch_response(response, rules, [item_id for item_id, _ in items])
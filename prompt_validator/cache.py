@@ -0,0 +1,84 @@
+# File: prompt_validator/cache.py
+import os # Import os for path operations.
+import json # Import json to serialize cached issues.
+import time # Import time for entry timestamps.
+import sqlite3 # Import sqlite3 for the on-disk store.
+import hashlib # Import hashlib for content-addressed keys.
+import threading # Import threading to guard the shared connection.
+from typing import List, Dict, Optional # Import typing hints.
+
+def default_cache_dir() -> str: # Location of the cache when no directory is given.
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache") # Honour XDG conventions.
+    return os.path.join(base, "prompt-validator")
+
+class VerdictCache: # Persistent, content-addressed cache of LLM rule verdicts.
+    """SQLite-backed cache mapping (rule, rule prompt, model, temperature, content) to issues."""
+
+    FILENAME = "verdicts.sqlite3" # Database file inside the cache directory.
+    MEMORY = ":memory:" # Pass as cache_dir to keep the cache in memory for the life of the process.
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 100_000,
+                 max_age_days: float = 30.0): # Open (or create) the cache.
+        self.cache_dir = cache_dir or default_cache_dir() # Directory holding the database.
+        self.max_entries = max_entries # Least recently used entries beyond this are evicted.
+        self.max_age_seconds = max_age_days * 86400 # Entries older than this are evicted.
+        self.hits = 0 # Lookups answered from the cache.
+        self.misses = 0 # Lookups that required an LLM call.
+        self._lock = threading.Lock() # Serialize access to the connection.
+        if self.cache_dir == self.MEMORY: # Nothing touches the disk; used by long-running servers.
+            self._conn = sqlite3.connect(self.MEMORY, check_same_thread=False)
+        else:
+            os.makedirs(self.cache_dir, exist_ok=True) # Make sure the directory exists.
+            self._conn = sqlite3.connect(os.path.join(self.cache_dir, self.FILENAME), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL") # Let concurrent runs read while one writes.
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "key TEXT PRIMARY KEY, issues TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.evict() # Drop stale entries up front.
+
+    @staticmethod
+    def make_key(rule_id: str, system_prompt: str, model: str, temperature: float, content: str) -> str: # Hash the inputs of a verdict.
+        payload = json.dumps([rule_id, system_prompt, model, temperature, content]) # Unambiguous encoding of all inputs.
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]: # Look up a cached verdict.
+        return self.get_first([key])
+
+    def get_first(self, keys: List[str]) -> Optional[List[Dict]]: # Verdict of the first key that is cached; one hit or miss.
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute("SELECT issues FROM verdicts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE verdicts SET accessed = ? WHERE key = ?", (time.time(), key)) # Track recency for eviction.
+                    self.hits += 1
+                    return json.loads(row[0])
+            self.misses += 1 # Not cached yet.
+        return None
+
+    def set(self, key: str, issues: List[Dict]) -> None: # Store a verdict.
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verdicts (key, issues, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(issues), now, now),
+            )
+            self._conn.commit()
+
+    def evict(self) -> None: # Remove entries that are too old or beyond the size limit.
+        with self._lock:
+            self._conn.execute("DELETE FROM verdicts WHERE created < ?", (time.time() - self.max_age_seconds,))
+            self._conn.execute(
+                "DELETE FROM verdicts WHERE key IN ("
+                "SELECT key FROM verdicts ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict: # Hit/miss counters for reporting.
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None: # Persist recency updates and release the database.
+        self.evict()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,105 @@
+# File: prompt_validator/chunking.py
+import re # Import re for section headers, token pieces and directives.
+import math # Import math for token estimates.
+from typing import List # Import typing hints.
+from .similarity import split_sentences # Import the sentence splitter.
+
+PIECE_PATTERN = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+") # GPT-style pre-tokenizer pieces; BPE never merges across them.
+SECTION_PATTERN = re.compile(r"^[ \t]*#+[ \t]*\S", re.MULTILINE) # Markdown header lines, the shape CompletenessRule recognises.
+DIRECTIVE_PATTERN = re.compile( # Words that mark a sentence as a hard constraint, the kind that can contradict another.
+    r"\b(must|should|shall|never|always|only|avoid|ensure|make sure|do not|don't|required?|at (?:most|least)|"
+    r"no (?:more|less|fewer) than|exactly|limit|maximum|minimum|forbidden)\b",
+    re.IGNORECASE,
+)
+DEFAULT_MAX_CHUNK_TOKENS = 3000 # Suggested chunk size; leaves room for the system prompt and reply in small context windows.
+DEFAULT_OVERLAP_TOKENS = 200 # Tokens repeated between consecutive windows, so a sentence on a boundary is seen whole.
+
+def estimate_tokens(text: str) -> int: # Offline token count, erring on the high side.
+    """Return the larger of one token per four characters and the number of pre-tokenizer pieces.
+
+    A BPE token never spans two pieces, so the piece count is a lower bound on the real count;
+    the character estimate covers long words that split into several tokens.
+    """
+    return max(math.ceil(len(text) / 4), len(PIECE_PATTERN.findall(text)))
+
+def split_sections(content: str) -> List[str]: # Split at header lines; text before the first header is its own section.
+    starts = [match.start() for match in SECTION_PATTERN.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(content)]
+    return [content[start:end] for start, end in zip(bounds, bounds[1:]) if content[start:end].strip()]
+
+def _boundary(text: str, low: int, high: int, forward: bool) -> int: # Nearest line break (else space) in [low, high), or -1.
+    for separator in ("\n", " "):
+        index = text.find(separator, low, high) if forward else text.rfind(separator, low, high)
+        if index != -1:
+            return index + 1
+    return -1
+
+def split_windows(text: str, max_tokens: int, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> List[str]: # Token-bounded windows.
+    """Split text into windows of about `max_tokens`, each repeating the last `overlap_tokens` of the previous one.
+
+    Window edges are moved back to a line break or space where there is one in the second half of the window.
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return [text]
+    chars_per_token = len(text) / tokens # This text's own density, so dense text gets shorter windows.
+    size = max(int(max_tokens * chars_per_token), 1) # Window length in characters.
+    overlap = min(int(overlap_tokens * chars_per_token), size // 2) # Overlap never exceeds half a window.
+    windows, start = [], 0
+    while True:
+        end = min(start + size, len(text))
+        if end < len(text): # Do not cut through a word.
+            cut = _boundary(text, start + size // 2, end, forward=False)
+            end = cut if cut != -1 else end
+        windows.append(text[start:end])
+        if end >= len(text):
+            return windows
+        next_start = end - overlap
+        if overlap: # Start the overlap at a word boundary too.
+            cut = _boundary(text, next_start, end, forward=True)
+            next_start = cut if cut != -1 else next_start
+        start = max(next_start, start + 1)
+
+def chunk_prompt(content: str, max_tokens: int = DEFAULT_MAX_CHUNK_TOKENS,
+                 overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> List[str]: # Split a prompt for separate LLM requests.
+    """Split content into chunks of at most about `max_tokens`.
+
+    Adjacent sections are packed together while they fit; a section that is too large on its
+    own is split into overlapping windows. Content that fits is returned as a single chunk.
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return [content]
+    chunks, current, used = [], "", 0
+    for section in split_sections(content):
+        tokens = estimate_tokens(section)
+        if current and used + tokens > max_tokens: # Close the chunk being packed.
+            chunks.append(current)
+            current, used = "", 0
+        if tokens > max_tokens:
+            chunks.extend(split_windows(section, max_tokens, overlap_tokens))
+        else:
+            current += section
+            used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+def directive_digest(chunks: List[str]) -> str: # Instructions from every chunk, for a cross-chunk check.
+    """Return the header lines and directive sentences of all chunks, in order and without repeats.
+
+    Contradictions between sections are invisible to per-chunk requests; the digest puts the
+    instructions of the whole prompt side by side in a fraction of its size.
+    """
+    lines, seen = [], set()
+    for chunk in chunks:
+        for line in chunk.splitlines():
+            if SECTION_PATTERN.match(line):
+                lines.append(line.strip())
+                continue
+            for _, _, sentence in split_sentences(line):
+                if sentence not in seen and DIRECTIVE_PATTERN.search(sentence):
+                    seen.add(sentence) # Overlapping windows repeat sentences.
+                    lines.append(sentence)
+    return "\n".join(lines)
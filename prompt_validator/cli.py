@@ -1,38 +1,276 @@
 # File: prompt_validator/cli.py
 import os # Import os for operating system functionalities.
+import asyncio # Import asyncio to drive the concurrent validation engine.
 import click # Import click for creating the command-line interface.
 from .validator import PromptValidator # Import the main validator class.
-from .reporter import generate_report # Import the report generation function.
+from .reporter import StreamingReporter # Import the incremental reporter.
+from .discovery import iter_prompt_files, DEFAULT_INCLUDE, DEFAULT_IGNORE_FILES # Import file discovery.
+from .cache import VerdictCache, default_cache_dir # Import the verdict cache.
+from .rules import ALL_RULES, LOCAL_RULES # Import the rule registries.
+from .rules.semantic import RedundancyRule # Import the rule with a local pre-filter.
+from .manifest import Manifest, MANIFEST_FILENAME, git_changed_files, file_fingerprint, content_hash # Import incremental-run support.
+from .profiling import Profiler # Import run instrumentation.
+from .chunking import DEFAULT_MAX_CHUNK_TOKENS # Import the default chunk size.
+from .llm_client import require_api_key # Import the up-front API key check.
+from .server import (ValidationServer, ServerBusy, ServerUnavailable, request_validation,
+                     default_server_url, DEFAULT_HOST, DEFAULT_PORT, SERVER_ENV) # Import the server and its client.
 
-@click.command() # Decorator to create a CLI command.
+def _parse_rules(ctx, param, value): # Split and check a comma-separated list of rule ids.
+    if value is None: # No selection means every rule.
+        return None
+    rule_ids = [rule_id.strip().upper() for rule_id in value.split(',') if rule_id.strip()]
+    if not rule_ids: # An empty selection would report every file clean.
+        raise click.BadParameter("no rule ids given.")
+    known = {Rule.rule_id for Rule in ALL_RULES}
+    unknown = [rule_id for rule_id in rule_ids if rule_id not in known]
+    if unknown: # Reject typos instead of silently skipping checks.
+        raise click.BadParameter(f"unknown rule(s) {', '.join(unknown)}; choose from {', '.join(sorted(known))}.")
+    return rule_ids
+
+def _offline_rules(rule_ids): # Keep only the selected rules that need no LLM.
+    local_ids = [Rule.rule_id for Rule in LOCAL_RULES]
+    kept = [rule_id for rule_id in (rule_ids or local_ids) if rule_id in local_ids]
+    if not kept: # Only LLM rules were selected; running nothing would report every file clean.
+        raise click.BadParameter(f"--offline leaves none of {', '.join(rule_ids)} to run; "
+                                 f"the local rules are {', '.join(local_ids)}.", param_hint="'--rules'")
+    return kept
+
+def _require_api_key(hint): # Stop before any output when the LLM rules have no API key.
+    try:
+        require_api_key()
+    except ValueError as e:
+        raise click.ClickException(f"{e} {hint}")
+
+def _load_unchanged(file_path, fingerprint): # Read a file only if it is unchanged since validation.
+    if fingerprint is None or file_fingerprint(file_path) != fingerprint:
+        return None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+class DefaultGroup(click.Group): # Command group that runs `check` when no subcommand is named.
+    """Keeps `prompt-validator DIRECTORY [OPTIONS]` working alongside the `serve` and `client` subcommands."""
+
+    default_command = 'check' # Command used when the first argument is not a subcommand.
+
+    def parse_args(self, ctx, args): # Insert the default command in front of a directory argument.
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names:
+            args = [self.default_command] + list(args)
+        return super().parse_args(ctx, args)
+
+@click.group(cls=DefaultGroup) # Decorator to create the CLI command group.
+def main(): # The main function for the CLI.
+    """Validates prompt files. Runs `check` when no command is given."""
+
+@main.command() # Decorator to create the validation command.
 @click.argument('directory', type=click.Path(exists=True, file_okay=False)) # Argument for the directory path.
 @click.option('--fix', is_flag=True, help='Automatically apply suggested fixes.') # Option to enable auto-fixing.
 @click.option('--report-format', type=click.Choice(['table', 'json']), default='table', help='Output format.') # Option for report format.
-def main(directory, fix, report_format): # The main function for the CLI.
-    """Validates all .txt prompt files in a given directory."""
-    validator = PromptValidator() # Instantiate the validator.
-    results = {} # Dictionary to store results per file.
-    file_contents = {} # Dictionary to store original file contents.
+@click.option('--concurrency', type=click.IntRange(min=1), default=8, show_default=True, help='Maximum number of files validated concurrently.') # Option for bounded parallelism.
+@click.option('--cache-dir', type=click.Path(file_okay=False), default=default_cache_dir, show_default='~/.cache/prompt-validator', help='Directory for the LLM verdict cache.') # Option for the cache location.
+@click.option('--no-cache', is_flag=True, help='Always query the LLM, ignoring cached verdicts.') # Option to disable caching.
+@click.option('--batch-size', type=click.IntRange(min=1), default=1, show_default=True, help='Prompts packed into one LLM request (1 disables batching).') # Option for request batching.
+@click.option('--batch-token-budget', type=click.IntRange(min=1), default=6000, show_default=True, help='Estimated token limit of one batched request.') # Option for the batch packer.
+@click.option('--rules', 'rule_ids', callback=_parse_rules, help='Comma-separated rule ids to run (default: all rules).') # Option to select rules.
+@click.option('--offline', is_flag=True, help='Run only rules that need no LLM.') # Option to skip LLM rules.
+@click.option('--workers', type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default='CPU count', help='Worker processes used when only local rules run.') # Option for the process pool.
+@click.option('--include', multiple=True, help='Glob of files to validate; repeatable (default: *.txt).') # Option for include globs.
+@click.option('--exclude', multiple=True, help='Glob of files or directories to skip; repeatable.') # Option for exclude globs.
+@click.option('--ignore-file', 'ignore_files', multiple=True, default=DEFAULT_IGNORE_FILES, show_default=True, help='gitignore-style file honoured in every directory; repeatable.') # Option for ignore files.
+@click.option('--recursive/--no-recursive', default=True, show_default=True, help='Descend into subdirectories.') # Option for recursion.
+@click.option('--similarity-threshold', type=click.FloatRange(0.0, 1.0), default=RedundancyRule.DEFAULT_SIMILARITY_THRESHOLD, show_default=True, help='Sentence similarity at which the redundancy check asks the LLM (with --prefilter).') # Option for the redundancy pre-filter.
+@click.option('--prefilter/--no-prefilter', default=False, show_default=True, help='Send only near-duplicate sentences to the redundancy check (experimental).') # Option to enable the pre-filter.
+@click.option('--max-chunk-tokens', type=click.IntRange(min=100), default=DEFAULT_MAX_CHUNK_TOKENS, show_default=True, help='Prompts above this estimated size are sent to LLM rules in chunks.') # Option for the chunk size.
+@click.option('--no-chunking', is_flag=True, help='Send large prompts to LLM rules whole.') # Option to disable chunking.
+@click.option('--incremental', is_flag=True, help='Only revalidate files that changed since the last incremental run.') # Option for incremental runs.
+@click.option('--manifest', 'manifest_path', type=click.Path(dir_okay=False), help=f'Manifest used by --incremental (default: DIRECTORY/{MANIFEST_FILENAME}).') # Option for the manifest location.
+@click.option('--since', metavar='GIT_REF', help='Always revalidate files changed since GIT_REF (per git diff); implies --incremental.') # Option to seed changes from git.
+@click.option('--profile', is_flag=True, help='Report per-rule and per-file timings, LLM latency, tokens and retries.') # Option for instrumentation.
+@click.option('--prompt-price', type=click.FloatRange(min=0), help='Price per 1,000 prompt tokens, to estimate LLM cost with --profile.') # Option for cost estimates.
+@click.option('--completion-price', type=click.FloatRange(min=0), help='Price per 1,000 completion tokens, to estimate LLM cost with --profile.') # Option for cost estimates.
+def check(directory, fix, report_format, concurrency, cache_dir, no_cache, batch_size, batch_token_budget,
+         rule_ids, offline, workers, include, exclude, ignore_files, recursive,
+         similarity_threshold, prefilter, max_chunk_tokens, no_chunking, incremental, manifest_path, since,
+         profile, prompt_price, completion_price): # Validate a directory in this process.
+    """Validates all prompt files (by default *.txt) under a given directory."""
+    if offline: # Drop LLM rules from the selection.
+        rule_ids = _offline_rules(rule_ids)
+    local_only = rule_ids is not None and all(rule_id in {Rule.rule_id for Rule in LOCAL_RULES} for rule_id in rule_ids) # No LLM needed.
+    if not local_only:
+        _require_api_key("Set it, or pass --offline to run only the local rules.")
+    cache = None if no_cache or local_only else VerdictCache(cache_dir) # Open the verdict cache unless disabled or unused.
+    similarity_threshold = similarity_threshold if prefilter else None # None sends whole prompts to the LLM.
+    profiler = Profiler(prompt_price_per_1k=prompt_price, completion_price_per_1k=completion_price) if profile else None
+    validator = PromptValidator(cache=cache, batch_size=batch_size, batch_token_budget=batch_token_budget, rule_ids=rule_ids,
+                                similarity_threshold=similarity_threshold, profiler=profiler,
+                                max_chunk_tokens=None if no_chunking else max_chunk_tokens) # Instantiate the validator.
+    pending_fixes = {} # file_path -> (fingerprint, issues), kept only when fixes may be applied.
+    file_count = 0 # Number of files reported, validated or reused.
+    incremental = incremental or since is not None # --since only makes sense incrementally.
+    manifest = Manifest.load(manifest_path or os.path.join(directory, MANIFEST_FILENAME)) if incremental else None
+    version = validator.rules_version() if incremental else None # Stored with every manifest entry.
+    changed = None # Files git reports as changed, if --since was given.
+    if since is not None:
+        try:
+            changed = git_changed_files(directory, since)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+    fingerprints = {} # file_path -> (size, mtime) taken as the validator pulls the path, before it reads the file.
+
+    def fingerprinted(paths): # Record each file's state before it is validated.
+        for file_path in paths:
+            fingerprints[file_path] = file_fingerprint(file_path)
+            yield file_path
+
+    def handle(file_path, issues, content=None, state=None, reused=False): # Report one finished file and remember what fixing will need.
+        nonlocal file_count
+        file_count += 1
+        reporter.add(file_path, issues)
+        if reused: # The manifest just matched the file on disk.
+            fingerprint, digest = file_fingerprint(file_path), None
+        elif state is not None: # Taken by a pool worker around its read.
+            fingerprint, digest = state
+        else:
+            fingerprint, digest = fingerprints.pop(file_path, None), content_hash(content)
+        if manifest is not None and not reused: # Remember the verdict on the content that was validated.
+            manifest.record(file_path, issues, version, fingerprint, digest)
+        if fix and issues: # Content is not kept; it is re-read (and checked) only if fixes are applied.
+            pending_fixes[file_path] = (fingerprint, issues)
 
     click.echo(f"Scanning directory: {directory}") # Inform the user about the scan.
-    for filename in os.listdir(directory): # Iterate through files in the directory.
-        if filename.endswith(".txt"): # Process only .txt files.
-            file_path = os.path.join(directory, filename) # Get the full file path.
-            content, issues = validator.validate_file(file_path) # Validate the file.
-            if issues: # If issues are found.
-                results[file_path] = issues # Store the issues.
-                file_contents[file_path] = content # Store the content for potential fixing.
+    reporter = StreamingReporter(report_format) # Issues are reported as each file finishes.
+    file_paths = iter_prompt_files(directory, include=include or DEFAULT_INCLUDE, exclude=exclude,
+                                   ignore_files=ignore_files, recursive=recursive) # Stream matching files.
+    if manifest is not None: # Report unchanged files straight from the manifest; validate the rest.
+        def changed_paths(paths):
+            for file_path, stored in validator.split_incremental(paths, manifest, changed):
+                if stored is None:
+                    yield file_path
+                else:
+                    handle(file_path, stored, reused=True)
+        file_paths = changed_paths(file_paths)
+    if local_only and workers > 1: # Local rules scale across processes.
+        for file_path, issues, state in validator.validate_parallel(file_paths, workers=workers, with_state=True): # Stream results as workers finish.
+            handle(file_path, issues, state=state)
+    elif local_only: # A single worker runs in-process.
+        for file_path in fingerprinted(file_paths):
+            content, issues = validator.validate_file(file_path)
+            handle(file_path, issues, content)
+    else:
+        async def stream(): # Consume the async engine as files (or, batched, windows of files) finish.
+            async for file_path, content, issues in validator.validate_iter(fingerprinted(file_paths), concurrency=concurrency):
+                handle(file_path, issues, content)
+        asyncio.run(stream())
 
-    generate_report(results, report_format) # Generate and display the report.
+    stats = {} # Run statistics to include in the report.
+    if validator.async_llm_client is not None and file_count: # Report LLM request and token usage.
+        usage = validator.async_llm_client.usage()
+        tokens = usage["prompt_tokens"] + usage["completion_tokens"]
+        stats["llm"] = dict(usage, requests_per_file=round(usage["requests"] / file_count, 3),
+                            tokens_per_file=round(tokens / file_count, 1))
+    if similarity_threshold is not None and not local_only and file_count: # Report what the pre-filter saved.
+        stats["prefilter"] = {"threshold": similarity_threshold, "llm_calls_avoided": validator.llm_calls_avoided()}
+    if cache is not None: # Report cache effectiveness and persist the cache.
+        stats["cache"] = cache.stats()
+        cache.close()
+    if profiler is not None: # Where the time and tokens went.
+        stats["profile"] = profiler.summary()
+    if manifest is not None: # Report the incremental saving and persist the manifest.
+        stats["incremental"] = {"validated": file_count - manifest.reused, "skipped": manifest.reused}
+        manifest.save()
+    reporter.finish(stats) # Close the report and print run statistics.
 
-    if fix and results: # If the --fix flag is set and there are issues.
+    if fix and pending_fixes: # If the --fix flag is set and there are issues.
         if click.confirm('Do you want to apply the suggested fixes?'): # Ask for user confirmation.
-            for file_path, issues in results.items(): # Iterate through files with issues.
-                validator.fix_file(file_path, file_contents[file_path], issues) # Apply fixes.
+            for file_path, (fingerprint, issues) in pending_fixes.items(): # Iterate through files with issues.
+                content = _load_unchanged(file_path, fingerprint) # Reload content lazily.
+                if content is None: # The file changed since it was validated; its issues are stale.
+                    click.echo(f"Skipped {file_path}: file changed since validation.")
+                    continue
+                validator.fix_file(file_path, content, issues) # Apply fixes.
                 click.echo(f"Applied fixes to {file_path}") # Confirm fixing action.
             click.echo("Fixing process complete.") # Announce completion.
         else:
             click.echo("Fixing process cancelled.") # Announce cancellation.
 
+@main.command() # Decorator to create the server command.
+@click.option('--host', default=DEFAULT_HOST, show_default=True, help='Interface to listen on.') # Option for the bind address.
+@click.option('--allow-remote', is_flag=True, help='Allow a non-loopback --host; the API has no authentication.') # Option to expose the server.
+@click.option('--read-root', type=click.Path(exists=True, file_okay=False), help='Read files sent without content from inside this directory (default: never read from disk).') # Option for server-side reads.
+@click.option('--port', type=click.IntRange(0, 65535), default=DEFAULT_PORT, show_default=True, help='Port to listen on (0 picks a free port).') # Option for the port.
+@click.option('--queue-size', type=click.IntRange(min=1), default=256, show_default=True, help='Files waiting for a worker before requests are turned away with 503.') # Option for backpressure.
+@click.option('--concurrency', type=click.IntRange(min=1), default=8, show_default=True, help='Files validated concurrently.') # Option for the worker count.
+@click.option('--cache-dir', type=click.Path(file_okay=False), help='Persist LLM verdicts in this directory (default: keep them in memory).') # Option for a persistent cache.
+@click.option('--no-cache', is_flag=True, help='Always query the LLM, ignoring cached verdicts.') # Option to disable caching.
+@click.option('--rules', 'rule_ids', callback=_parse_rules, help='Comma-separated rule ids to run (default: all rules).') # Option to select rules.
+@click.option('--offline', is_flag=True, help='Run only rules that need no LLM.') # Option to skip LLM rules.
+@click.option('--similarity-threshold', type=click.FloatRange(0.0, 1.0), default=RedundancyRule.DEFAULT_SIMILARITY_THRESHOLD, show_default=True, help='Sentence similarity at which the redundancy check asks the LLM (with --prefilter).') # Option for the redundancy pre-filter.
+@click.option('--prefilter/--no-prefilter', default=False, show_default=True, help='Send only near-duplicate sentences to the redundancy check (experimental).') # Option to enable the pre-filter.
+@click.option('--max-chunk-tokens', type=click.IntRange(min=100), default=DEFAULT_MAX_CHUNK_TOKENS, show_default=True, help='Prompts above this estimated size are sent to LLM rules in chunks.') # Option for the chunk size.
+@click.option('--no-chunking', is_flag=True, help='Send large prompts to LLM rules whole.') # Option to disable chunking.
+def serve(host, allow_remote, read_root, port, queue_size, concurrency, cache_dir, no_cache, rule_ids, offline,
+          similarity_threshold, prefilter, max_chunk_tokens, no_chunking): # Run the validation server.
+    """Keeps a warm validator and LLM client running for `client` and editor integrations."""
+    if offline: # Drop LLM rules from the selection.
+        rule_ids = _offline_rules(rule_ids)
+    if rule_ids is None or any(rule_id not in {Rule.rule_id for Rule in LOCAL_RULES} for rule_id in rule_ids):
+        _require_api_key("Set it, or pass --offline to serve only the local rules.")
+    cache = None if no_cache else VerdictCache(cache_dir or VerdictCache.MEMORY) # Verdicts outlive requests, not the server.
+    validator = PromptValidator(cache=cache, rule_ids=rule_ids,
+                                similarity_threshold=similarity_threshold if prefilter else None,
+                                max_chunk_tokens=None if no_chunking else max_chunk_tokens)
+    try:
+        server = ValidationServer(validator, host=host, port=port, queue_size=queue_size, concurrency=concurrency,
+                                  read_root=read_root, allow_remote=allow_remote)
+    except ValueError as e: # A non-loopback host without --allow-remote.
+        raise click.ClickException(f"{e} Pass --allow-remote to listen on it.")
+    except OSError as e: # Typically the port is already taken.
+        raise click.ClickException(f"cannot listen on {host}:{port}: {e}")
+    click.echo(f"Serving {len(validator.rules)} rule(s) on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    finally:
+        if cache is not None:
+            cache.close()
+
+@main.command() # Decorator to create the thin client command.
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)) # Prompt files to validate.
+@click.option('--server', 'server_url', envvar=SERVER_ENV, default=default_server_url, show_default=default_server_url(), help=f'URL of the validation server (or set {SERVER_ENV}).') # Option for the server address.
+@click.option('--report-format', type=click.Choice(['table', 'json']), default='table', help='Output format.') # Option for report format.
+@click.option('--fallback/--no-fallback', default=True, show_default=True, help='Validate in this process when no server is running.') # Option for local fallback.
+def client(files, server_url, report_format, fallback): # Forward files to the validation server.
+    """Validates FILES on a running `serve` process, or locally when none is running."""
+    payload = []
+    for file_path in files: # Send contents so the server sees exactly what is on disk here.
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                payload.append({"path": file_path, "content": f.read()})
+        except (OSError, UnicodeDecodeError): # Let the validator report unreadable files.
+            payload.append({"path": file_path})
+    stats = {}
+    results = None # Stays None when no server answered.
+    try:
+        results = request_validation(server_url, payload)
+        stats["server"] = server_url
+    except ServerBusy as e:
+        raise click.ClickException(f"validation server is busy: {e}")
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    except ServerUnavailable as e:
+        if not fallback:
+            raise click.ClickException(str(e))
+        _require_api_key(f"It is needed to validate locally, since no server answered ({e}).")
+        click.echo(f"{e}; validating locally.", err=True)
+    if results is None: # Same defaults as `check`, in this process.
+        cache = VerdictCache(default_cache_dir())
+        validator = PromptValidator(cache=cache, max_chunk_tokens=DEFAULT_MAX_CHUNK_TOKENS)
+        validated = asyncio.run(validator.validate_many(files))
+        results = {file_path: issues for file_path, (_, issues) in validated.items()}
+        cache.close()
+    reporter = StreamingReporter(report_format)
+    for file_path, issues in results.items():
+        reporter.add(file_path, issues)
+    reporter.finish(stats)
+
 if __name__ == '__main__': # Standard entry point check.
-    main() # Run the main CLI function.
\ No newline at end of file
+    main() # Run the main CLI function.
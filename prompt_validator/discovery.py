@@ -0,0 +1,124 @@
+# File: prompt_validator/discovery.py
+import os # Import os for directory scanning.
+import re # Import re to compile glob patterns.
+from functools import lru_cache # Import lru_cache to memoize compiled globs.
+from typing import List, Iterator, Sequence, Tuple, Optional # Import typing hints.
+
+DEFAULT_INCLUDE = ("*.txt",) # Prompt files picked up by default.
+DEFAULT_IGNORE_FILES = (".gitignore", ".promptignore") # Ignore files honoured in every directory.
+ALWAYS_SKIPPED = {".git"} # Directories never worth descending into.
+
+@lru_cache(maxsize=None)
+def _glob_to_regex(pattern: str) -> "re.Pattern": # Translate a gitignore-style glob into a regex over '/'-separated paths.
+    parts = [] # Regex fragments.
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i): # Zero or more leading directories.
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern): # Everything inside a directory.
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i): # Anything, across directories.
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*": # Anything within one path component.
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?": # One character within a path component.
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]: # Character class.
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1:end]
+            parts.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+def _matches(pattern: str, rel_path: str) -> bool: # Match a glob against a path relative to its base directory.
+    if "/" in pattern.rstrip("/"): # Patterns with a slash are anchored to the base directory.
+        return bool(_glob_to_regex(pattern.lstrip("/")).match(rel_path))
+    return bool(_glob_to_regex("**/" + pattern).match(rel_path)) # Others match at any depth.
+
+class IgnoreRules: # Patterns from one gitignore-style file, scoped to its directory.
+    def __init__(self, base_prefix: str, lines: Sequence[str]): # Parse the ignore file's lines.
+        self.base_prefix = base_prefix # Root-relative path of the file's directory, '' or ending in '/'.
+        self.rules = [] # List of (pattern, negated, directory_only).
+        for line in lines:
+            line = line.rstrip("\n").rstrip() # Trailing whitespace is not significant.
+            if not line or line.startswith("#"): # Skip blanks and comments.
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            directory_only = line.endswith("/")
+            self.rules.append((line.rstrip("/"), negated, directory_only))
+
+    @classmethod
+    def load(cls, directory: str, base_prefix: str, filenames: Sequence[str]) -> Optional["IgnoreRules"]: # Read ignore files in a directory.
+        lines = [] # Combined lines of every ignore file present.
+        for filename in filenames:
+            try:
+                with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+                    lines.extend(f.readlines())
+            except OSError: # Missing or unreadable ignore files are skipped.
+                continue
+        return cls(base_prefix, lines) if lines else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]: # True if ignored, False if re-included, None if unmatched.
+        rel_path = rel_path[len(self.base_prefix):] # Patterns are relative to the ignore file's directory.
+        verdict = None
+        for pattern, negated, directory_only in self.rules: # The last matching rule wins.
+            if directory_only and not is_dir:
+                continue
+            if _matches(pattern, rel_path):
+                verdict = not negated
+        return verdict
+
+def _is_ignored(rel_path: str, is_dir: bool, ignore_stack: List[IgnoreRules]) -> bool: # Apply ignore files, deepest last.
+    ignored = False
+    for rules in ignore_stack:
+        verdict = rules.match(rel_path, is_dir)
+        if verdict is not None:
+            ignored = verdict
+    return ignored
+
+def iter_prompt_files(root: str, include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = (),
+                      ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+                      recursive: bool = True) -> Iterator[str]: # Stream prompt file paths under root.
+    """Yield matching files under root, depth first, without materialising the whole tree.
+
+    `include` and `exclude` are globs matched against paths relative to root (patterns without a
+    '/' match at any depth). Ignore files use gitignore syntax and apply to their own directory
+    and everything below it.
+    """
+    stack: List[Tuple[str, str, List[IgnoreRules]]] = [(root, "", [])] # Directories still to scan, with inherited ignore rules.
+    while stack:
+        directory, prefix, inherited = stack.pop() # prefix is the root-relative directory path ending in '/'.
+        rules = IgnoreRules.load(directory, prefix, ignore_files) # Ignore files in this directory.
+        ignore_stack = inherited + [rules] if rules else inherited
+        try:
+            with os.scandir(directory) as it: # Entries of one directory only, never the whole tree.
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError: # Unreadable directories are skipped.
+            continue
+        subdirectories = [] # Directories to descend into, in name order.
+        for entry in entries:
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir and entry.name in ALWAYS_SKIPPED:
+                continue
+            rel_path = prefix + entry.name # Root-relative path with '/' separators.
+            if _is_ignored(rel_path, is_dir, ignore_stack):
+                continue
+            if any(_matches(pattern, rel_path) for pattern in exclude): # Excluded files and whole directories.
+                continue
+            if is_dir:
+                if recursive:
+                    subdirectories.append((entry.path, rel_path + "/"))
+                continue
+            if entry.is_file() and any(_matches(pattern, rel_path) for pattern in include):
+                yield entry.path
+        stack.extend((path, rel_dir, ignore_stack) for path, rel_dir in reversed(subdirectories)) # Visit subdirectories in name order.
@@ -0,0 +1,69 @@
+# File: prompt_validator/fixes.py
+import os # Import os for atomic file replacement.
+import tempfile # Import tempfile to stage writes next to the target.
+from typing import List, Tuple # Import typing hints.
+
+Edit = Tuple[int, int, str] # (start, end, replacement) against the original content.
+
+class FixPlan: # Edits collected for one file and applied in a single pass.
+    """Collects span replacements and appended blocks from every rule, then builds the fixed text once.
+
+    Offsets always refer to the original content, so the order in which rules add edits does not matter.
+    Overlapping edits are resolved by keeping the one that starts first (the longer one, then the one
+    added first, on a tie); the rest are counted in `skipped`.
+    """
+
+    def __init__(self): # Initialize an empty plan.
+        self.edits: List[Edit] = [] # Span replacements.
+        self.blocks: List[str] = [] # Text appended after the (trimmed) content, in order.
+        self.skipped = 0 # Edits dropped because they overlapped an earlier one.
+
+    def replace(self, start: int, end: int, replacement: str) -> None: # Replace content[start:end].
+        self.edits.append((start, end, replacement))
+
+    def has_edit(self, start: int, end: int) -> bool: # Whether a replacement of exactly content[start:end] was planned.
+        return any(edit[0] == start and edit[1] == end for edit in self.edits)
+
+    def append(self, block: str) -> None: # Append a block, separated by a blank line, like the rules' fix() does.
+        self.blocks.append(block.strip())
+
+    def _resolved(self) -> List[Edit]: # Sorted, de-duplicated, non-overlapping edits.
+        resolved = [] # Edits that will be applied.
+        position = 0 # End of the last kept edit.
+        for edit in sorted(dict.fromkeys(self.edits), key=lambda edit: (edit[0], -edit[1])):
+            start, end, _ = edit
+            if start < position: # Overlaps a kept edit.
+                self.skipped += 1
+                continue
+            resolved.append(edit)
+            position = end
+        return resolved
+
+    def apply(self, content: str) -> str: # Build the fixed content in one pass.
+        pieces = [] # Output fragments, joined once at the end.
+        position = 0 # Next unconsumed offset in the original content.
+        for start, end, replacement in self._resolved():
+            pieces.append(content[position:start])
+            pieces.append(replacement)
+            position = end
+        pieces.append(content[position:])
+        fixed = "".join(pieces)
+        if self.blocks: # Appended blocks follow the trimmed text, one blank line apart.
+            fixed = fixed.strip() + "".join(f"\n\n{block}" for block in self.blocks) + "\n"
+        return fixed
+
+def write_atomic(file_path: str, text: str) -> None: # Replace a file's contents without ever exposing a partial write.
+    file_path = os.path.realpath(file_path) # Write through symlinks instead of replacing the link with a file.
+    directory = os.path.dirname(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp") # Same filesystem, so the rename is atomic.
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        try: # Keep the original file's permissions.
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -1,27 +1,179 @@
 # File: prompt_validator/llm_client.py
 import os # Import os for environment variable access.
-from openai import OpenAI # Import the OpenAI client.
-from dotenv import load_dotenv # Import function to load .env files.
+import time # Import time to measure request latency.
+import random # Import random for jittered backoff.
+import asyncio # Import asyncio for the asynchronous client.
+import contextlib # Import contextlib for an unlimited request slot.
+from typing import List, Tuple, Optional # Import typing hints.
 
-load_dotenv() # Load environment variables from a .env file.
+DEFAULT_MODEL = "gpt-3.5-turbo" # Model used for semantic validation.
+DEFAULT_TEMPERATURE = 0.0 # Temperature 0 for deterministic output.
+ERROR_PREFIX = "Error querying LLM" # Prefix of the string returned when a query fails.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504} # HTTP statuses worth retrying (rate limits and server errors).
 
-class LLMClient: # A client to interact with the Language Model.
-    def __init__(self): # Initialize the LLMClient.
-        api_key = os.getenv("OPENAI_API_KEY") # Get API key from environment.
-        if not api_key: # Check if the API key is set.
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-        self.client = OpenAI(api_key=api_key) # Instantiate the OpenAI client.
+_dotenv_loaded = False # Whether the .env file has been read.
+
+def _get_api_key() -> str: # Read the API key from the environment.
+    global _dotenv_loaded
+    if not _dotenv_loaded: # Read .env only when a real client is first needed.
+        from dotenv import load_dotenv # Imported lazily to keep startup fast.
+        load_dotenv() # Load environment variables from a .env file.
+        _dotenv_loaded = True
+    api_key = os.getenv("OPENAI_API_KEY") # Get API key from environment.
+    if not api_key: # Check if the API key is set.
+        raise ValueError("OPENAI_API_KEY environment variable not set.")
+    return api_key
+
+def require_api_key() -> None: # Fail before any work starts when LLM rules cannot run.
+    """Raise ValueError if no API key is configured (in the environment or a .env file)."""
+    _get_api_key()
+
+class UsageMixin: # Request and token accounting shared by the LLM clients.
+    profiler = None # Optional Profiler receiving one "llm" event per query.
+
+    def _record_usage(self, response) -> Tuple[int, int]: # Add a response's token usage to the totals.
+        usage = getattr(response, "usage", None) # Usage may be missing on some backends.
+        if usage is None:
+            return 0, 0
+        prompt_tokens, completion_tokens = usage.prompt_tokens or 0, usage.completion_tokens or 0
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return prompt_tokens, completion_tokens
+
+    def _profile(self, start: float, attempt_seconds: List[float], tokens: Tuple[int, int], ok: bool) -> None: # Report a finished query.
+        if self.profiler is not None:
+            self.profiler.record({
+                "event": "llm",
+                "model": self.model,
+                "seconds": time.perf_counter() - start,
+                "attempt_seconds": attempt_seconds,
+                "retries": len(attempt_seconds) - 1,
+                "prompt_tokens": tokens[0],
+                "completion_tokens": tokens[1],
+                "ok": ok,
+            })
+
+    def usage(self) -> dict: # Totals for reporting.
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+class LLMClient(UsageMixin): # A client to interact with the Language Model.
+    def __init__(self, client=None): # Initialize the LLMClient.
+        self.model = DEFAULT_MODEL # Model name sent with every request.
+        self.temperature = DEFAULT_TEMPERATURE # Sampling temperature sent with every request.
+        self.requests = 0 # Number of requests sent.
+        self.prompt_tokens = 0 # Prompt tokens reported by the API.
+        self.completion_tokens = 0 # Completion tokens reported by the API.
+        self._client = client # The underlying chat completions client, built on first use unless injected.
+
+    @property
+    def client(self): # The OpenAI client, created (and openai imported) on first use.
+        if self._client is None:
+            from openai import OpenAI # Imported lazily so runs without LLM rules never load it.
+            self._client = OpenAI(api_key=_get_api_key()) # Instantiate the OpenAI client.
+        return self._client
 
     def query(self, system_prompt: str, user_prompt: str) -> str: # Query the LLM with given prompts.
+        client = self.client # A missing API key raises here rather than becoming an error verdict.
+        self.requests += 1 # Count the request.
+        start = time.perf_counter() # Start of the request, for profiling.
         try: # Try to get a response from the chat completion endpoint.
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo", # Specify the model to use.
+            response = client.chat.completions.create(
+                model=self.model, # Specify the model to use.
                 messages=[
                     {"role": "system", "content": system_prompt}, # Set the system's role and instructions.
                     {"role": "user", "content": user_prompt}, # Provide the user's content.
                 ],
-                temperature=0.0, # Set temperature to 0 for deterministic output.
+                temperature=self.temperature, # Set temperature to 0 for deterministic output.
             )
+            tokens = self._record_usage(response) # Track token usage.
+            self._profile(start, [time.perf_counter() - start], tokens, ok=True)
             return response.choices[0].message.content.strip() # Return the content of the first choice.
         except Exception as e: # Catch any exceptions during the API call.
-            return f"Error querying LLM: {e}" # Return an error message.
\ No newline at end of file
+            self._profile(start, [time.perf_counter() - start], (0, 0), ok=False)
+            return f"{ERROR_PREFIX}: {e}" # Return an error message.
+
+class AsyncLLMClient(UsageMixin): # An asyncio client with timeouts and retries for concurrent validation.
+    """Asynchronous LLM client with per-request timeouts and jittered retry on 429/5xx."""
+
+    def __init__(self, client=None, timeout: float = 60.0, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 max_in_flight: Optional[int] = None): # Initialize the AsyncLLMClient.
+        self.model = DEFAULT_MODEL # Model name sent with every request.
+        self.temperature = DEFAULT_TEMPERATURE # Sampling temperature sent with every request.
+        self.timeout = timeout # Seconds allowed for a single request attempt.
+        self.max_retries = max_retries # Number of retries after the first attempt.
+        self.backoff_base = backoff_base # Initial backoff delay in seconds.
+        self.backoff_max = backoff_max # Upper bound for a single backoff delay.
+        self.requests = 0 # Number of requests sent, including retries.
+        self.prompt_tokens = 0 # Prompt tokens reported by the API.
+        self.completion_tokens = 0 # Completion tokens reported by the API.
+        self._client = client # The underlying async chat completions client, built on first use unless injected.
+        self.max_in_flight = max_in_flight # Requests in flight at once across every caller (None is unlimited).
+        self._semaphore = None # (loop, size, semaphore) enforcing max_in_flight on the running loop.
+
+    @property
+    def client(self): # The AsyncOpenAI client, created (and openai imported) on first use.
+        if self._client is None:
+            from openai import AsyncOpenAI # Imported lazily so runs without LLM rules never load it.
+            self._client = AsyncOpenAI(api_key=_get_api_key(), max_retries=0) # Retries are handled here, not by the SDK.
+        return self._client
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool: # Decide whether a failed request should be retried.
+        if isinstance(error, asyncio.TimeoutError): # Timeouts.
+            return True
+        if type(error).__module__.startswith("openai"): # Dropped connections; openai is loaded if it raised this.
+            from openai import APIConnectionError
+            if isinstance(error, APIConnectionError):
+                return True
+        return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES # Rate limits and server errors.
+
+    def backoff_delay(self, attempt: int) -> float: # Compute the delay before the next attempt.
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt)) # Exponential growth, capped.
+        return random.uniform(0, ceiling) # Full jitter spreads retries from concurrent requests.
+
+    def _slot(self): # Context manager holding one of the max_in_flight request slots.
+        if self.max_in_flight is None:
+            return contextlib.nullcontext()
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[:2] != (loop, self.max_in_flight): # A semaphore serves one loop.
+            self._semaphore = (loop, self.max_in_flight, asyncio.Semaphore(self.max_in_flight))
+        return self._semaphore[2]
+
+    async def query(self, system_prompt: str, user_prompt: str) -> str: # Query the LLM with given prompts.
+        client = self.client # A missing API key raises here rather than becoming an error verdict.
+        attempt = 0 # Number of retries performed so far.
+        start = time.perf_counter() # Start of the query, for profiling.
+        attempt_seconds = [] # Latency of each attempt.
+        while True: # Retry until success or the retry budget is exhausted.
+            self.requests += 1 # Count every attempt, including retries.
+            attempt_start = time.perf_counter()
+            try: # Try to get a response from the chat completion endpoint.
+                async with self._slot(): # Held per attempt, so backoff sleeps free the slot.
+                    attempt_start = time.perf_counter() # Waiting for a slot is not request latency.
+                    response = await asyncio.wait_for(
+                        client.chat.completions.create(
+                            model=self.model, # Specify the model to use.
+                            messages=[
+                                {"role": "system", "content": system_prompt}, # Set the system's role and instructions.
+                                {"role": "user", "content": user_prompt}, # Provide the user's content.
+                            ],
+                            temperature=self.temperature, # Set temperature to 0 for deterministic output.
+                        ),
+                        timeout=self.timeout, # Per-request timeout.
+                    )
+                attempt_seconds.append(time.perf_counter() - attempt_start)
+                tokens = self._record_usage(response) # Track token usage.
+                self._profile(start, attempt_seconds, tokens, ok=True)
+                return response.choices[0].message.content.strip() # Return the content of the first choice.
+            except Exception as e: # Catch any exceptions during the API call.
+                attempt_seconds.append(time.perf_counter() - attempt_start)
+                if attempt >= self.max_retries or not self.is_retryable(e): # Give up on fatal errors or exhausted budget.
+                    self._profile(start, attempt_seconds, (0, 0), ok=False)
+                    return f"{ERROR_PREFIX}: {e!r}" # Return an error message, like the sync client.
+                await asyncio.sleep(self.backoff_delay(attempt)) # Wait before retrying.
+                attempt += 1 # Count the retry.
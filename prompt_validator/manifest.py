@@ -0,0 +1,148 @@
+# File: prompt_validator/manifest.py
+import os # Import os for file metadata and paths.
+import sys # Import sys to find the modules a rule depends on.
+import json # Import json to persist the manifest.
+import hashlib # Import hashlib for content and rule hashes.
+import inspect # Import inspect to locate rule sources.
+import subprocess # Import subprocess to ask git for changed files.
+from typing import List, Dict, Optional, Set, Sequence, Tuple # Import typing hints.
+from .fixes import write_atomic # Import the atomic file writer.
+
+MANIFEST_FILENAME = ".prompt-validator-manifest.json" # Default manifest name inside the scanned directory.
+
+def content_hash(content: str) -> str: # Hash of a prompt's text.
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def file_fingerprint(file_path: str) -> Optional[Tuple[int, int]]: # Size and modification time of a file, if it exists.
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+PACKAGE = __name__.split(".")[0] # Modules of this package that rules import count as rule source.
+
+def rule_source_files(rule) -> List[str]: # Source files of a rule's module and the package modules it uses.
+    """Return, sorted, the rule's own source file plus every module of this package it imports, transitively."""
+    pending, seen, files = [type(rule).__module__], set(), set()
+    while pending:
+        module = sys.modules.get(pending.pop())
+        if module is None or module.__name__ in seen:
+            continue
+        seen.add(module.__name__)
+        try:
+            files.add(inspect.getsourcefile(module))
+        except TypeError: # Built-in or frozen module.
+            pass
+        for value in vars(module).values(): # Imported modules, functions and classes.
+            name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+            if isinstance(name, str) and name.split(".")[0] == PACKAGE and name not in seen:
+                pending.append(name)
+    return sorted(path for path in files if path)
+
+def rules_version(rules: Sequence) -> str: # Hash identifying the behaviour of a rule set.
+    """Changes whenever the selected rules, their source code (helper modules included), their settings or the LLM model change."""
+    digest = hashlib.sha256()
+    for rule in rules:
+        digest.update(rule.rule_id.encode("utf-8"))
+        for path in rule_source_files(rule): # Any edit to a rule or a helper it uses (e.g. similarity.py) invalidates its verdicts.
+            try:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            except OSError: # Source unavailable (e.g. frozen builds); fall back to settings only.
+                pass
+        settings = {name: repr(value) for name, value in vars(type(rule)).items() if name.isupper()} # e.g. SYSTEM_PROMPT.
+        if getattr(rule, "similarity_threshold", None) is not None: # The pre-filter decides what the LLM sees.
+            settings["similarity_threshold"] = repr(rule.similarity_threshold)
+        if getattr(rule, "max_chunk_tokens", None) is not None: # Chunking changes what each request sees.
+            settings["chunking"] = repr((rule.max_chunk_tokens, rule.chunk_overlap_tokens))
+        client = getattr(rule, "llm_client", None) # Semantic verdicts also depend on the model.
+        if client is not None:
+            settings["model"] = repr((getattr(client, "model", None), getattr(client, "temperature", None)))
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+def git_changed_files(directory: str, ref: str) -> Set[str]: # Files under directory that differ from a git ref.
+    try:
+        output = subprocess.run(
+            ["git", "diff", "--name-only", "--relative", ref, "--", "."],
+            cwd=directory, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e: # Not a repository, unknown ref, or git missing.
+        detail = getattr(e, "stderr", "") or str(e)
+        raise RuntimeError(f"Could not list files changed since '{ref}': {detail.strip()}") from e
+    return {os.path.abspath(os.path.join(directory, line)) for line in output.splitlines() if line.strip()}
+
+class Manifest: # Per-file state from the previous run, used to skip unchanged files.
+    """Stores (size, mtime, content hash, rules version, issues) per file, keyed relative to the manifest."""
+
+    VERSION = 1 # Format version; manifests of another version are ignored.
+
+    def __init__(self, path: str, entries: Optional[Dict[str, Dict]] = None): # Initialize the manifest.
+        self.path = path # Location of the manifest file.
+        self.base_dir = os.path.dirname(os.path.abspath(path)) # Keys are relative to this directory.
+        self.entries = entries or {} # key -> stored file state.
+        self.reused = 0 # Files whose stored issues were reused this run.
+
+    @classmethod
+    def load(cls, path: str) -> "Manifest": # Read a manifest, starting empty if it is missing or unreadable.
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != cls.VERSION:
+            return cls(path)
+        return cls(path, data.get("files", {}))
+
+    def _key(self, file_path: str) -> str: # Portable key for a file.
+        return os.path.relpath(os.path.abspath(file_path), self.base_dir).replace(os.sep, "/")
+
+    def lookup(self, file_path: str, version: str) -> Optional[List[Dict]]: # Stored issues if still valid.
+        """Return the stored issues when the file and rules are unchanged, else None.
+
+        Size and mtime are checked first; when they differ the content hash decides.
+        """
+        entry = self.entries.get(self._key(file_path))
+        if entry is None or entry.get("rules_version") != version: # New file or different rules.
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]: # Fast path: metadata unchanged.
+            self.reused += 1
+            return entry["issues"]
+        try: # Metadata changed (e.g. fresh checkout); compare content.
+            with open(file_path, 'r', encoding='utf-8') as f:
+                digest = content_hash(f.read())
+        except (OSError, UnicodeDecodeError):
+            return None
+        if digest != entry["sha256"]:
+            return None
+        entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns # Refresh metadata for the next run.
+        self.reused += 1
+        return entry["issues"]
+
+    def record(self, file_path: str, issues: List[Dict], version: str,
+               fingerprint: Optional[Tuple[int, int]], digest: Optional[str]) -> None: # Store a file's state.
+        """Store the issues found in the content whose hash is `digest`.
+
+        `fingerprint` must be taken before that content was read: if the file was edited during
+        validation, the stored metadata no longer matches and the next run compares hashes instead.
+        """
+        if fingerprint is None or digest is None or any(issue.get("type") == "FILE_ERROR" for issue in issues):
+            self.entries.pop(self._key(file_path), None) # Unreadable files are revalidated next time.
+            return
+        self.entries[self._key(file_path)] = {
+            "size": fingerprint[0],
+            "mtime_ns": fingerprint[1],
+            "sha256": digest,
+            "rules_version": version,
+            "issues": issues,
+        }
+
+    def save(self) -> None: # Atomically write the manifest, dropping files that no longer exist.
+        self.entries = {key: entry for key, entry in self.entries.items()
+                        if os.path.exists(os.path.join(self.base_dir, key))}
+        write_atomic(self.path, json.dumps({"version": self.VERSION, "files": self.entries})) # Readers never see a half-written manifest.
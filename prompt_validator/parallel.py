@@ -0,0 +1,68 @@
+# File: prompt_validator/parallel.py
+import os # Import os to size the worker pool.
+from itertools import islice # Import islice to cut the path stream into chunks.
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait, as_completed # Import the process pool.
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional, Callable # Import typing hints.
+from .manifest import file_fingerprint, content_hash # Import file-state helpers for incremental runs.
+
+_worker_validator = None # Validator instance owned by each worker process.
+_worker_events: List[Dict] = [] # Profiling events recorded since the last chunk was returned.
+
+def _init_worker(rule_ids: List[str], profile: bool = False) -> None: # Build the worker's validator once.
+    global _worker_validator
+    from .validator import PromptValidator # Imported here so the parent does not pay for it twice.
+    from .profiling import Profiler # Workers only collect events; the parent aggregates them.
+    profiler = Profiler(hooks=[_worker_events.append]) if profile else None
+    _worker_validator = PromptValidator(rule_ids=rule_ids, profiler=profiler)
+
+def _validate_chunk(file_paths: List[str], with_state: bool = False) -> Tuple[List[Tuple], List[Dict]]: # Validate a chunk of files in a worker.
+    results = []
+    for file_path in file_paths:
+        fingerprint = file_fingerprint(file_path) if with_state else None # Taken before the file is read.
+        content, issues = _worker_validator.validate_file(file_path)
+        results.append((file_path, issues, (fingerprint, content_hash(content))) if with_state else (file_path, issues))
+    events = list(_worker_events) # Ship this chunk's profiling events back with its results.
+    _worker_events.clear()
+    return results, events
+
+def _chunks(file_paths: Iterable[str], chunk_size: int) -> Iterator[List[str]]: # Lazily split paths into chunks.
+    iterator = iter(file_paths)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_validate_parallel(file_paths: Iterable[str], rule_ids: List[str], workers: Optional[int] = None,
+                           chunk_size: int = 64,
+                           on_event: Optional[Callable[[Dict], None]] = None,
+                           with_state: bool = False) -> Iterator[Tuple]: # Stream results from a process pool.
+    """Validate files in worker processes, keeping at most two chunks per worker in flight.
+
+    Paths are consumed lazily and results are yielded as chunks finish, so the parent's memory
+    stays flat regardless of corpus size. Results arrive in completion order. When `on_event` is
+    given, workers profile their rules and the events are passed to it in the parent process. With
+    `with_state`, each result also carries the (fingerprint, digest) the manifest records.
+    """
+    workers = workers or os.cpu_count() or 1 # Default to one worker per core.
+    max_pending = workers * 2 # Enough queued work to keep every worker busy.
+    chunks = _chunks(file_paths, chunk_size)
+    def collect(future) -> List[Tuple]: # Unpack a finished chunk, replaying its events.
+        results, events = future.result()
+        if on_event is not None:
+            for event in events:
+                on_event(event)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(rule_ids, on_event is not None)) as executor:
+        pending = set() # Chunks submitted but not yet collected.
+        for chunk in chunks: # Top the queue up, then drain whatever has finished.
+            pending.add(executor.submit(_validate_chunk, chunk, with_state))
+            if len(pending) < max_pending:
+                continue
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from collect(future)
+        for future in as_completed(pending): # Drain the tail of the stream as chunks finish.
+            yield from collect(future)
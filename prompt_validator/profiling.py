@@ -0,0 +1,99 @@
+# File: prompt_validator/profiling.py
+import math # Import math for percentile ranks.
+import time # Import time for wall-clock measurements.
+from contextlib import contextmanager # Import contextmanager for timing blocks.
+from typing import List, Dict, Callable, Iterable, Optional # Import typing hints.
+
+Hook = Callable[[Dict], None] # Receives every event as it is recorded, e.g. to export metrics.
+
+def percentiles(values: List[float]) -> Dict: # Count, total and nearest-rank percentiles of a sample.
+    if not values:
+        return {"count": 0, "total": 0.0}
+    ordered = sorted(values)
+    def rank(p): # Nearest-rank percentile.
+        return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+    return {
+        "count": len(ordered),
+        "total": round(sum(ordered), 6),
+        "mean": round(sum(ordered) / len(ordered), 6),
+        "p50": round(rank(50), 6),
+        "p95": round(rank(95), 6),
+        "p99": round(rank(99), 6),
+        "max": round(ordered[-1], 6),
+    }
+
+class Profiler: # Collects timing and LLM usage events for a run.
+    """Records per-rule and per-file wall time and per-query LLM latency, tokens and retries.
+
+    Events are plain dicts with an "event" key ("rule", "file" or "llm"); every hook sees each
+    event as it is recorded. summary() aggregates totals and p50/p95/p99 for the report.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = (), prompt_price_per_1k: Optional[float] = None,
+                 completion_price_per_1k: Optional[float] = None): # Initialize an empty profile.
+        self.hooks: List[Hook] = list(hooks) # Exporters called with every event.
+        self.prompt_price_per_1k = prompt_price_per_1k # Price of 1,000 prompt tokens, for cost estimates.
+        self.completion_price_per_1k = completion_price_per_1k # Price of 1,000 completion tokens.
+        self.rule_seconds: Dict[str, List[float]] = {} # rule_id -> wall time per file.
+        self.file_seconds: List[float] = [] # Wall time per file.
+        self.llm_seconds: List[float] = [] # Wall time per query, including retries and backoff.
+        self.attempt_seconds: List[float] = [] # Latency of every request attempt.
+        self.llm_queries = 0 # Queries made.
+        self.llm_retries = 0 # Attempts beyond the first.
+        self.llm_errors = 0 # Queries that failed after all attempts.
+        self.prompt_tokens = 0 # Prompt tokens reported by the API.
+        self.completion_tokens = 0 # Completion tokens reported by the API.
+
+    def add_hook(self, hook: Hook) -> None: # Register an exporter.
+        self.hooks.append(hook)
+
+    def record(self, event: Dict) -> None: # Aggregate one event and pass it to the hooks.
+        kind = event["event"]
+        if kind == "rule":
+            self.rule_seconds.setdefault(event["rule_id"], []).append(event["seconds"])
+        elif kind == "file":
+            self.file_seconds.append(event["seconds"])
+        elif kind == "llm":
+            self.llm_queries += 1
+            self.llm_seconds.append(event["seconds"])
+            self.attempt_seconds.extend(event.get("attempt_seconds", ()))
+            self.llm_retries += event.get("retries", 0)
+            self.llm_errors += 0 if event.get("ok", True) else 1
+            self.prompt_tokens += event.get("prompt_tokens", 0)
+            self.completion_tokens += event.get("completion_tokens", 0)
+        for hook in self.hooks:
+            hook(event)
+
+    @contextmanager
+    def timer(self, event: str, **fields): # Record the wall time of a block as an event.
+        start = time.perf_counter()
+        try:
+            yield fields # Callers may add fields (e.g. an issue count) before the block ends.
+        finally:
+            self.record(dict(fields, event=event, seconds=time.perf_counter() - start))
+
+    def cost(self) -> Optional[float]: # Estimated LLM spend, when prices are known.
+        if self.prompt_price_per_1k is None and self.completion_price_per_1k is None:
+            return None
+        return round(self.prompt_tokens / 1000 * (self.prompt_price_per_1k or 0.0)
+                     + self.completion_tokens / 1000 * (self.completion_price_per_1k or 0.0), 6)
+
+    def summary(self) -> Dict: # Totals and percentiles for the report.
+        summary = {
+            "files": percentiles(self.file_seconds),
+            "rules": {rule_id: percentiles(seconds) for rule_id, seconds in self.rule_seconds.items()},
+        }
+        if self.llm_queries:
+            summary["llm"] = {
+                "queries": self.llm_queries,
+                "retries": self.llm_retries,
+                "errors": self.llm_errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "query_seconds": percentiles(self.llm_seconds),
+                "attempt_seconds": percentiles(self.attempt_seconds),
+            }
+            cost = self.cost()
+            if cost is not None:
+                summary["llm"]["estimated_cost"] = cost
+        return summary
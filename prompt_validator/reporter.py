@@ -1,31 +1,134 @@
 # File: prompt_validator/reporter.py
+import sys # Import sys to write streamed JSON output.
 import json # Import the json module for JSON output.
-from typing import Dict, List # Import typing hints.
-from rich.console import Console # Import Console for rich text output.
-from rich.table import Table # Import Table for creating tables.
+from typing import Dict, List, Optional, TYPE_CHECKING # Import typing hints.
 
-def generate_report(results: Dict[str, List[Dict]], report_format: str): # Generate a report of validation results.
+if TYPE_CHECKING: # rich is imported only when a table is rendered, keeping JSON runs and startup light.
+    from rich.console import Console
+    from rich.table import Table
+
+def _console() -> "Console": # Create a Rich console instance.
+    from rich.console import Console # Imported lazily; rich is slow to import.
+    return Console()
+
+def _table(title: str) -> "Table": # Create an empty Rich table.
+    from rich.table import Table # Imported lazily; rich is slow to import.
+    return Table(title=title)
+
+def _flatten_stats(stats: Dict, prefix: str = "") -> List[tuple]: # Flatten nested run statistics into rows.
+    rows = [] # Initialize the list of (name, value) rows.
+    for key, value in stats.items(): # Iterate over each statistic.
+        name = f"{prefix}{key}" # Qualify nested names with their section.
+        if isinstance(value, dict): # Recurse into nested sections.
+            rows.extend(_flatten_stats(value, prefix=f"{name}."))
+        else:
+            rows.append((name, value))
+    return rows
+
+def _print_profile(console: "Console", profile: Dict): # Print timing percentiles, one row per measured scope.
+    table = _table("Profile (milliseconds)") # Create a table for the timings.
+    table.add_column("Scope", style="cyan") # Add a column for what was timed.
+    for column in ("count", "total", "mean", "p50", "p95", "p99", "max"): # Add one column per aggregate.
+        table.add_column(column, style="green", justify="right")
+    scopes = [("file", profile.get("files", {}))] # Whole files first, then each rule, then the LLM.
+    scopes += [(f"rule {rule_id}", timings) for rule_id, timings in profile.get("rules", {}).items()]
+    llm = profile.get("llm", {})
+    if llm:
+        scopes += [("llm query", llm["query_seconds"]), ("llm attempt", llm["attempt_seconds"])]
+    for scope, timings in scopes: # Add one row per scope.
+        if timings.get("count"):
+            table.add_row(scope, str(timings["count"]),
+                          *(f"{timings[column] * 1000:.2f}" for column in ("total", "mean", "p50", "p95", "p99", "max")))
+    console.print(table) # Print the profile table.
+
+def _print_stats(console: "Console", stats: Optional[Dict]): # Print run statistics below the issue table.
+    if not stats: # Nothing to report.
+        return
+    profile = stats.get("profile") # Timings get their own table.
+    stats = {key: value for key, value in stats.items() if key != "profile"}
+    if profile and profile.get("llm"): # LLM totals stay in the statistics table.
+        stats["profile"] = {"llm": {key: value for key, value in profile["llm"].items() if not key.endswith("_seconds")}}
+    if stats:
+        table = _table("Run Statistics") # Create a table for the statistics.
+        table.add_column("Metric", style="cyan") # Add a column for the metric name.
+        table.add_column("Value", style="green", justify="right") # Add a column for the metric value.
+        for name, value in _flatten_stats(stats): # Add one row per metric.
+            table.add_row(name, str(value))
+        console.print(table) # Print the statistics table.
+    if profile:
+        _print_profile(console, profile)
+
+def _issue_table() -> "Table": # Create the issue table with its columns.
+    table = _table("Prompt Validation Report") # Create a table with a title.
+    table.add_column("File Path", style="cyan", no_wrap=True) # Add a column for the file path.
+    table.add_column("Issue Type", style="magenta") # Add a column for the issue type.
+    table.add_column("Message", style="red") # Add a column for the issue message.
+    table.add_column("Suggestion", style="yellow") # Add a column for the suggested fix.
+    return table
+
+def _add_issue_rows(table: "Table", file_path: str, issues: List[Dict]): # Add one row per issue.
+    for issue in issues: # Iterate over each issue.
+        table.add_row( # Add a row to the table with issue details.
+            file_path,
+            issue.get('type', 'N/A'),
+            issue.get('message', 'N/A'),
+            issue.get('suggestion', 'N/A')
+        )
+
+class StreamingReporter: # Report results incrementally as files finish validating.
+    """Incremental reporter: JSON entries are written as they arrive; table rows are rendered at the end.
+
+    The JSON output always has the form {"results": {...}, "stats": {...}}.
+    """
+
+    def __init__(self, report_format: str, stream=None): # Initialize the reporter.
+        self.report_format = report_format # 'table' or 'json'.
+        self.stream = stream or sys.stdout # Destination of JSON output.
+        self.file_count = 0 # Files with issues reported so far.
+        self._table = _issue_table() if report_format == 'table' else None # Table rows, rendered by finish().
+        if report_format == 'json': # Open the results object straight away.
+            self.stream.write('{\n  "results": {')
+
+    def add(self, file_path: str, issues: List[Dict]): # Report the issues of one file.
+        if not issues: # Only files with issues appear in the report.
+            return
+        if self.report_format == 'json':
+            body = json.dumps(issues, indent=2).replace("\n", "\n    ") # Indent to the entry's depth.
+            self.stream.write(("," if self.file_count else "") + f"\n    {json.dumps(file_path)}: {body}")
+            self.stream.flush()
+        elif self._table is not None:
+            _add_issue_rows(self._table, file_path, issues)
+        self.file_count += 1
+
+    def finish(self, stats: Optional[Dict] = None): # Close the report and print run statistics.
+        if self.report_format == 'json':
+            body = json.dumps(stats or {}, indent=2).replace("\n", "\n  ")
+            self.stream.write(("\n  }" if self.file_count else "}") + f',\n  "stats": {body}\n}}\n')
+            self.stream.flush()
+        elif self._table is not None:
+            console = _console() # Create a Rich console instance.
+            if self.file_count:
+                console.print(self._table) # Print the formatted table to the console.
+            else:
+                console.print("[green]✓ All prompts passed validation.[/green]") # Print a success message.
+            _print_stats(console, stats) # Print run statistics, if any.
+
+def generate_report(results: Dict[str, List[Dict]], report_format: str, stats: Optional[Dict] = None): # Generate a report of validation results.
     if report_format == 'json': # Check if the requested format is JSON.
-        print(json.dumps(results, indent=2)) # Print the results as a formatted JSON string.
+        if stats: # Wrap the results when run statistics are included.
+            print(json.dumps({"results": results, "stats": stats}, indent=2))
+        else:
+            print(json.dumps(results, indent=2)) # Print the results as a formatted JSON string.
     elif report_format == 'table': # Check if the requested format is a table.
-        console = Console() # Create a Rich console instance.
+        console = _console() # Create a Rich console instance.
         if not any(results.values()): # Check if there are any issues to report.
             console.print("[green]✓ All prompts passed validation.[/green]") # Print a success message.
+            _print_stats(console, stats) # Print run statistics, if any.
             return # Exit the function.
 
-        table = Table(title="Prompt Validation Report") # Create a table with a title.
-        table.add_column("File Path", style="cyan", no_wrap=True) # Add a column for the file path.
-        table.add_column("Issue Type", style="magenta") # Add a column for the issue type.
-        table.add_column("Message", style="red") # Add a column for the issue message.
-        table.add_column("Suggestion", style="yellow") # Add a column for the suggested fix.
-
+        table = _issue_table() # Create a table with a title.
         for file_path, issues in results.items(): # Iterate over each file and its issues.
             if issues: # If there are issues for the file.
-                for issue in issues: # Iterate over each issue.
-                    table.add_row( # Add a row to the table with issue details.
-                        file_path,
-                        issue.get('type', 'N/A'),
-                        issue.get('message', 'N/A'),
-                        issue.get('suggestion', 'N/A')
-                    )
-        console.print(table) # Print the formatted table to the console.
\ No newline at end of file
+                _add_issue_rows(table, file_path, issues)
+        console.print(table) # Print the formatted table to the console.
+        _print_stats(console, stats) # Print run statistics, if any.
\ No newline at end of file
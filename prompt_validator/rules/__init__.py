@@ -9,4 +9,7 @@ ALL_RULES = [
     PIIRule,
     RedundancyRule,
     ContradictionRule,
-]
\ No newline at end of file
+]
+
+# Rules that run without an LLM, for offline scans.
+LOCAL_RULES = [Rule for Rule in ALL_RULES if not Rule.requires_llm]
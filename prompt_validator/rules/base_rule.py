@@ -1,9 +1,11 @@
 # File: prompt_validator/rules/base_rule.py
 from abc import ABC, abstractmethod # Import Abstract Base Class components.
 from typing import List, Dict, Optional # Import typing hints.
+from ..fixes import FixPlan # Import the single-pass fix plan.
 
 class ValidationRule(ABC): # Define the abstract base class for all validation rules.
     """Abstract base class for a validation rule."""
+    requires_llm = False # Whether the rule needs an LLM (local rules can run offline).
 
     @property
     @abstractmethod
@@ -21,4 +23,8 @@ class ValidationRule(ABC): # Define the abstract base class for all validation r
 
     @abstractmethod
     def fix(self, content: str, issue: Dict) -> str: # Abstract method to apply a fix.
-        pass
\ No newline at end of file
+        pass
+
+    def plan_fix(self, content: str, issue: Dict, plan: FixPlan) -> bool: # Add this issue's fix to a plan as offset edits.
+        """Return False when the fix cannot be expressed as edits; fix() is then applied afterwards."""
+        return False
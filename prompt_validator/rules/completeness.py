@@ -1,7 +1,9 @@
 # File: prompt_validator/rules/completeness.py
 import re # Import the regular expressions module.
-from typing import List, Dict # Import typing hints.
+from functools import lru_cache # Import lru_cache to memoize the compiled header pattern.
+from typing import List, Dict, Tuple # Import typing hints.
 from .base_rule import ValidationRule # Import the base rule class.
+from ..fixes import FixPlan # Import the single-pass fix plan.
 
 class CompletenessRule(ValidationRule): # Rule to check for required sections in a prompt.
     """Checks if the prompt contains all required sections."""
@@ -10,12 +12,23 @@ class CompletenessRule(ValidationRule): # Rule to check for required sections in
 
     REQUIRED_SECTIONS = ["Task", "Success Criteria", "Examples"] # List of mandatory section titles.
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile(sections: Tuple[str, ...]) -> "re.Pattern": # One pattern matching any required section header.
+        # Looks for a section as a whole word, followed by optional colon or end of line.
+        names = "|".join(re.escape(section) for section in sections)
+        return re.compile(fr"^\s*#+\s*({names})(\s*:|\s*$)", re.IGNORECASE | re.MULTILINE)
+
     def validate(self, content: str) -> List[Dict]: # Validate the prompt's content.
+        wanted = {section.lower(): section for section in self.REQUIRED_SECTIONS} # Sections not seen yet.
+        for match in self._compile(tuple(self.REQUIRED_SECTIONS)).finditer(content): # Single pass over all headers.
+            wanted.pop(match.group(1).lower(), None)
+            if not wanted: # Stop as soon as every section has been seen.
+                break
+
         issues = [] # Initialize an empty list to store found issues.
-        for section in self.REQUIRED_SECTIONS: # Iterate over each required section.
-            # Updated regex: looks for the section as a whole word, followed by optional colon or end of line.
-            pattern = fr"^\s*#+\s*{re.escape(section)}(\s*:|\s*$)"
-            if not re.search(pattern, content, re.IGNORECASE | re.MULTILINE):
+        for section in self.REQUIRED_SECTIONS: # Report in the declared section order.
+            if section.lower() in wanted:
                 issues.append({ # Append an issue if a section is missing.
                     "type": self.rule_id,
                     "message": f"Missing required section: '{section}'.",
@@ -29,4 +42,10 @@ class CompletenessRule(ValidationRule): # Rule to check for required sections in
         if missing_section: # Check if the missing section name is available.
             # Append a template for the missing section to the content.
             return content.strip() + f"\n\n## {missing_section}:\n- [Add details here]\n"
-        return content # Return original content if no section name found.
\ No newline at end of file
+        return content # Return original content if no section name found.
+
+    def plan_fix(self, content: str, issue: Dict, plan: FixPlan) -> bool: # Append the section template.
+        missing_section = issue.get("details", {}).get("missing_section")
+        if missing_section:
+            plan.append(f"## {missing_section}:\n- [Add details here]")
+        return True
@@ -1,7 +1,11 @@
 # File: prompt_validator/rules/pii.py
 import re # Import the regular expressions module.
-from typing import List, Dict # Import typing hints.
+from functools import lru_cache # Import lru_cache to memoize compiled scanners.
+from typing import List, Dict, Tuple, Iterator, Optional # Import typing hints.
 from .base_rule import ValidationRule # Import the base rule class.
+from ..fixes import FixPlan # Import the single-pass fix plan.
+
+SECRET_PREFIXES = ("sk", "rk", "ghp", "xoxp", "xoxb", "slack", "token", "key", "secret") # Known secret prefixes.
 
 class PIIRule(ValidationRule): # Rule to detect Personally Identifiable Information (PII).
     """Detects PII and secrets in the prompt."""
@@ -12,26 +16,156 @@ class PIIRule(ValidationRule): # Rule to detect Personally Identifiable Informat
     PII_PATTERNS = {
         "EMAIL": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
         "PHONE_NUMBER": r'\b(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b',
-        "GENERIC_SECRET": r'\b(sk|rk|ghp|xoxp|xoxb|slack|token|key|secret)_[a-zA-Z0-9]{20,}\b',
+        "GENERIC_SECRET": r'\b(' + '|'.join(SECRET_PREFIXES) + r')_[a-zA-Z0-9]{20,}\b',
+    }
+
+    # Literals every match of a pattern must contain; a pattern is skipped when none are present.
+    PREFILTER_LITERALS = {
+        "EMAIL": ("@",),
+        "PHONE_NUMBER": tuple("0123456789"),
+        "GENERIC_SECRET": tuple(f"{prefix}_" for prefix in SECRET_PREFIXES),
+    }
+
+    # Character class holding a character that appears on the first line of every match of a pattern.
+    # A type without an entry disables the line prefilter; the whole text is then one region.
+    TRIGGER_CHARS = {
+        "EMAIL": "@",
+        "PHONE_NUMBER": "0-9",
+        "GENERIC_SECRET": "_",
     }
+    # Character class of every character a match of a pattern can start with.
+    # A type without an entry can start anywhere, so the scanner drops its leading character check.
+    FIRST_CHARS = {
+        "EMAIL": r"A-Za-z0-9._%+\-",
+        "PHONE_NUMBER": r"+(0-9",
+        "GENERIC_SECRET": "a-z",
+    }
+    WINDOW_LINES = 3 # Lines a match may wrap onto after its first line (a phone number has three separators).
+    DENSE_WINDOW_CHARS = 65536 # Once a region grows this large, triggers are dense and the rest is scanned whole.
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile(patterns: Tuple[Tuple[str, str], ...], first_chars: Optional[str]) -> "re.Pattern": # Combine patterns into one named alternation.
+        bounded = all(pattern.startswith(r"\b") for _, pattern in patterns) # Test a shared leading \b once, not per alternative.
+        alternation = "|".join(f"(?P<{pii_type}>{pattern[2:] if bounded else pattern})" for pii_type, pattern in patterns)
+        prefix = (f"(?=[{first_chars}])" if first_chars else "") + (r"\b" if bounded else "") # A leading character class lets the engine skip ahead quickly.
+        return re.compile(f"{prefix}(?:{alternation})")
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile_single(pattern: str) -> "re.Pattern": # One PII type's own pattern.
+        return re.compile(pattern)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _compile_trigger(char_classes: Tuple[str, ...]) -> "re.Pattern": # One character class of every trigger.
+        return re.compile(f"[{''.join(char_classes)}]")
+
+    def _active(self, content: str) -> Tuple[str, ...]: # PII types that can possibly match the content.
+        return tuple( # Cheap substring checks prune patterns before any regex work.
+            pii_type for pii_type in self.PII_PATTERNS
+            if any(literal in content for literal in self.PREFILTER_LITERALS.get(pii_type, ("",)))
+        )
+
+    def _scanner(self, active: Tuple[str, ...]) -> "re.Pattern": # Compiled single-pass scanner for the given PII types.
+        patterns = tuple((pii_type, self.PII_PATTERNS[pii_type]) for pii_type in active)
+        first_chars = [self.FIRST_CHARS.get(pii_type) for pii_type in active]
+        return self._compile(patterns, None if None in first_chars else "".join(first_chars))
+
+    def _trigger(self, active: Tuple[str, ...]) -> Optional["re.Pattern"]: # Line prefilter, if every active type has one.
+        char_classes = tuple(self.TRIGGER_CHARS.get(pii_type) for pii_type in active)
+        return None if None in char_classes else self._compile_trigger(char_classes)
+
+    def scanner(self, content: str): # Compiled scanner for the patterns that can match this content.
+        active = self._active(content)
+        return self._scanner(active) if active else None
+
+    def _windows(self, content: str, trigger: "re.Pattern") -> Iterator[Tuple[int, int]]: # Regions that can hold matches.
+        """Yield disjoint (start, end) line ranges covering every trigger line and the lines a match may wrap onto."""
+        pos, length = 0, len(content)
+        while True:
+            match = trigger.search(content, pos) # Fast character-class search for the next trigger.
+            if match is None:
+                return
+            start = content.rfind("\n", 0, match.start()) + 1 # Start of the trigger's line.
+            line_end = content.find("\n", match.start())
+            end = length if line_end == -1 else line_end + 1 # End of the trigger's line.
+            remaining = self.WINDOW_LINES # Continuation lines still to include.
+            while remaining and end < length: # Extend until WINDOW_LINES quiet lines follow the last trigger line.
+                line_end = content.find("\n", end)
+                line_end = length if line_end == -1 else line_end
+                remaining = self.WINDOW_LINES if trigger.search(content, end, line_end) else remaining - 1
+                end = min(line_end + 1, length)
+                if end - start > self.DENSE_WINDOW_CHARS: # Per-line checks no longer pay off.
+                    end = length
+            yield start, end
+            pos = end
+
+    def _findings(self, content: str, start: int, end: int, scanner: "re.Pattern",
+                  active: Tuple[str, ...]) -> Iterator[Tuple[str, "re.Match"]]: # Every match of every type in a region.
+        """Yield (pii_type, match) exactly as one finditer per type over the region would, from one combined scan.
+
+        The combined scan resumes one character after each match start instead of after its end, so it stops at
+        every position where any type matches, including a phone number inside an email. Only those positions
+        are tried against the other types' own patterns.
+        """
+        resume = dict.fromkeys(active, start) # Where each type's next non-overlapping match may begin.
+        match = scanner.search(content, start, end)
+        while match is not None:
+            position = match.start()
+            for pii_type in active:
+                if resume[pii_type] > position: # Inside this type's previous match.
+                    continue
+                found = match if match.group(pii_type) is not None else \
+                    self._compile_single(self.PII_PATTERNS[pii_type]).match(content, position, end)
+                if found is not None:
+                    yield pii_type, found
+                    resume[pii_type] = found.end() # Like finditer, resume after the match.
+            match = scanner.search(content, position + 1, end)
 
     def validate(self, content: str) -> List[Dict]: # Validate the content for PII.
+        active = self._active(content) # PII types that survive the literal prefilter.
+        if not active: # No pattern can possibly match.
+            return []
+        scanner = self._scanner(active) # Single-pass scanner.
+        trigger = self._trigger(active) # Line prefilter.
+        windows = self._windows(content, trigger) if trigger else [(0, len(content))] # Only lines that can hold a match are scanned.
         issues = [] # Initialize an empty list to store found issues.
-        for pii_type, pattern in self.PII_PATTERNS.items(): # Iterate over each PII pattern.
-            matches = re.finditer(pattern, content) # Find all matches for the current pattern.
-            for match in matches: # Iterate over each found match.
+        for start, end in windows:
+            for pii_type, match in self._findings(content, start, end, scanner, active):
                 issues.append({ # Append an issue for each PII instance found.
                     "type": self.rule_id,
                     "message": f"Potential PII detected: ({pii_type}) '{match.group(0)}'.",
                     "suggestion": "Remove or replace PII with a placeholder like [REDACTED].",
-                    "details": {"pii_type": pii_type, "value": match.group(0)}
+                    "details": {"pii_type": pii_type, "value": match.group(0), "span": [match.start(), match.end()]}
                 })
+        order = {pii_type: index for index, pii_type in enumerate(self.PII_PATTERNS)} # Report grouped by PII type.
+        issues.sort(key=lambda issue: (order[issue["details"]["pii_type"]], issue["details"]["span"][0])) # Text order within a type.
         return issues # Return the list of found issues.
 
+    @staticmethod
+    def _span(content: str, issue: Dict) -> Optional[Tuple[int, int]]: # The issue's span, if it still covers its value.
+        details = issue.get("details", {})
+        span = details.get("span")
+        if not span or not details.get("value"):
+            return None
+        start, end = span
+        return (start, end) if content[start:end] == details["value"] else None
+
     def fix(self, content: str, issue: Dict) -> str: # Apply a fix for a detected PII.
         pii_value = issue.get("details", {}).get("value") # Get the PII value from the issue details.
         pii_type = issue.get("details", {}).get("pii_type") # Get the PII type.
+        span = self._span(content, issue) # Redact only the matched span when it is still valid.
+        if span:
+            return content[:span[0]] + f"[REDACTED_{pii_type}]" + content[span[1]:]
         if pii_value: # Check if a PII value is present.
             # Replace the detected PII with a placeholder.
             return content.replace(pii_value, f"[REDACTED_{pii_type}]")
-        return content # Return original content if no PII value found.
\ No newline at end of file
+        return content # Return original content if no PII value found.
+
+    def plan_fix(self, content: str, issue: Dict, plan: FixPlan) -> bool: # Redact the matched span.
+        span = self._span(content, issue)
+        if span is None: # Issues without a usable span fall back to fix().
+            return False
+        plan.replace(span[0], span[1], f"[REDACTED_{issue['details'].get('pii_type')}]")
+        return True
@@ -1,16 +1,150 @@
 # File: prompt_validator/rules/semantic.py
-from typing import List, Dict # Import typing hints.
+import json # Import json to build issue keys for deduplication.
+import asyncio # Import asyncio to analyze chunks concurrently.
+from abc import abstractmethod # Import abstractmethod for the hooks subclasses must implement.
+from typing import List, Dict, Optional, Sequence # Import typing hints.
 from .base_rule import ValidationRule # Import the base rule class.
-from ..llm_client import LLMClient # Import the LLM client.
+from ..fixes import FixPlan # Import the single-pass fix plan.
+from ..llm_client import LLMClient, AsyncLLMClient, ERROR_PREFIX # Import the LLM clients.
+from ..cache import VerdictCache # Import the verdict cache.
+from ..similarity import redundancy_clusters # Import the local near-duplicate detector.
+from ..chunking import chunk_prompt, directive_digest, estimate_tokens, DEFAULT_OVERLAP_TOKENS # Import the prompt chunker.
 
 class SemanticRule(ValidationRule): # Base class for rules requiring LLM-based semantic analysis.
-    def __init__(self): # Initialize the semantic rule.
-        self.llm_client = LLMClient() # Create an instance of the LLM client.
+    requires_llm = True # Semantic rules query the LLM.
+    SYSTEM_PROMPT = "" # System prompt for the LLM, defined by subclasses.
+    BATCH_INSTRUCTION = "" # Description of this rule's per-prompt value in a batched JSON response.
+    def __init__(self, llm_client: Optional[LLMClient] = None,
+                 async_llm_client: Optional[AsyncLLMClient] = None,
+                 cache: Optional[VerdictCache] = None,
+                 max_chunk_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS): # Initialize the semantic rule.
+        self.llm_client = llm_client if llm_client is not None else LLMClient() # Use the shared client or create one.
+        self.async_llm_client = async_llm_client # Async client, created lazily on first async use.
+        self.cache = cache # Optional verdict cache consulted before querying the LLM.
+        self.llm_calls_avoided = 0 # Checks answered locally by prepare_content.
+        self.max_chunk_tokens = max_chunk_tokens # Larger texts are analyzed in chunks (None sends them whole).
+        self.chunk_overlap_tokens = chunk_overlap_tokens # Overlap between windows of an oversized section.
+
+    def cache_key(self, content: str, client, system_prompt: Optional[str] = None) -> str: # Key identifying this rule's verdict on the content.
+        """Key the verdict by the system prompt that produced it: SYSTEM_PROMPT, or a batched request's prompt."""
+        return VerdictCache.make_key(self.rule_id, system_prompt or self.SYSTEM_PROMPT, client.model, client.temperature, content)
+
+    def lookup(self, content: str, client, batch_prompts: Sequence[str] = ()) -> Optional[List[Dict]]: # Return a cached verdict, if any.
+        """Return a verdict from a single-prompt request, or from a batched request sent with one of `batch_prompts`."""
+        if self.cache is None:
+            return None
+        keys = [self.cache_key(content, client)] + [self.cache_key(content, client, prompt) for prompt in batch_prompts]
+        return self.cache.get_first(keys)
+
+    def store(self, content: str, client, issues: List[Dict], system_prompt: Optional[str] = None) -> None: # Cache a verdict.
+        if self.cache is not None:
+            self.cache.set(self.cache_key(content, client, system_prompt), issues)
+
+    def prepare_content(self, content: str) -> Optional[str]: # Text to send to the LLM for this content.
+        """Return the text the LLM should analyze, or None when the rule can already tell there are no issues."""
+        return content
+
+    def text_for_llm(self, content: str) -> Optional[str]: # Run prepare_content and count checks it made unnecessary.
+        text = self.prepare_content(content)
+        if text is None:
+            self.llm_calls_avoided += 1
+        return text
+
+    async def text_for_llm_async(self, content: str) -> Optional[str]: # text_for_llm without blocking the event loop.
+        text = await asyncio.to_thread(self.prepare_content, content) # A pre-filter is CPU-bound; other files' requests keep flowing.
+        if text is None:
+            self.llm_calls_avoided += 1
+        return text
+
+    def needs_chunking(self, text: str) -> bool: # Whether the text is too large for one request.
+        return self.max_chunk_tokens is not None and estimate_tokens(text) > self.max_chunk_tokens
+
+    def texts_to_analyze(self, text: str) -> List[str]: # Chunks of the text, plus any cross-chunk texts.
+        if not self.needs_chunking(text):
+            return [text]
+        chunks = chunk_prompt(text, self.max_chunk_tokens, self.chunk_overlap_tokens)
+        cross = self.cross_chunk_text(chunks) if len(chunks) > 1 else None
+        return chunks + (chunk_prompt(cross, self.max_chunk_tokens, self.chunk_overlap_tokens) if cross else [])
+
+    def cross_chunk_text(self, chunks: List[str]) -> Optional[str]: # Text for findings that span chunks.
+        """Return text to analyze alongside the chunks, or None when findings never span chunks."""
+        return None
+
+    def issue_key(self, issue: Dict) -> str: # Identity of an issue when merging chunk verdicts.
+        return json.dumps(issue.get("details"), sort_keys=True)
+
+    def merge_issues(self, verdicts: List[List[Dict]]) -> List[Dict]: # Combine chunk verdicts, dropping repeats.
+        merged = {} # issue_key -> first issue with that key, in chunk order.
+        for issues in verdicts:
+            for issue in issues:
+                merged.setdefault(self.issue_key(issue), issue)
+        return list(merged.values())
+
+    @abstractmethod
+    def parse_response(self, response: str) -> List[Dict]: # Turn a raw LLM response into issues.
+        pass
+
+    @abstractmethod
+    def issues_from_batch(self, value) -> List[Dict]: # Turn this rule's value from a batched response into issues.
+        pass
+
+    def _verdict(self, content: str, client, response: str) -> List[Dict]: # Parse a response and cache the verdict.
+        issues = self.parse_response(response) # Parse the response into issues.
+        if not response.startswith(ERROR_PREFIX): # Never cache failed queries.
+            self.store(content, client, issues)
+        return issues
+
+    def validate(self, content: str) -> List[Dict]: # Validate content with a blocking LLM call.
+        text = self.text_for_llm(content) # Only what the LLM needs to see.
+        if text is None:
+            return []
+        return self.analyze_text(text)
+
+    def analyze_text(self, text: str) -> List[Dict]: # Cached verdict on prepared text, chunk by chunk if it is too large.
+        texts = self.texts_to_analyze(text)
+        if len(texts) > 1: # Blocking calls analyze chunks one after another.
+            return self.merge_issues([self._analyze_one(chunk) for chunk in texts])
+        return self._analyze_one(text)
+
+    def _analyze_one(self, text: str) -> List[Dict]: # Cached verdict on text sent in a single request.
+        cached = self.lookup(text, self.llm_client) # Reuse an earlier verdict when possible.
+        if cached is not None:
+            return cached
+        response = self.llm_client.query(self.SYSTEM_PROMPT, text) # Query LLM.
+        return self._verdict(text, self.llm_client, response)
+
+    async def validate_async(self, content: str) -> List[Dict]: # Validate content with a non-blocking LLM call.
+        if self.async_llm_client is None: # Create the async client on first use.
+            self.async_llm_client = AsyncLLMClient()
+        text = await self.text_for_llm_async(content) # Only what the LLM needs to see.
+        if text is None:
+            return []
+        return await self.analyze_text_async(text)
+
+    async def analyze_text_async(self, text: str) -> List[Dict]: # Async variant; chunks are analyzed concurrently.
+        """Analyze text like analyze_text; the client's max_in_flight bounds the chunk requests in flight."""
+        texts = self.texts_to_analyze(text)
+        if len(texts) > 1:
+            return self.merge_issues(await asyncio.gather(*(self._analyze_one_async(chunk) for chunk in texts)))
+        return await self._analyze_one_async(text)
+
+    async def _analyze_one_async(self, text: str) -> List[Dict]: # Cached verdict on text sent in a single request.
+        cached = self.lookup(text, self.async_llm_client) # Reuse an earlier verdict when possible.
+        if cached is not None:
+            return cached
+        return await self.analyze_async(text)
+
+    async def analyze_async(self, content: str) -> List[Dict]: # Query the LLM for already prepared content, bypassing the cache lookup.
+        response = await self.async_llm_client.query(self.SYSTEM_PROMPT, content) # Query LLM.
+        return self._verdict(content, self.async_llm_client, response)
 
 class RedundancyRule(SemanticRule): # Rule to detect redundant instructions.
     """Detects redundant instructions using an LLM."""
     rule_id = "SEMANTIC_REDUNDANCY" # Unique identifier for the rule.
     description = "Detects redundant instructions that add no new value." # Rule description.
+    DEFAULT_SIMILARITY_THRESHOLD = 0.3 # Suggested lexical similarity at which a sentence pair is worth asking the LLM about.
+    PREFILTER_MAX_CHARS = 100_000 # Larger prompts are sent whole; the pre-filter's cost grows faster than their size.
 
     SYSTEM_PROMPT = ( # System prompt for the LLM.
         "You are a helpful assistant. Analyze the following text for redundant sentences or phrases. "
@@ -18,27 +152,68 @@ class RedundancyRule(SemanticRule): # Rule to detect redundant instructions.
         "List each distinct redundant sentence or phrase you find, one per line. "
         "If there are no redundancies, respond with 'None'."
     )
+    BATCH_INSTRUCTION = ( # Per-prompt value expected in a batched response.
+        "a list of each distinct redundant sentence or phrase, i.e. one that repeats an instruction or idea "
+        "without adding new information (an empty list if there are none)"
+    )
+
+    def __init__(self, llm_client: Optional[LLMClient] = None,
+                 async_llm_client: Optional[AsyncLLMClient] = None,
+                 cache: Optional[VerdictCache] = None,
+                 similarity_threshold: Optional[float] = None,
+                 max_chunk_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS): # Initialize the redundancy rule.
+        super().__init__(llm_client, async_llm_client, cache, max_chunk_tokens, chunk_overlap_tokens)
+        self.similarity_threshold = similarity_threshold # None sends whole prompts to the LLM.
 
-    def validate(self, content: str) -> List[Dict]: # Validate content for redundancy.
+    def prepare_content(self, content: str) -> Optional[str]: # Send only sentences that have a near-duplicate.
+        """Return each group of near-duplicate sentences under its own header, or None when there are none.
+
+        The headers are section boundaries for the chunker, so a group is only split across chunks when it
+        is too large for one on its own.
+        """
+        if self.similarity_threshold is None or len(content) > self.PREFILTER_MAX_CHARS:
+            return content
+        clusters = redundancy_clusters(content, self.similarity_threshold) # Local, CPU-only pre-filter.
+        return "\n\n".join(f"# Similar sentences {number}\n" + "\n".join(cluster)
+                           for number, cluster in enumerate(clusters, 1)) if clusters else None
+
+    def _issue(self, phrase: str) -> Dict: # Build an issue for a redundant phrase.
+        return {
+            "type": self.rule_id,
+            "message": f"Redundant instruction found: '{phrase}'.",
+            "suggestion": "Remove the redundant phrase to make the prompt clearer.",
+            "details": {"redundant_phrase": phrase}
+        }
+
+    def parse_response(self, response: str) -> List[Dict]: # Parse the LLM response for redundancy.
         issues = [] # Initialize list for issues.
-        response = self.llm_client.query(self.SYSTEM_PROMPT, content) # Query LLM.
         if response.lower().strip() != 'none' and "error" not in response.lower(): # Check LLM response.
             redundant_phrases = [line.strip() for line in response.split('\n') if line.strip()] # Parse response.
             for phrase in redundant_phrases: # Iterate through found redundant phrases.
-                issues.append({ # Append an issue for each phrase.
-                    "type": self.rule_id,
-                    "message": f"Redundant instruction found: '{phrase}'.",
-                    "suggestion": "Remove the redundant phrase to make the prompt clearer.",
-                    "details": {"redundant_phrase": phrase}
-                })
+                issues.append(self._issue(phrase)) # Append an issue for each phrase.
         return issues # Return issues.
 
+    def issues_from_batch(self, value) -> List[Dict]: # Parse a list of redundant phrases.
+        if not isinstance(value, list) or not all(isinstance(phrase, str) for phrase in value):
+            raise ValueError(f"Expected a list of phrases for {self.rule_id}.")
+        return [self._issue(phrase.strip()) for phrase in value if phrase.strip()]
+
     def fix(self, content: str, issue: Dict) -> str: # Fix by removing the redundant phrase.
         phrase_to_remove = issue.get("details", {}).get("redundant_phrase") # Get phrase to remove.
         if phrase_to_remove: # If phrase exists.
             return content.replace(phrase_to_remove, "", 1) # Remove first occurrence of the phrase.
         return content # Return original content.
 
+    def plan_fix(self, content: str, issue: Dict, plan: FixPlan) -> bool: # Remove the first occurrence not already removed.
+        phrase = issue.get("details", {}).get("redundant_phrase")
+        start = content.find(phrase) if phrase else -1
+        while start != -1 and plan.has_edit(start, start + len(phrase)): # A repeated issue removes the next copy, like fix() does.
+            start = content.find(phrase, start + len(phrase))
+        if start != -1:
+            plan.replace(start, start + len(phrase), "")
+        return True
+
 class ContradictionRule(SemanticRule): # Rule to detect conflicting instructions.
     """Detects conflicting instructions using an LLM."""
     rule_id = "SEMANTIC_CONFLICT" # Unique identifier for the rule.
@@ -52,27 +227,55 @@ class ContradictionRule(SemanticRule): # Rule to detect conflicting instructions
         "For each conflict you find, return ONLY the two conflicting phrases on separate lines, prefixed with 'PHRASE: '. "
         "If there are no conflicts, respond with 'None'."
     )
+    BATCH_INSTRUCTION = ( # Per-prompt value expected in a batched response.
+        "a list of contradictions, each a two-element list holding the exact conflicting phrases. "
+        "A contradiction means two instructions are impossible to follow simultaneously; "
+        "simple repetition or emphasis is NOT a conflict (an empty list if there are none)"
+    )
+
+    def _issue(self, conflict_pair: List[str]) -> Dict: # Build an issue for a pair of conflicting phrases.
+        return {
+            "type": self.rule_id,
+            "message": f"Conflicting instructions found: '{conflict_pair[0]}' and '{conflict_pair[1]}'.",
+            "suggestion": "Resolve the contradiction between the instructions.",
+            "details": {"conflicting_phrases": conflict_pair}
+        }
+
+    def cross_chunk_text(self, chunks: List[str]) -> Optional[str]: # Instructions from every section, side by side.
+        return directive_digest(chunks) or None
 
-    def validate(self, content: str) -> List[Dict]: # Validate content for contradictions.
+    def issue_key(self, issue: Dict) -> str: # The same pair in either order is one conflict.
+        return json.dumps(sorted(issue.get("details", {}).get("conflicting_phrases", [])))
+
+    def parse_response(self, response: str) -> List[Dict]: # Parse the LLM response for contradictions.
         issues = [] # Initialize list for issues.
-        response = self.llm_client.query(self.SYSTEM_PROMPT, content) # Query LLM.
         if response.lower().strip() != 'none' and "error" not in response.lower(): # Check LLM response.
             phrases = [line.replace("PHRASE: ", "").strip() for line in response.split('\n') if line.startswith("PHRASE: ")] # Parse response.
             if len(phrases) >= 2: # A conflict requires at least two phrases.
                 # Take the first pair of conflicting phrases found
                 conflict_pair = phrases[0:2]
-                issues.append({ # Append the conflict issue.
-                    "type": self.rule_id,
-                    "message": f"Conflicting instructions found: '{conflict_pair[0]}' and '{conflict_pair[1]}'.",
-                    "suggestion": "Resolve the contradiction between the instructions.",
-                    "details": {"conflicting_phrases": conflict_pair}
-                })
+                issues.append(self._issue(conflict_pair)) # Append the conflict issue.
         return issues # Return issues.
 
+    def issues_from_batch(self, value) -> List[Dict]: # Parse a list of conflicting phrase pairs.
+        if not isinstance(value, list) or not all(
+            isinstance(pair, list) and len(pair) >= 2 and all(isinstance(phrase, str) for phrase in pair) for pair in value
+        ):
+            raise ValueError(f"Expected a list of phrase pairs for {self.rule_id}.")
+        if not value: # No conflicts found.
+            return []
+        return [self._issue([value[0][0].strip(), value[0][1].strip()])] # Report the first pair, like parse_response.
+
     def fix(self, content: str, issue: Dict) -> str: # Cannot auto-fix conflicts, suggest manual review.
         # Auto-fixing contradictions is complex and risky; we'll add a comment instead.
         phrases = issue.get("details", {}).get("conflicting_phrases", []) # Get conflicting phrases.
         if phrases: # If phrases exist.
             comment = f"\n\n# TODO: Resolve conflict identified by validator between: '{phrases[0]}' AND '{phrases[1]}'\n" # Create a comment.
             return content.strip() + comment # Append comment to the content.
-        return content # Return original content.
\ No newline at end of file
+        return content # Return original content.
+
+    def plan_fix(self, content: str, issue: Dict, plan: FixPlan) -> bool: # Append a review comment.
+        phrases = issue.get("details", {}).get("conflicting_phrases", [])
+        if phrases:
+            plan.append(f"# TODO: Resolve conflict identified by validator between: '{phrases[0]}' AND '{phrases[1]}'")
+        return True
@@ -0,0 +1,260 @@
+# File: prompt_validator/server.py
+"""Long-running validation server and the client that forwards to it.
+
+The server keeps one PromptValidator, one pooled async LLM client and the verdict cache warm
+across requests. Files from every request go through a bounded work queue drained by a fixed
+number of workers on a background event loop; when the queue cannot take a request's files
+the server answers 503 with Retry-After instead of buffering without limit.
+
+API (JSON over HTTP on localhost):
+    GET  /health    -> {"status": "ok", "rules": [...], "rules_version": ..., "queued": n, ...}
+    POST /validate  {"files": [{"path": ..., "content": ...}]} -> {"results": {path: issues}}
+A file without "content" is read from disk by the server, only from inside its `read_root`.
+"""
+import os # Import os to confine disk reads to a root directory.
+import json # Import json for request and response bodies.
+import time # Import time for client retries.
+import signal # Import signal to stop cleanly on SIGTERM.
+import ipaddress # Import ipaddress to recognise loopback addresses.
+import asyncio # Import asyncio for the worker loop.
+import threading # Import threading to run the loop and HTTP server side by side.
+import urllib.error # Import urllib errors to read error responses.
+import urllib.request # Import urllib to talk to the server without extra dependencies.
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler # Import the standard-library HTTP server.
+from typing import List, Dict, Optional # Import typing hints.
+from .validator import PromptValidator # Import the main validator class.
+
+DEFAULT_HOST = "127.0.0.1" # Only local clients; the API has no authentication.
+DEFAULT_PORT = 8765 # Port used by `serve` and `client` unless overridden.
+SERVER_ENV = "PROMPT_VALIDATOR_SERVER" # Environment variable naming the server URL for `client`.
+MAX_BODY_BYTES = 64 * 1024 * 1024 # Largest request body accepted.
+
+def default_server_url() -> str: # URL the client uses when none is configured.
+    return f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+
+def is_loopback(host: str) -> bool: # Whether binding to host keeps the server local.
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError: # A host name rather than an address.
+        return host == "localhost"
+
+class ServerBusy(Exception): # The work queue cannot take every file of a request.
+    pass
+
+class ServerUnavailable(Exception): # No server answered; callers fall back to validating locally.
+    pass
+
+class ValidationServer: # Serves one warm PromptValidator over HTTP.
+    def __init__(self, validator: PromptValidator, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 queue_size: int = 256, concurrency: int = 8, retry_after: int = 1,
+                 read_root: Optional[str] = None, allow_remote: bool = False): # Initialize the server.
+        if queue_size < 1 or concurrency < 1: # Guard against a queue or pool that can never drain.
+            raise ValueError("queue_size and concurrency must be at least 1.")
+        if not allow_remote and not is_loopback(host): # The API has no authentication and returns PII it finds.
+            raise ValueError(f"refusing to listen on non-loopback host {host}: the API has no authentication.")
+        self.read_root = os.path.realpath(read_root) if read_root is not None else None # Files without content are read only from here.
+        self.validator = validator # Shared by every request; rules, clients and cache stay warm.
+        self.queue_size = queue_size # Files waiting to be validated, at most.
+        self.concurrency = concurrency # Files validated at once.
+        self.retry_after = retry_after # Seconds suggested to clients turned away when the queue is full.
+        self.requests = 0 # Validation requests served.
+        self.rejected = 0 # Validation requests turned away with 503.
+        self.files = 0 # Files validated.
+        self._loop = asyncio.new_event_loop() # Runs the workers in a background thread.
+        self._queue: Optional[asyncio.Queue] = None # Created on the loop by start().
+        self._workers: List[asyncio.Task] = [] # Worker tasks draining the queue.
+        self._threads: List[threading.Thread] = [] # Loop and HTTP threads.
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self)) # Bound now, so port 0 resolves immediately.
+        self.httpd.daemon_threads = True # Do not wait for open connections on shutdown.
+
+    @property
+    def url(self) -> str: # Address clients should use.
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ValidationServer": # Start the workers and the HTTP server in background threads.
+        self.validator._prepare_async(self.concurrency) # One async client shared by every semantic rule.
+        loop_thread = threading.Thread(target=self._loop.run_forever, name="prompt-validator-loop", daemon=True)
+        loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_workers(), self._loop).result()
+        http_thread = threading.Thread(target=self.httpd.serve_forever, name="prompt-validator-http", daemon=True)
+        http_thread.start()
+        self._threads = [loop_thread, http_thread]
+        return self
+
+    def serve_forever(self) -> None: # Block until interrupted or terminated, then shut down cleanly.
+        signal.signal(signal.SIGTERM, signal.default_int_handler) # Treat `kill` like Ctrl+C.
+        self.start()
+        try:
+            while all(thread.is_alive() for thread in self._threads):
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None: # Stop accepting requests and stop the workers.
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._stop_workers(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for thread in self._threads:
+            thread.join()
+        self._loop.close()
+
+    async def _start_workers(self) -> None: # Create the queue and workers on the loop.
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def _stop_workers(self) -> None: # Cancel the workers and wait for them to exit.
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _worker(self) -> None: # Validate queued files until cancelled.
+        while True:
+            file_path, content, future = await self._queue.get()
+            try:
+                if content is None: # The client asked the server to read the file.
+                    content, errors = self._read_file(file_path)
+                    if content is None:
+                        future.set_result(errors)
+                        continue
+                future.set_result(await self.validator.validate_content_async(content, file_path))
+            except Exception as error: # Report the failure to the request, keep the worker alive.
+                if not future.done():
+                    future.set_exception(error)
+            finally:
+                self._queue.task_done()
+
+    def _read_file(self, file_path: str): # Read a file for a client, only from inside read_root.
+        real_path = os.path.realpath(file_path) # Resolves '..' and symlinks before the check.
+        if self.read_root is None or os.path.commonpath([real_path, self.read_root]) != self.read_root:
+            return None, [{"type": "FILE_ERROR", "message": f"server does not read {file_path}; send its content."}]
+        return self.validator._read_file(real_path)
+
+    async def _submit(self, files: List[Dict]) -> Dict[str, List[Dict]]: # Queue a request's files and await their issues.
+        waiting = self._queue.qsize()
+        if waiting and self._queue.maxsize - waiting < len(files): # All or nothing, so no request is half-done.
+            raise ServerBusy(f"work queue is full ({waiting} of {self._queue.maxsize} files waiting).")
+        futures = [] # One future per file, in request order.
+        for item in files: # A request larger than the queue is admitted when it is empty, and fed in as workers free up.
+            future = self._loop.create_future()
+            await self._queue.put((item["path"], item.get("content"), future))
+            futures.append(future)
+        issues = await asyncio.gather(*futures)
+        return {item["path"]: file_issues for item, file_issues in zip(files, issues)}
+
+    def validate(self, files: List[Dict]) -> Dict[str, List[Dict]]: # Validate files from an HTTP handler thread.
+        self.requests += 1
+        try:
+            results = asyncio.run_coroutine_threadsafe(self._submit(files), self._loop).result()
+        except ServerBusy:
+            self.rejected += 1
+            raise
+        self.files += len(files)
+        return results
+
+    def health(self) -> Dict: # Status, selected rules and counters.
+        status = {
+            "status": "ok",
+            "rules": [rule.rule_id for rule in self.validator.rules],
+            "rules_version": self.validator.rules_version(),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "files": self.files,
+        }
+        if self.validator.cache is not None:
+            status["cache"] = self.validator.cache.stats()
+        if self.validator.async_llm_client is not None:
+            status["llm"] = self.validator.async_llm_client.usage()
+        return status
+
+def _parse_files(payload) -> List[Dict]: # Validate the shape of a /validate body.
+    files = payload.get("files") if isinstance(payload, dict) else None
+    if not isinstance(files, list):
+        raise ValueError('body must be {"files": [{"path": ..., "content": ...}]}.')
+    for item in files:
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            raise ValueError("every file needs a string path.")
+        if item.get("content") is not None and not isinstance(item["content"], str):
+            raise ValueError(f"content of {item['path']} must be a string.")
+    return files
+
+def _handler(server: ValidationServer): # Request handler class bound to a server.
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep connections alive between requests.
+
+        def log_message(self, format, *args): # Stay quiet; editors call this per keystroke.
+            pass
+
+        def _send(self, status: int, body: Dict, headers: Optional[Dict] = None): # Write a JSON response.
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200, server.health())
+            else:
+                self._send(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/validate":
+                self._send(404, {"error": f"unknown path {self.path}"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True # The unread body would corrupt the next request.
+                self._send(413, {"error": f"request body exceeds {MAX_BODY_BYTES} bytes."})
+                return
+            try:
+                files = _parse_files(json.loads(self.rfile.read(length) or b"null"))
+            except ValueError as e: # Includes malformed JSON.
+                self._send(400, {"error": str(e)})
+                return
+            try:
+                self._send(200, {"results": server.validate(files)})
+            except ServerBusy as e: # Backpressure: the client should retry later.
+                self._send(503, {"error": str(e)}, {"Retry-After": str(server.retry_after)})
+            except Exception as e: # An unexpected failure in a rule.
+                self._send(500, {"error": str(e)})
+
+    return Handler
+
+def request_validation(url: str, files: List[Dict], timeout: float = 300.0,
+                       busy_retries: int = 3) -> Dict[str, List[Dict]]: # Validate files on a running server.
+    """POST files to the server and return {path: issues}.
+
+    Raises ServerUnavailable when the connection cannot be made, so callers can validate locally,
+    ServerBusy when the server is still turning requests away after `busy_retries` retries, and
+    RuntimeError when a server took the request but failed or did not answer within `timeout`.
+    """
+    body = json.dumps({"files": files}).encode("utf-8")
+    for attempt in range(busy_retries + 1):
+        request = urllib.request.Request(url.rstrip("/") + "/validate", data=body,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())["results"]
+        except urllib.error.HTTPError as e:
+            if e.code != 503:
+                raise RuntimeError(f"server error {e.code}: {e.read().decode('utf-8', 'replace')}")
+            if attempt == busy_retries:
+                raise ServerBusy(json.loads(e.read()).get("error", "server busy"))
+            time.sleep(float(e.headers.get("Retry-After") or 1)) # Honour the server's backoff.
+        except urllib.error.URLError as e: # The connection could not be made: nothing is listening there.
+            raise ServerUnavailable(f"no validation server at {url}: {e.reason}")
+        except TimeoutError: # The server took the request; validating again locally would hide that it hangs.
+            raise RuntimeError(f"validation server at {url} did not answer within {timeout:g}s")
+        except OSError as e: # The server dropped the connection after taking the request.
+            raise RuntimeError(f"validation server at {url} failed: {e}")
@@ -0,0 +1,175 @@
+# File: prompt_validator/similarity.py
+import re # Import re to split sentences and words.
+import math # Import math for term weights and norms.
+import zlib # Import zlib for stable feature hashes.
+import random # Import random for reproducible MinHash permutations.
+from functools import lru_cache # Import lru_cache to reuse per-stem MinHash values.
+from typing import List, Dict, Tuple, Set # Import typing hints.
+
+SENTENCE_PATTERN = re.compile(r"(?:[^.!?\n]|[.!?]+(?=[^\s.!?]))+[.!?]*") # A sentence ends at punctuation followed by a space, or a line break; emails, URLs and numbers stay whole.
+WORD_PATTERN = re.compile(r"[a-z0-9']+") # Lowercased word tokens.
+STOPWORDS = frozenset( # Function words that make unrelated sentences look alike.
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "you your should must make sure".split()
+)
+MIN_WORDS = 2 # Shorter fragments (list markers, one-word lines) are never candidates; headers never are either.
+SHORT_CONTENT_WORDS = 2 # Sentences with at most this many content words have too few terms to compare.
+SYNONYMS = ( # Instruction words that ask for the same thing; short sentences using two of them likely repeat each other.
+    "concise brief short succinct terse",
+    "detailed thorough comprehensive elaborate",
+    "formal professional",
+    "friendly warm approachable",
+    "polite courteous respectful",
+    "clear simple plain understandable",
+    "accurate correct precise factual",
+    "quick fast rapid",
+    "creative original imaginative",
+    "summarize summarise condense",
+    "explain describe clarify",
+    "cite reference attribute",
+)
+STEM_LENGTH = 5 # Word prefix used as a crude stem when looking for candidate pairs ('detailed' ~ 'details').
+LSH_MIN_SENTENCES = 300 # Above this many sentences, candidate pairs come from MinHash LSH instead of shared stems.
+COMMON_STEM_SHARE = 0.2 # Stems in more than this share of sentences (and at least COMMON_STEM_MIN) pair up too much to be useful.
+COMMON_STEM_MIN = 10 # Small prompts never drop stems.
+MAX_COMPARISONS = 32 # Candidates compared per sentence, those sharing the most stems first.
+MINHASH_BANDS = 32 # LSH bands; with two rows each, stem sets at Jaccard 0.2 collide in some band about 73% of the time.
+MINHASH_ROWS = 2 # Rows per LSH band.
+_MERSENNE_PRIME = (1 << 61) - 1 # Modulus of the universal hash family.
+_PERMUTATIONS = [(random.Random(seed).randrange(1, _MERSENNE_PRIME), random.Random(-seed).randrange(_MERSENNE_PRIME))
+                 for seed in range(1, MINHASH_BANDS * MINHASH_ROWS + 1)] # (a, b) of each MinHash permutation.
+_SYNONYM_GROUPS = {word[:STEM_LENGTH]: group for group, words in enumerate(SYNONYMS) for word in words.split()} # stem -> group.
+
+def split_sentences(content: str) -> List[Tuple[int, int, str]]: # Sentences with their offsets.
+    sentences = []
+    for match in SENTENCE_PATTERN.finditer(content):
+        text = match.group(0).strip()
+        if not text.startswith("#") and len(WORD_PATTERN.findall(text.lower())) >= MIN_WORDS:
+            start = match.start() + match.group(0).index(text) # Offset of the stripped sentence.
+            sentences.append((start, start + len(text), text))
+    return sentences
+
+def features(sentence: str) -> Dict[str, int]: # Term counts of content words and their character trigrams.
+    counts = {}
+    for word in WORD_PATTERN.findall(sentence.lower()):
+        if word in STOPWORDS:
+            continue
+        counts[word] = counts.get(word, 0) + 1
+        padded = f"<{word}>" # Trigrams let 'detailed' and 'details' overlap.
+        for i in range(len(padded) - 2):
+            gram = padded[i:i + 3]
+            counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+def vectors(sentences: List[str]) -> List[Dict[str, float]]: # Unit-length, sublinear term-frequency vectors.
+    """Vectorize sentences; IDF is deliberately not used, since within one prompt it down-weights exactly the shared terms."""
+    result = []
+    for sentence in sentences:
+        vector = {term: 1 + math.log(count) for term, count in features(sentence).items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        result.append({term: weight / norm for term, weight in vector.items()})
+    return result
+
+def stems(sentence: str) -> Set[str]: # Crude stems of a sentence's content words.
+    return {word[:STEM_LENGTH] for word in WORD_PATTERN.findall(sentence.lower()) if word not in STOPWORDS}
+
+def cosine(a: Dict[str, float], b: Dict[str, float]) -> float: # Cosine similarity of two unit vectors.
+    return sum(a[term] * b[term] for term in a.keys() & b.keys()) # The key intersection runs in C.
+
+def _candidate_counts(groups, count: int) -> List[Dict[int, int]]: # For each sentence, co-grouped sentences and how often.
+    counts = [{} for _ in range(count)]
+    for indices in groups:
+        for i, first in enumerate(indices):
+            for second in indices[i + 1:]:
+                counts[first][second] = counts[first].get(second, 0) + 1
+                counts[second][first] = counts[second].get(first, 0) + 1
+    return counts
+
+def _stem_groups(stem_sets: List[Set[str]]) -> List[List[int]]: # Sentences sharing each informative stem.
+    postings = {} # stem -> sentence indices containing it.
+    for index, sentence_stems in enumerate(stem_sets):
+        for stem in sentence_stems:
+            postings.setdefault(stem, []).append(index)
+    limit = max(COMMON_STEM_MIN, int(len(stem_sets) * COMMON_STEM_SHARE))
+    return [indices for indices in postings.values() if len(indices) <= limit]
+
+@lru_cache(maxsize=65536)
+def _permuted_hashes(stem: str) -> Tuple[int, ...]: # The stem's value under every MinHash permutation.
+    value = zlib.crc32(stem.encode("utf-8"))
+    return tuple((a * value + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS)
+
+def _lsh_groups(stem_sets: List[Set[str]]) -> List[List[int]]: # Sentences colliding in each MinHash LSH band.
+    buckets = {} # (band, signature slice) -> sentence indices.
+    for index, sentence_stems in enumerate(stem_sets):
+        if not sentence_stems:
+            continue
+        signature = [min(values) for values in zip(*(_permuted_hashes(stem) for stem in sentence_stems))]
+        for band in range(MINHASH_BANDS):
+            key = (band, tuple(signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]))
+            buckets.setdefault(key, []).append(index)
+    return list(buckets.values())
+
+def duplicate_clusters(sentences: List[str], threshold: float) -> List[List[int]]: # Groups of sentences that repeat each other.
+    """Return groups of sentence indices linked by near-duplicate pairs, each sorted, in order of their first sentence.
+
+    Candidates are sentences sharing an informative stem (or, above LSH_MIN_SENTENCES, colliding in a
+    MinHash LSH band, which keeps candidate generation roughly linear). Each sentence is compared with at
+    most MAX_COMPARISONS candidates, most shared stems first, and only until one partner is found; a pair
+    joins the two sentences' groups, so a sentence repeated several times ends up in one group.
+
+    Short sentences ("Be concise.", "Be brief.") often repeat each other in synonyms that share no
+    terms, so short sentences using words from the same SYNONYMS group are grouped too.
+    """
+    unit_vectors = vectors(sentences)
+    stem_sets = [stems(sentence) for sentence in sentences]
+    groups = _lsh_groups(stem_sets) if len(sentences) > LSH_MIN_SENTENCES else _stem_groups(stem_sets)
+    parent = list(range(len(sentences))) # Union-find forest over sentence indices.
+
+    def root(index: int) -> int: # Representative of the index's group, halving the path on the way.
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    concepts = {} # Synonym group -> short sentences using one of its words.
+    for index, sentence_stems in enumerate(stem_sets):
+        if len(sentence_stems) <= SHORT_CONTENT_WORDS:
+            for group in {_SYNONYM_GROUPS[stem] for stem in sentence_stems if stem in _SYNONYM_GROUPS}:
+                concepts.setdefault(group, []).append(index)
+    involved = set() # Sentences already known to be redundant.
+    for indices in concepts.values():
+        if len(indices) > 1:
+            involved.update(indices)
+            for other in indices[1:]:
+                parent[root(other)] = root(indices[0])
+    for index, candidates in enumerate(_candidate_counts(groups, len(sentences))):
+        if index in involved: # Its partner found it, or it found one through a synonym.
+            continue
+        ranked = sorted(candidates, key=lambda other: (-candidates[other], other))[:MAX_COMPARISONS]
+        for other in ranked:
+            if cosine(unit_vectors[index], unit_vectors[other]) >= threshold:
+                involved.update((index, other))
+                parent[root(index)] = root(other)
+                break
+    clusters = {} # Representative -> member indices, filled in index order.
+    for index in sorted(involved):
+        clusters.setdefault(root(index), []).append(index)
+    return list(clusters.values())
+
+def near_duplicates(sentences: List[str], threshold: float) -> Set[int]: # Sentences with a similar partner.
+    """Return the indices of sentences whose cosine similarity with some other sentence is at least `threshold`.
+
+    The union of duplicate_clusters; see there for how candidates are found.
+    """
+    return {index for cluster in duplicate_clusters(sentences, threshold) for index in cluster}
+
+def redundancy_candidates(content: str, threshold: float) -> List[str]: # Sentences worth showing to the LLM.
+    """Return, in text order, every sentence that is a near-duplicate of another one (empty if none is)."""
+    sentences = split_sentences(content)
+    return [sentences[index][2] for index in sorted(near_duplicates([text for _, _, text in sentences], threshold))]
+
+def redundancy_clusters(content: str, threshold: float) -> List[List[str]]: # Near-duplicate sentences, grouped.
+    """Return each group of sentences that repeat each other, in text order within and across groups."""
+    sentences = split_sentences(content)
+    clusters = duplicate_clusters([text for _, _, text in sentences], threshold)
+    return [[sentences[index][2] for index in cluster] for cluster in clusters]
@@ -1,37 +1,360 @@
 # File: prompt_validator/validator.py
 import os # Import os for path operations.
-from typing import List, Dict, Tuple # Import typing hints.
+import time # Import time for profiling async rules.
+import asyncio # Import asyncio for concurrent validation.
+import itertools # Import itertools to take paths a window at a time.
+from typing import List, Dict, Tuple, Set, Iterable, Iterator, AsyncIterator, Optional # Import typing hints.
 from .rules import ALL_RULES # Import the list of all rule classes.
+from .rules.semantic import SemanticRule, RedundancyRule # Import the LLM-backed rule classes.
+from .llm_client import LLMClient, AsyncLLMClient # Import the LLM clients.
+from .cache import VerdictCache # Import the verdict cache.
+from .manifest import Manifest, rules_version, file_fingerprint, content_hash # Import the incremental-run manifest.
+from .fixes import FixPlan, write_atomic # Import the single-pass fix engine.
+from .profiling import Profiler # Import run instrumentation.
+from .batching import pack_batches, run_batch, build_system_prompt, estimate_tokens # Import the request batcher.
+from .chunking import DEFAULT_OVERLAP_TOKENS # Import the default chunk overlap.
 
 class PromptValidator: # Main class to manage and run validation.
-    def __init__(self): # Initialize the validator.
-        self.rules = [Rule() for Rule in ALL_RULES] # Instantiate all available validation rules.
+    def __init__(self, llm_client: Optional[LLMClient] = None,
+                 async_llm_client: Optional[AsyncLLMClient] = None,
+                 cache: Optional[VerdictCache] = None, batch_size: int = 1,
+                 batch_token_budget: int = 6000, batch_combine_rules: bool = True,
+                 rule_ids: Optional[Iterable[str]] = None,
+                 similarity_threshold: Optional[float] = None,
+                 profiler: Optional[Profiler] = None,
+                 max_chunk_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: int = DEFAULT_OVERLAP_TOKENS): # Initialize the validator.
+        self.async_llm_client = async_llm_client # Shared async client for concurrent validation.
+        self.cache = cache # Optional verdict cache shared by semantic rules.
+        self.batch_size = batch_size # Prompts per batched LLM request (1 disables batching).
+        self.batch_token_budget = batch_token_budget # Estimated token limit of one batched request.
+        self.batch_combine_rules = batch_combine_rules # Ask every semantic rule in the same batched request.
+        selected = ALL_RULES # Run every rule unless a subset was requested.
+        if rule_ids is not None: # Restrict validation to the requested rules.
+            rule_ids = set(rule_ids)
+            if not rule_ids: # An empty selection would validate nothing and report every file clean.
+                raise ValueError("rule_ids selects no rules; pass None to run every rule.")
+            unknown = rule_ids - {Rule.rule_id for Rule in ALL_RULES}
+            if unknown: # Reject typos instead of silently skipping checks.
+                raise ValueError(f"Unknown rule id(s): {', '.join(sorted(unknown))}.")
+            selected = [Rule for Rule in ALL_RULES if Rule.rule_id in rule_ids] # Keep the canonical rule order.
 
-    def validate_file(self, file_path: str) -> Tuple[str, List[Dict]]: # Validate a single prompt file.
+        if llm_client is None and any(issubclass(Rule, SemanticRule) for Rule in selected):
+            llm_client = LLMClient() # One lazily connected client shared by every semantic rule.
+        self.rules = [] # Instantiate the selected validation rules.
+        for Rule in selected: # Semantic rules share the validator's LLM clients.
+            shared = dict(llm_client=llm_client, async_llm_client=async_llm_client, cache=cache,
+                          max_chunk_tokens=max_chunk_tokens, chunk_overlap_tokens=chunk_overlap_tokens)
+            if issubclass(Rule, RedundancyRule): # Only sentences with a near-duplicate reach the LLM.
+                self.rules.append(Rule(similarity_threshold=similarity_threshold, **shared))
+            elif issubclass(Rule, SemanticRule):
+                self.rules.append(Rule(**shared))
+            else:
+                self.rules.append(Rule())
+        self.profiler = profiler # Optional per-rule, per-file and LLM instrumentation.
+        if profiler is not None: # Blocking semantic queries report to the profiler too.
+            for rule in self.rules:
+                if isinstance(rule, SemanticRule):
+                    rule.llm_client.profiler = profiler
+
+    def _read_file(self, file_path: str) -> Tuple[Optional[str], List[Dict]]: # Read a prompt file.
         try: # Try to read the file content.
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+                return f.read(), []
         except IOError as e: # Handle file reading errors.
-            return file_path, [{"type": "FILE_ERROR", "message": str(e)}]
+            return None, [{"type": "FILE_ERROR", "message": str(e)}]
+
+    def _run_rule(self, rule, content: str, file_path: str) -> List[Dict]: # Run one rule, timing it when profiling.
+        if self.profiler is None:
+            return rule.validate(content)
+        with self.profiler.timer("rule", rule_id=rule.rule_id, file=file_path):
+            return rule.validate(content)
+
+    async def _run_rule_async(self, rule: SemanticRule, content: str, file_path: str) -> List[Dict]: # Async variant.
+        start = time.perf_counter()
+        issues = await rule.validate_async(content)
+        if self.profiler is not None: # Includes time spent waiting for the LLM.
+            self.profiler.record({"event": "rule", "rule_id": rule.rule_id, "file": file_path,
+                                  "seconds": time.perf_counter() - start})
+        return issues
+
+    def validate_file(self, file_path: str) -> Tuple[str, List[Dict]]: # Validate a single prompt file.
+        if self.profiler is not None: # Time the whole file, reading included.
+            with self.profiler.timer("file", file=file_path) as fields:
+                content, issues = self._validate_file(file_path)
+                fields["issues"] = len(issues)
+            return content, issues
+        return self._validate_file(file_path)
+
+    def _validate_file(self, file_path: str) -> Tuple[str, List[Dict]]: # Read and validate one file.
+        content, errors = self._read_file(file_path) # Read the file content.
+        if content is None: # Reading failed.
+            return file_path, errors
+        return content, self.validate_content(content, file_path) # Return the content and all found issues.
 
+    def validate_content(self, content: str, file_path: str = "<string>") -> List[Dict]: # Validate prompt text.
         all_issues = [] # Initialize an empty list to aggregate issues.
         for rule in self.rules: # Iterate over each instantiated rule.
-            issues = rule.validate(content) # Run the rule's validation method.
+            issues = self._run_rule(rule, content, file_path) # Run the rule's validation method.
             all_issues.extend(issues) # Add any found issues to the aggregate list.
-        return content, all_issues # Return the content and all found issues.
+        return all_issues
 
-    def fix_file(self, file_path: str, content: str, issues: List[Dict]) -> None: # Apply fixes to a file.
-        updated_content = content # Start with the original content.
-        rule_map = {rule.rule_id: rule for rule in self.rules} # Map rule IDs to rule instances.
+    def llm_calls_avoided(self) -> int: # Semantic checks answered without the LLM by local pre-filters.
+        return sum(rule.llm_calls_avoided for rule in self.rules if isinstance(rule, SemanticRule))
+
+    def rules_version(self) -> str: # Hash of the selected rules, stored in incremental manifests.
+        return rules_version(self.rules)
+
+    def split_incremental(self, file_paths: Iterable[str], manifest: Manifest,
+                          changed: Optional[Set[str]] = None) -> Iterator[Tuple[str, Optional[List[Dict]]]]: # Separate unchanged files.
+        """Yield (file_path, stored_issues); stored_issues is None when the file must be revalidated.
+
+        `changed` is an optional set of absolute paths known to have changed (e.g. from git); they
+        are always revalidated. Every other file is still checked against its manifest entry, since
+        nothing records which commit the manifest was written at.
+        """
+        version = self.rules_version()
+        for file_path in file_paths:
+            if changed is not None and os.path.abspath(file_path) in changed:
+                yield file_path, None
+            else:
+                yield file_path, manifest.lookup(file_path, version)
+
+    def validate_incremental(self, file_paths: Iterable[str], manifest: Manifest,
+                             changed: Optional[Set[str]] = None) -> Dict[str, List[Dict]]: # Validate only what changed.
+        """Validate changed files, reuse stored issues for the rest, and update (but not save) the manifest."""
+        version = self.rules_version()
+        results = {} # file_path -> issues.
+        for file_path, issues in self.split_incremental(file_paths, manifest, changed):
+            if issues is None: # Changed, new, or validated under different rules.
+                fingerprint = file_fingerprint(file_path) # Taken before the file is read.
+                content, issues = self.validate_file(file_path)
+                manifest.record(file_path, issues, version, fingerprint, content_hash(content))
+            results[file_path] = issues
+        return results
+
+    def validate_parallel(self, file_paths: Iterable[str], workers: Optional[int] = None, chunk_size: int = 64,
+                          with_state: bool = False) -> Iterator[Tuple]: # Validate files across processes.
+        """Yield (file_path, issues) in completion order, running local rules in a process pool.
+
+        With `with_state`, yield (file_path, issues, (fingerprint, digest)) instead: the file's size and
+        mtime taken before the worker read it, and the hash of the content it validated.
+        """
+        if any(rule.requires_llm for rule in self.rules): # LLM rules use validate_many instead.
+            raise ValueError("validate_parallel only supports rules that run without an LLM.")
+        from .parallel import iter_validate_parallel # Imported lazily to keep the pool machinery optional.
+        on_event = self.profiler.record if self.profiler is not None else None # Workers' timings are replayed here.
+        return iter_validate_parallel(file_paths, [rule.rule_id for rule in self.rules], workers, chunk_size, on_event, with_state)
+
+    async def validate_file_async(self, file_path: str) -> Tuple[str, List[Dict]]: # Validate a file with concurrent LLM calls.
+        start = time.perf_counter()
+        content, issues = await self._validate_file_async(file_path)
+        if self.profiler is not None: # Wall time of the file, reading and LLM waits included.
+            self.profiler.record({"event": "file", "file": file_path, "issues": len(issues),
+                                  "seconds": time.perf_counter() - start})
+        return content, issues
+
+    async def _validate_file_async(self, file_path: str) -> Tuple[str, List[Dict]]: # Read and validate one file.
+        content, errors = self._read_file(file_path) # Read the file content.
+        if content is None: # Reading failed.
+            return file_path, errors
+        return content, await self.validate_content_async(content, file_path) # Return the content and all found issues.
+
+    async def validate_content_async(self, content: str, file_path: str = "<string>") -> List[Dict]: # Validate prompt text concurrently.
+        if self.async_llm_client is None: # Called directly rather than through validate_iter/validate_many.
+            self._prepare_async(1)
+        local_issues = [] # Issues from rules that run in-process.
+        semantic_calls = [] # Pending LLM-backed validations.
+        for rule in self.rules: # Local rules run inline; semantic rules fan out.
+            if isinstance(rule, SemanticRule):
+                semantic_calls.append(self._run_rule_async(rule, content, file_path))
+            else:
+                local_issues.extend(self._run_rule(rule, content, file_path))
+
+        all_issues = local_issues # Local issues come first, matching validate_file's rule order.
+        for issues in await asyncio.gather(*semantic_calls): # Run semantic rules concurrently.
+            all_issues.extend(issues)
+        return all_issues
 
+    def _prepare_async(self, concurrency: int) -> None: # Validate the cap and share one async client.
+        """Share one async client and cap its requests in flight at what `concurrency` files need.
+
+        The cap is one request per semantic rule per file, so chunked prompts queue for the same
+        slots instead of adding requests of their own.
+        """
+        if concurrency < 1: # Guard against a cap that would deadlock.
+            raise ValueError("concurrency must be at least 1.")
+        semantic_rules = [rule for rule in self.rules if isinstance(rule, SemanticRule)]
+        if self.async_llm_client is None and semantic_rules:
+            self.async_llm_client = AsyncLLMClient() # One client shared by every semantic rule.
+        for rule in semantic_rules: # Hand the shared client to rules that do not have one yet.
+            if rule.async_llm_client is None:
+                rule.async_llm_client = self.async_llm_client
+            rule.async_llm_client.max_in_flight = concurrency * len(semantic_rules) # The one limit on requests.
+            if self.profiler is not None: # Report every query.
+                rule.async_llm_client.profiler = self.profiler
+
+    async def validate_iter(self, file_paths: Iterable[str],
+                            concurrency: int = 8) -> AsyncIterator[Tuple[str, str, List[Dict]]]: # Stream results as files finish.
+        """Yield (file_path, content, issues) in completion order.
+
+        Paths are pulled lazily by `concurrency` workers and finished results wait in a bounded
+        queue, so memory stays flat however many paths the iterable produces. With batching, paths
+        are taken `batch_size * concurrency` at a time, enough to fill every batch slot, and each
+        window's results are yielded before the next window is read.
+        """
+        self._prepare_async(concurrency) # Share one async client across semantic rules.
+        if self.batch_size > 1 and self.async_llm_client is not None: # Pack prompts into shared requests.
+            paths = iter(file_paths)
+            while True:
+                window = list(itertools.islice(paths, self.batch_size * concurrency))
+                if not window:
+                    return
+                for file_path, (content, issues) in (await self._validate_batched(window, concurrency)).items():
+                    yield file_path, content, issues
+        paths = iter(file_paths) # Shared by all workers; next() never awaits, so no locking is needed.
+        queue = asyncio.Queue(maxsize=concurrency) # Backpressure on workers when the consumer is slow.
+        finished = object() # Sentinel sent by a worker that ran out of paths.
+
+        async def worker() -> None: # Validate paths until the iterable is exhausted.
+            try:
+                for file_path in paths:
+                    content, issues = await self.validate_file_async(file_path)
+                    await queue.put((file_path, content, issues))
+                await queue.put(finished)
+            except Exception as error: # Surface failures to the consumer.
+                await queue.put(error)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            remaining = len(workers) # Workers still producing results.
+            while remaining:
+                item = await queue.get()
+                if item is finished:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally: # Stop workers if the consumer bails out early.
+            for task in workers:
+                task.cancel()
+
+    async def validate_many(self, file_paths: Iterable[str],
+                            concurrency: int = 8) -> Dict[str, Tuple[str, List[Dict]]]: # Validate many files concurrently.
+        """Validate files concurrently, with at most `concurrency` files in flight at a time."""
+        self._prepare_async(concurrency) # Share one async client across semantic rules.
+        if self.batch_size > 1 and self.async_llm_client is not None: # Batches are packed window by window, in input order.
+            return {file_path: (content, issues)
+                    async for file_path, content, issues in self.validate_iter(file_paths, concurrency)}
+
+        semaphore = asyncio.Semaphore(concurrency) # Bound the number of files in flight.
+
+        async def run(file_path: str) -> Tuple[str, Tuple[str, List[Dict]]]: # Validate one file under the cap.
+            async with semaphore:
+                return file_path, await self.validate_file_async(file_path)
+
+        results = await asyncio.gather(*(run(path) for path in file_paths)) # Fan out across files.
+        return dict(results) # Preserve the input order.
+
+    async def _validate_batched(self, file_paths: Iterable[str],
+                                concurrency: int) -> Dict[str, Tuple[str, List[Dict]]]: # Validate files with batched LLM requests.
+        client = self.async_llm_client # Client used for every batch.
+        semantic_rules = [rule for rule in self.rules if isinstance(rule, SemanticRule)] # Rules answered by the LLM.
+        batch_prompts = {rule: [build_system_prompt((rule,))] for rule in semantic_rules} # Prompts of the batches a rule can be in.
+        if self.batch_combine_rules and len(semantic_rules) > 1:
+            for rule in semantic_rules:
+                batch_prompts[rule].append(build_system_prompt(semantic_rules))
+        files = {} # file_path -> (content, local issues, {rule_id: semantic issues}).
+        groups = {} # Tuple of rules -> list of (file_path, text) needing those rules.
+        chunked = [] # (file_path, rule, text) for texts above the rules' chunk size.
+        for file_path in file_paths: # Run local rules and the cache up front.
+            content, errors = self._read_file(file_path)
+            if content is None: # Reading failed.
+                files[file_path] = (file_path, errors, {})
+                continue
+            local_issues = [issue for rule in self.rules if not isinstance(rule, SemanticRule)
+                            for issue in self._run_rule(rule, content, file_path)] # Batched LLM time is profiled per request.
+            verdicts = {} # Semantic issues per rule for this file.
+            missing = [] # (rule, text to analyze) for semantic rules without a verdict yet.
+            for rule in semantic_rules:
+                text = await rule.text_for_llm_async(content) # A rule may narrow the text or answer locally.
+                if text is not None and rule.needs_chunking(text): # Too large to share a request; analyzed in chunks.
+                    chunked.append((file_path, rule, text))
+                    continue
+                cached = [] if text is None else rule.lookup(text, client, batch_prompts[rule])
+                if cached is None:
+                    missing.append((rule, text))
+                else:
+                    verdicts[rule.rule_id] = cached
+            files[file_path] = (content, local_issues, verdicts)
+            if self.batch_combine_rules: # Rules asked about the full text share one entry; narrowed texts get their own.
+                rule_groups = [(tuple(rule for rule, text in missing if text == content), content)]
+                rule_groups += [((rule,), text) for rule, text in missing if text != content]
+            else:
+                rule_groups = [((rule,), text) for rule, text in missing]
+            for rules, text in rule_groups: # Files needing the same rules share batches.
+                if rules:
+                    groups.setdefault(rules, []).append((file_path, text))
+
+        semaphore = asyncio.Semaphore(concurrency) # Bound the number of batches in flight.
+
+        async def run(rules: Tuple[SemanticRule, ...], batch: List[Tuple[str, str]]) -> None: # Resolve one batch.
+            async with semaphore:
+                items = [(str(index), content) for index, (_, content) in enumerate(batch)] # Short ids keep paths out of the request.
+                parsed = await run_batch(client, rules, items) # One request for the whole batch.
+                system_prompt = build_system_prompt(rules) # Cache verdicts under the prompt that produced them.
+                for index, (file_path, content) in enumerate(batch): # Store parsed verdicts, re-query anything that did not parse.
+                    verdicts = files[file_path][2]
+                    for rule in rules:
+                        issues = parsed.get(str(index), {}).get(rule.rule_id)
+                        if issues is None: # Fall back to a per-file query for this rule.
+                            issues = await rule.analyze_async(content)
+                        else:
+                            rule.store(content, client, issues, system_prompt)
+                        verdicts[rule.rule_id] = issues
+
+        batch_calls = [] # Pending batched requests.
+        for rules, items in groups.items(): # Pack each rule group under the token budget.
+            reserved = estimate_tokens(build_system_prompt(rules)) # The system prompt is sent once per batch.
+            for batch in pack_batches(items, self.batch_size, self.batch_token_budget, reserved):
+                batch_calls.append(run(rules, batch))
+        async def run_chunked(file_path: str, rule: SemanticRule, text: str) -> None: # Analyze one oversized text.
+            files[file_path][2][rule.rule_id] = await rule.analyze_text_async(text) # Its chunks share the client's slots.
+
+        batch_calls += [run_chunked(file_path, rule, text) for file_path, rule, text in chunked]
+        await asyncio.gather(*batch_calls) # Send batches concurrently.
+
+        results = {} # Assemble results in the input order and the rules' order.
+        for file_path, (content, local_issues, verdicts) in files.items():
+            all_issues = list(local_issues)
+            for rule in semantic_rules:
+                all_issues.extend(verdicts.get(rule.rule_id, []))
+            results[file_path] = (content, all_issues)
+        return results
+
+    def fix_content(self, content: str, issues: List[Dict]) -> str: # Return the content with every fix applied.
+        """Apply all fixes in one pass over the original content.
+
+        Rules add offset edits to a shared FixPlan; rules that cannot express a fix as edits
+        have their fix() applied to the result afterwards, in issue order.
+        """
+        rule_map = {rule.rule_id: rule for rule in self.rules} # Map rule IDs to rule instances.
+        plan = FixPlan() # Edits from every rule, against the original content.
+        fallback = [] # (rule, issue) pairs whose fix must be applied sequentially.
         for issue in issues: # Iterate over each issue found.
             rule = rule_map.get(issue['type']) # Find the corresponding rule for the issue.
-            if rule: # If a rule is found.
-                updated_content = rule.fix(updated_content, issue) # Apply the fix.
+            if rule and not rule.plan_fix(content, issue, plan):
+                fallback.append((rule, issue))
+        updated_content = plan.apply(content) # Build the output once.
+        for rule, issue in fallback:
+            updated_content = rule.fix(updated_content, issue)
+        return updated_content
 
+    def fix_file(self, file_path: str, content: str, issues: List[Dict]) -> None: # Apply fixes to a file.
+        updated_content = self.fix_content(content, issues) # Fix everything in one pass.
         if updated_content != content: # Check if the content was modified.
-            try: # Try to write the updated content back to the file.
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(updated_content)
-            except IOError as e: # Handle file writing errors.
-                print(f"Error writing fixes to {file_path}: {e}") # Print an error message.
\ No newline at end of file
+            try: # Write through a temporary file so the prompt is never left half-written.
+                write_atomic(file_path, updated_content)
+            except OSError as e: # Handle file writing errors.
+                print(f"Error writing fixes to {file_path}: {e}") # Print an error message.
@@ -0,0 +1,24 @@
+# File: tests/conftest.py
+import pytest # Import pytest to declare shared fixtures.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+from prompt_validator.llm_client import LLMClient, AsyncLLMClient # Import the LLM clients.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+@pytest.fixture
+def write_prompts(tmp_path): # Factory creating complete prompt files on disk.
+    def write(count):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f"prompt{i}.txt"
+            path.write_text(f"## Task:\nPrompt {i}.\n## Success Criteria:\n- ok\n## Examples:\n- one\n", encoding="utf-8")
+            paths.append(str(path))
+        return paths
+    return write
+
+@pytest.fixture
+def make_validator(): # Factory building a validator wired to a fake async LLM.
+    def make(fake, client_options=None, **options):
+        client_options = dict({"backoff_base": 0.001}, **(client_options or {})) # Keep retries fast.
+        return PromptValidator(llm_client=LLMClient(client=FakeLLM(is_async=False)),
+                               async_llm_client=AsyncLLMClient(client=fake, **client_options), **options)
+    return make
@@ -0,0 +1,5 @@
+# File: tests/fake_llm.py
+from benchmarks.fake_llm import FakeLLM # The one stub, shared with the benchmarks.
+
+def respond(system, user): # Report a redundancy for every prompt, no conflicts.
+    return "Be detailed." if "redundant" in system else "None"
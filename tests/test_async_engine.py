@@ -0,0 +1,33 @@
+# File: tests/test_async_engine.py
+import asyncio # Import asyncio to drive the async engine.
+import time # Import time to measure wall-clock speedup.
+from .fake_llm import FakeLLM, respond # Import the fake LLM stub.
+
+def test_validate_many_runs_files_concurrently_under_cap(make_validator, write_prompts):
+    fake = FakeLLM(responder=respond, latency=0.05)
+    validator = make_validator(fake)
+    paths = write_prompts(12)
+
+    start = time.perf_counter()
+    results = asyncio.run(validator.validate_many(paths, concurrency=4))
+    elapsed = time.perf_counter() - start
+
+    assert list(results) == paths # Results keep the input order.
+    assert all(issues[0]["type"] == "SEMANTIC_REDUNDANCY" for _, issues in results.values())
+    assert fake.calls == 24 # Two semantic rules per file.
+    assert fake.max_in_flight == 8 # Four files, two rules each.
+    assert elapsed < 24 * 0.05 / 2 # Well under the serial round-trip time.
+
+def test_rate_limited_requests_are_retried(make_validator, write_prompts):
+    fake = FakeLLM(responder=respond, rate_limit_first=4)
+    validator = make_validator(fake)
+    results = asyncio.run(validator.validate_many(write_prompts(5), concurrency=2))
+    assert all(len(issues) == 1 for _, issues in results.values()) # Every file still got its verdict.
+    assert fake.calls == 14 # Four rate-limited requests were retried.
+
+def test_timeouts_surface_as_error_without_issues(make_validator, write_prompts):
+    fake = FakeLLM(responder=respond, latency=1.0)
+    validator = make_validator(fake, {"timeout": 0.01, "max_retries": 1})
+    results = asyncio.run(validator.validate_many(write_prompts(2)))
+    assert all(issues == [] for _, issues in results.values())
+    assert fake.calls == 8 # Two files, two rules, one retry each, then give up.
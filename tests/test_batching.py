@@ -0,0 +1,74 @@
+# File: tests/test_batching.py
+import json # Import json to build fake batched replies.
+import asyncio # Import asyncio to drive the async engine.
+from prompt_validator.batching import pack_batches, parse_batch_response # Import the batching helpers.
+from prompt_validator.rules.semantic import RedundancyRule, ContradictionRule # Import the semantic rules.
+from prompt_validator.cache import VerdictCache # Import the verdict cache.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+def batch_responder(system, user): # Answer batched requests in JSON and single requests in the legacy format.
+    if "JSON array" not in system:
+        return "None"
+    items = json.loads(user)
+    return json.dumps({"results": [
+        {"id": item["id"], "SEMANTIC_REDUNDANCY": ["Be brief."], "SEMANTIC_CONFLICT": []} for item in items
+    ]})
+
+def test_pack_batches_respects_size_and_token_budget():
+    items = [(str(i), "x" * 40) for i in range(5)] # Each item costs 10 + 12 estimated tokens.
+    assert [len(batch) for batch in pack_batches(items, 2, 10_000)] == [2, 2, 1]
+    assert [len(batch) for batch in pack_batches(items, 10, 50)] == [2, 2, 1]
+    assert [len(batch) for batch in pack_batches([("big", "x" * 1000)], 10, 50)] == [1] # Oversized items go alone.
+
+def test_parse_batch_response_handles_fences_and_garbage():
+    rules = [RedundancyRule(llm_client=object()), ContradictionRule(llm_client=object())]
+    reply = '```json\n{"results": [{"id": "0", "SEMANTIC_REDUNDANCY": [], "SEMANTIC_CONFLICT": [["a", "b"]]}]}\n```'
+    parsed = parse_batch_response(reply, rules, ["0", "1"])
+    assert parsed["0"]["SEMANTIC_REDUNDANCY"] == []
+    assert parsed["0"]["SEMANTIC_CONFLICT"][0]["details"]["conflicting_phrases"] == ["a", "b"]
+    assert "1" not in parsed # Missing entries are left for the fallback.
+    assert parse_batch_response("Sorry, I cannot help.", rules, ["0"]) == {}
+    assert parse_batch_response('{"results": [{"id": "0", "SEMANTIC_CONFLICT": "oops"}]}', rules, ["0"]) == {"0": {}}
+
+def test_batched_validation_cuts_requests(make_validator, write_prompts):
+    fake = FakeLLM(responder=batch_responder)
+    validator = make_validator(fake, batch_size=4)
+    results = asyncio.run(validator.validate_many(write_prompts(6)))
+    assert fake.calls == 2 # Six files in batches of four, both rules per request.
+    for _, issues in results.values():
+        assert [issue["type"] for issue in issues] == ["SEMANTIC_REDUNDANCY"]
+
+def test_batched_validation_falls_back_per_file(make_validator, write_prompts):
+    fake = FakeLLM(responder=lambda system, user: "not json" if "JSON array" in system else "Be brief.")
+    validator = make_validator(fake, batch_size=3, batch_combine_rules=False)
+    results = asyncio.run(validator.validate_many(write_prompts(3)))
+    assert fake.calls == 2 + 6 # One failed batch per rule, then one query per file and rule.
+    assert all(issues[0]["details"]["redundant_phrase"] == "Be brief." for _, issues in results.values())
+
+def test_batched_verdicts_are_cached_under_the_batch_prompt(make_validator, write_prompts, tmp_path, monkeypatch):
+    fake = FakeLLM(responder=batch_responder)
+    cache = VerdictCache(str(tmp_path / "cache"))
+    paths = write_prompts(2)
+    asyncio.run(make_validator(fake, batch_size=4, cache=cache).validate_many(paths))
+    asyncio.run(make_validator(fake, batch_size=4, cache=cache).validate_many(paths))
+    assert fake.calls == 1 # The second run reused the batched verdicts.
+
+    monkeypatch.setattr(RedundancyRule, "BATCH_INSTRUCTION", RedundancyRule.BATCH_INSTRUCTION + " (v2)")
+    asyncio.run(make_validator(fake, batch_size=4, cache=cache).validate_many(paths))
+    assert fake.calls == 2 # A changed batch instruction invalidates them.
+
+def test_batched_results_stream_from_a_bounded_window(make_validator, write_prompts):
+    fake = FakeLLM(responder=batch_responder)
+    validator = make_validator(fake, batch_size=2)
+    pulled = [] # Paths the engine has taken from the iterable.
+
+    def paths(): # Record how far ahead of the results the engine reads.
+        for path in write_prompts(20):
+            pulled.append(path)
+            yield path
+
+    async def first_result():
+        async for file_path, _, _ in validator.validate_iter(paths(), concurrency=3):
+            return file_path, len(pulled)
+    file_path, read = asyncio.run(first_result())
+    assert file_path == pulled[0] and read == 6 # One window of batch_size * concurrency files, not all 20.
@@ -0,0 +1,24 @@
+# File: tests/test_benchmarks.py
+import json # Import json to read benchmark results.
+from benchmarks.corpus import generate_corpus # Import the corpus generator.
+from benchmarks.__main__ import main # Import the benchmark runner.
+
+def read_all(paths): # Contents of every generated file.
+    return [open(path, encoding="utf-8").read() for path in paths]
+
+def test_corpus_is_deterministic(tmp_path):
+    first = generate_corpus(str(tmp_path / "a"), files=12, seed=7)
+    second = generate_corpus(str(tmp_path / "b"), files=12, seed=7)
+    other = generate_corpus(str(tmp_path / "c"), files=12, seed=8)
+    assert read_all(first["paths"]) == read_all(second["paths"])
+    assert read_all(first["paths"]) != read_all(other["paths"])
+
+def test_runner_emits_comparable_json(tmp_path):
+    output = tmp_path / "results.json"
+    main(["--files", "5", "--scenario", "rules", "fix", "--repeat", "1", "--output", str(output)])
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["config"]["files"] == 5 and report["corpus"]["files"] == 5
+    assert [(row["scenario"], row["name"]) for row in report["results"]] == [
+        ("rules", "COMPLETENESS_CHECK"), ("rules", "PII_CHECK"),
+        ("rules", "SEMANTIC_REDUNDANCY:prefilter"), ("fix", "fix_content"),
+    ]
@@ -0,0 +1,59 @@
+# File: tests/test_cache.py
+import asyncio # Import asyncio to drive the async engine.
+from prompt_validator.cache import VerdictCache # Import the verdict cache.
+from prompt_validator.llm_client import LLMClient, AsyncLLMClient # Import the LLM clients.
+from prompt_validator.rules.semantic import RedundancyRule # Import a semantic rule.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+def test_cached_verdicts_skip_the_llm(tmp_path):
+    fake = FakeLLM(responder=lambda system, user: "Be detailed.", is_async=False)
+    cache = VerdictCache(str(tmp_path))
+    rule = RedundancyRule(llm_client=LLMClient(client=fake), cache=cache)
+
+    first = rule.validate("Be detailed. Be detailed.")
+    second = rule.validate("Be detailed. Be detailed.")
+
+    assert first == second and first[0]["details"]["redundant_phrase"] == "Be detailed."
+    assert fake.calls == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+def test_cache_persists_across_runs_and_is_shared_with_async(tmp_path):
+    sync_fake = FakeLLM(responder=lambda system, user: "None", is_async=False)
+    cache = VerdictCache(str(tmp_path))
+    RedundancyRule(llm_client=LLMClient(client=sync_fake), cache=cache).validate("Some prompt.")
+    cache.close()
+
+    async_fake = FakeLLM()
+    reopened = VerdictCache(str(tmp_path))
+    rule = RedundancyRule(llm_client=LLMClient(client=sync_fake), async_llm_client=AsyncLLMClient(client=async_fake), cache=reopened)
+    assert asyncio.run(rule.validate_async("Some prompt.")) == []
+    assert async_fake.calls == 0 and reopened.hits == 1
+
+def test_key_changes_with_rule_prompt_and_model():
+    base = VerdictCache.make_key("R", "prompt", "model", 0.0, "content")
+    assert base == VerdictCache.make_key("R", "prompt", "model", 0.0, "content")
+    assert base != VerdictCache.make_key("R", "prompt v2", "model", 0.0, "content")
+    assert base != VerdictCache.make_key("R", "prompt", "other-model", 0.0, "content")
+    assert base != VerdictCache.make_key("R", "prompt", "model", 0.0, "content!")
+
+def test_failed_queries_are_not_cached(tmp_path):
+    def fail(system, user):
+        raise RuntimeError("boom")
+    fake = FakeLLM(responder=fail, is_async=False)
+    cache = VerdictCache(str(tmp_path))
+    rule = RedundancyRule(llm_client=LLMClient(client=fake), cache=cache)
+    rule.validate("text")
+    rule.validate("text")
+    assert fake.calls == 2
+
+def test_eviction_by_size_and_age(tmp_path):
+    cache = VerdictCache(str(tmp_path), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, [])
+    cache.get("a") # Touch "a" so "b" is the least recently used.
+    cache.evict()
+    assert cache.get("b") is None and cache.get("a") == [] and cache.get("c") == []
+
+    cache.max_age_seconds = -1 # Everything is now too old.
+    cache.evict()
+    assert cache.get("a") is None
@@ -0,0 +1,69 @@
+# File: tests/test_chunking.py
+import asyncio # Import asyncio to drive the async engine.
+from prompt_validator import chunking # Import the prompt chunker.
+from prompt_validator.llm_client import LLMClient # Import the LLM client.
+from prompt_validator.rules.semantic import ContradictionRule # Import the contradiction rule.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+def section(title: str, sentence: str, count: int) -> str: # A section repeating one filler sentence.
+    return f"## {title}:\n" + "".join(f"{sentence} Item {i}.\n" for i in range(count))
+
+LARGE = ( # About 1,400 estimated tokens; the first and last sections conflict.
+    section("Task", "Always answer in under fifty words.", 40)
+    + section("Context", "The store sells garden tools.", 40)
+    + section("Examples", "Write a reply of at least five hundred words.", 40)
+)
+
+def test_estimate_is_offline_and_errs_high():
+    assert chunking.estimate_tokens("x" * 40) == 10 # Four characters per token for long words.
+    assert chunking.estimate_tokens("a, b, c, d!") == 8 # Never fewer than the pre-tokenizer pieces.
+
+def test_chunks_follow_sections_and_windows_overlap():
+    chunks = chunking.chunk_prompt(LARGE, max_tokens=600, overlap_tokens=20)
+    assert [chunk.splitlines()[0] for chunk in chunks] == ["## Task:", "## Context:", "## Examples:"]
+    assert "".join(chunks) == LARGE # Sections are split, not altered.
+
+    windows = chunking.split_windows(LARGE, max_tokens=300, overlap_tokens=40)
+    assert len(windows) > 4 and all(chunking.estimate_tokens(window) <= 330 for window in windows)
+    assert all(window.endswith("\n") for window in windows[:-1]) # Cut at line breaks.
+    assert windows[1].splitlines()[0] in windows[0] # Each window repeats the end of the previous one.
+
+def test_cross_chunk_contradictions_are_found_and_merged():
+    def respond(system, user): # Only a text holding both instructions reveals the conflict.
+        if "under fifty words" in user and "five hundred words" in user:
+            return "PHRASE: Always answer in under fifty words.\nPHRASE: Write a reply of at least five hundred words."
+        return "None"
+
+    fake = FakeLLM(responder=respond, is_async=False)
+    rule = ContradictionRule(llm_client=LLMClient(client=fake), max_chunk_tokens=600)
+    issues = rule.validate(LARGE)
+    assert fake.calls == 4 # Three sections and one digest of their instructions.
+    assert [issue["details"]["conflicting_phrases"] for issue in issues] == [
+        ["Always answer in under fifty words.", "Write a reply of at least five hundred words."]]
+    reversed_pair = rule._issue(list(reversed(issues[0]["details"]["conflicting_phrases"])))
+    assert rule.merge_issues([issues, [reversed_pair]]) == issues # The same pair in either order is one conflict.
+
+def test_batched_engine_chunks_oversized_prompts(tmp_path, make_validator):
+    sent = [] # User messages that reached the LLM.
+    def respond(system, user): # The one small prompt in a batch gets id "0".
+        sent.append(user)
+        return '{"results": [{"id": "0", "SEMANTIC_CONFLICT": []}]}' if user.startswith("[") else "None"
+
+    fake = FakeLLM(responder=respond)
+    small, large = tmp_path / "small.txt", tmp_path / "large.txt"
+    small.write_text("## Task:\nSummarize.\n", encoding="utf-8")
+    large.write_text(LARGE, encoding="utf-8")
+    validator = make_validator(fake, rule_ids=["SEMANTIC_CONFLICT"], batch_size=4, max_chunk_tokens=600)
+    asyncio.run(validator.validate_many([str(small), str(large)]))
+    assert max(chunking.estimate_tokens(user) for user in sent) <= 600 # The large prompt never went out whole.
+    assert sum(user.startswith("## ") for user in sent) == 4 # Its three sections and the digest, outside the batch.
+    assert sum(user.startswith("[") for user in sent) == 1 # The small prompt was still batched.
+
+def test_chunk_requests_stay_under_the_validator_cap(tmp_path, make_validator):
+    large = tmp_path / "large.txt"
+    large.write_text(LARGE, encoding="utf-8")
+    for batch_size in (1, 4): # Per-file and batched engines.
+        fake = FakeLLM(latency=0.01)
+        validator = make_validator(fake, rule_ids=["SEMANTIC_CONFLICT"], batch_size=batch_size, max_chunk_tokens=200)
+        asyncio.run(validator.validate_many([str(large)] * 3, concurrency=2))
+        assert fake.calls > 20 and fake.max_in_flight == 2 # Many chunks, never more requests than two files need.
@@ -0,0 +1,89 @@
+# File: tests/test_cli.py
+import json # Import json to read JSON reports.
+import socket # Import socket to find a port nothing listens on.
+import click # Import click to answer the fix prompt.
+import pytest # Import pytest for fixtures.
+from click.testing import CliRunner # Import click's in-process runner.
+from prompt_validator import llm_client # Import the LLM client module to control the API key lookup.
+from prompt_validator.cli import main # Import the CLI entry point.
+
+PROMPT = "## Task:\nSummarize.\n## Success Criteria:\n- ok\n## Examples:\n- one\nEmail a@b.com\n"
+
+@pytest.fixture
+def no_api_key(monkeypatch): # No key in the environment, and no .env file is read.
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(llm_client, "_dotenv_loaded", True)
+
+def test_missing_api_key_stops_before_any_output(tmp_path, no_api_key):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    result = CliRunner().invoke(main, ["check", str(tmp_path), "--report-format", "json", "--no-cache"])
+    assert result.exit_code == 1 and "OPENAI_API_KEY" in result.output
+    assert "Scanning" not in result.output and "{" not in result.output # No half-written report.
+    result = CliRunner().invoke(main, ["check", str(tmp_path), "--offline", "--report-format", "json"])
+    assert result.exit_code == 0 # Local rules need no key.
+
+def test_client_fallback_without_api_key_is_a_clean_error(tmp_path, no_api_key):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    result = CliRunner().invoke(main, ["client", str(tmp_path / "a.txt"), "--server", "http://127.0.0.1:9"])
+    assert result.exit_code == 1 and "OPENAI_API_KEY" in result.output and "validate locally" in result.output
+
+def json_report(output): # The JSON report that follows the "Scanning directory" line.
+    return json.loads(output[output.index("{"):])
+
+def test_directory_argument_runs_check(tmp_path):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    result = CliRunner().invoke(main, [str(tmp_path), "--offline"])
+    assert result.exit_code == 0 and result.output.startswith(f"Scanning directory: {tmp_path}")
+
+def test_offline_json_report(tmp_path):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    (tmp_path / "b.txt").write_text("Summarize.\n", encoding="utf-8")
+    result = CliRunner().invoke(main, ["check", str(tmp_path), "--offline", "--report-format", "json"])
+    assert result.exit_code == 0
+    results = json_report(result.output)["results"]
+    assert [issue["type"] for issue in results[str(tmp_path / "a.txt")]] == ["PII_CHECK"]
+    assert {issue["type"] for issue in results[str(tmp_path / "b.txt")]} == {"COMPLETENESS_CHECK"}
+
+def test_incremental_run_skips_unchanged_files(tmp_path):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    (tmp_path / "b.txt").write_text(PROMPT, encoding="utf-8")
+    args = ["check", str(tmp_path), "--offline", "--incremental", "--report-format", "json"]
+    first = json_report(CliRunner().invoke(main, args).output)
+    assert first["stats"]["incremental"] == {"validated": 2, "skipped": 0}
+    (tmp_path / "b.txt").write_text(PROMPT + "Call 555-123-4567.\n", encoding="utf-8")
+    second = json_report(CliRunner().invoke(main, args).output)
+    assert second["stats"]["incremental"] == {"validated": 1, "skipped": 1}
+    assert second["results"][str(tmp_path / "a.txt")] == first["results"][str(tmp_path / "a.txt")]
+    assert len(second["results"][str(tmp_path / "b.txt")]) == 2 # The new phone number was found.
+
+def test_fix_skips_a_file_edited_before_confirming(tmp_path, monkeypatch):
+    stable, edited = tmp_path / "a.txt", tmp_path / "b.txt"
+    stable.write_text(PROMPT, encoding="utf-8")
+    edited.write_text(PROMPT, encoding="utf-8")
+
+    def confirm(text): # The user edits one file while the report is on screen, then accepts.
+        edited.write_text("Email someone@else.org and more.\n", encoding="utf-8")
+        return True
+    monkeypatch.setattr(click, "confirm", confirm)
+    result = CliRunner().invoke(main, ["check", str(tmp_path), "--offline", "--fix", "--workers", "1"])
+    assert result.exit_code == 0
+    assert f"Skipped {edited}: file changed since validation." in result.output
+    assert f"Applied fixes to {stable}" in result.output
+    assert "[REDACTED_EMAIL]" in stable.read_text(encoding="utf-8")
+    assert edited.read_text(encoding="utf-8") == "Email someone@else.org and more.\n" # The edit survived.
+
+def test_client_without_fallback_fails_when_no_server_runs(tmp_path):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    with socket.socket() as probe: # A port nothing listens on.
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    result = CliRunner().invoke(main, ["client", str(tmp_path / "a.txt"), "--server", f"http://127.0.0.1:{port}", "--no-fallback"])
+    assert result.exit_code == 1 and "no validation server" in result.output
+
+def test_offline_with_only_llm_rules_is_rejected(tmp_path):
+    (tmp_path / "a.txt").write_text(PROMPT, encoding="utf-8")
+    for command in (["check", str(tmp_path)], ["serve", "--port", "0"]):
+        result = CliRunner().invoke(main, command + ["--rules", "SEMANTIC_CONFLICT", "--offline"])
+        assert result.exit_code == 2 and "--offline leaves none of SEMANTIC_CONFLICT to run" in result.output
+    result = CliRunner().invoke(main, ["check", str(tmp_path), "--rules", " , "])
+    assert result.exit_code == 2 and "no rule ids given" in result.output
@@ -0,0 +1,58 @@
+# File: tests/test_discovery.py
+import io # Import io to capture streamed output.
+import json # Import json to parse the streamed report.
+import asyncio # Import asyncio to drive the async engine.
+from prompt_validator.discovery import iter_prompt_files # Import file discovery.
+from prompt_validator.reporter import StreamingReporter # Import the incremental reporter.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+
+def make_tree(root, files): # Create files (with parent directories) under root.
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+def relative(root, paths): # Express discovered paths relative to root.
+    return [str(path)[len(str(root)) + 1:].replace("\\\\", "/") for path in paths]
+
+def test_walk_recurses_and_applies_globs(tmp_path):
+    make_tree(tmp_path, {"a.txt": "", "notes.md": "", "sub/b.txt": "", "sub/deep/c.txt": "", "vendor/d.txt": ""})
+    assert relative(tmp_path, iter_prompt_files(str(tmp_path))) == ["a.txt", "sub/b.txt", "sub/deep/c.txt", "vendor/d.txt"]
+    assert relative(tmp_path, iter_prompt_files(str(tmp_path), exclude=["vendor", "**/deep/*.txt"])) == ["a.txt", "sub/b.txt"]
+    assert relative(tmp_path, iter_prompt_files(str(tmp_path), include=["*.md", "sub/*.txt"])) == ["notes.md", "sub/b.txt"]
+    assert relative(tmp_path, iter_prompt_files(str(tmp_path), recursive=False)) == ["a.txt"]
+
+def test_gitignore_rules_are_scoped_and_negatable(tmp_path):
+    make_tree(tmp_path, {
+        ".gitignore": "# generated\nbuild/\n*.tmp.txt\n!keep.tmp.txt\n",
+        "a.txt": "", "x.tmp.txt": "", "keep.tmp.txt": "", "build/b.txt": "",
+        "sub/.promptignore": "/local.txt\n", "sub/local.txt": "", "sub/y.tmp.txt": "", "sub/ok.txt": "",
+        "local.txt": "",
+    })
+    assert relative(tmp_path, iter_prompt_files(str(tmp_path))) == ["a.txt", "keep.tmp.txt", "local.txt", "sub/ok.txt"]
+
+def test_streaming_reporter_writes_valid_json():
+    stream = io.StringIO()
+    reporter = StreamingReporter("json", stream)
+    reporter.add("a.txt", [{"type": "PII_CHECK", "details": {"value": "x"}}])
+    reporter.add("clean.txt", [])
+    reporter.add("b.txt", [{"type": "COMPLETENESS_CHECK"}])
+    reporter.finish({"cache": {"hits": 1}})
+    report = json.loads(stream.getvalue())
+    assert list(report["results"]) == ["a.txt", "b.txt"] and report["stats"] == {"cache": {"hits": 1}}
+
+def test_validate_iter_pulls_paths_lazily(tmp_path):
+    make_tree(tmp_path, {f"p{i}.txt": "## Task:\nhi\n" for i in range(20)})
+    pulled = [] # Paths handed to the engine so far.
+
+    def paths():
+        for path in iter_prompt_files(str(tmp_path)):
+            pulled.append(path)
+            yield path
+
+    async def first_result():
+        validator = PromptValidator(rule_ids=["COMPLETENESS_CHECK"])
+        async for file_path, content, issues in validator.validate_iter(paths(), concurrency=2):
+            return len(pulled)
+
+    assert asyncio.run(first_result()) < 20 # The engine did not drain the walk before yielding.
@@ -0,0 +1,63 @@
+# File: tests/test_fixes.py
+import os # Import os to inspect written files.
+from prompt_validator.fixes import FixPlan # Import the single-pass fix plan.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+from prompt_validator.rules.semantic import RedundancyRule, ContradictionRule # Import the semantic rules.
+
+def sequential_fix(validator, content, issues): # The previous behaviour: one rule.fix call per issue.
+    rule_map = {rule.rule_id: rule for rule in validator.rules}
+    for issue in issues:
+        content = rule_map[issue["type"]].fix(content, issue)
+    return content
+
+def test_plan_resolves_overlaps_and_builds_once():
+    plan = FixPlan()
+    plan.replace(6, 11, "X")
+    plan.replace(0, 5, "A")
+    plan.replace(8, 14, "Y") # Overlaps the first edit and is dropped.
+    plan.replace(0, 5, "A") # Duplicate edits are applied once.
+    assert plan.apply("hello world again") == "A X again"
+    assert plan.skipped == 1
+
+def test_redacts_only_the_matched_span():
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    content = "Mail a@b.co now. The literal a@b.co in a quote: 'a@b.co'.\n"
+    issue = validator.rules[0].validate(content)[1] # Only the second occurrence.
+    assert validator.fix_content(content, [issue]) == "Mail a@b.co now. The literal [REDACTED_EMAIL] in a quote: 'a@b.co'.\n"
+
+def test_single_pass_matches_sequential_fixes():
+    validator = PromptValidator(rule_ids=["PII_CHECK", "COMPLETENESS_CHECK"])
+    redundancy, contradiction = RedundancyRule(llm_client=object()), ContradictionRule(llm_client=object())
+    validator.rules += [redundancy, contradiction]
+    content = "  ## Task:\nBe brief. Be brief. Mail x@y.io, call 555-123-4567.\n" * 3
+    issues = [issue for rule in validator.rules[:2] for issue in rule.validate(content)]
+    issues += [redundancy._issue("Be brief. "), contradiction._issue(["Be brief.", "Be verbose."])]
+    assert validator.fix_content(content, issues) == sequential_fix(validator, content, issues)
+
+def test_repeated_redundancy_issues_remove_one_copy_each():
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    redundancy = RedundancyRule(llm_client=object())
+    validator.rules.append(redundancy)
+    content = "Be brief. Be brief. Be brief. Done.\n"
+    issues = [redundancy._issue("Be brief. ")] * 2
+    assert validator.fix_content(content, issues) == sequential_fix(validator, content, issues) == "Be brief. Done.\n"
+
+def test_fix_file_writes_atomically(tmp_path):
+    path = tmp_path / "p.txt"
+    path.write_text("Key sk_ABCDEFGHIJKLMNOPQRSTUVWX\n", encoding="utf-8")
+    os.chmod(path, 0o640)
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    content, issues = validator.validate_file(str(path))
+    validator.fix_file(str(path), content, issues)
+    assert path.read_text(encoding="utf-8") == "Key [REDACTED_GENERIC_SECRET]\n"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["p.txt"] # No temporary files left behind.
+
+def test_fix_file_writes_through_symlinks(tmp_path):
+    target, link = tmp_path / "real.txt", tmp_path / "link.txt"
+    target.write_text("Mail a@b.co\n", encoding="utf-8")
+    os.symlink(target, link)
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    content, issues = validator.validate_file(str(link))
+    validator.fix_file(str(link), content, issues)
+    assert os.path.islink(link) and target.read_text(encoding="utf-8") == "Mail [REDACTED_EMAIL]\n"
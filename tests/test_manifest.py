@@ -0,0 +1,75 @@
+# File: tests/test_manifest.py
+import os # Import os to adjust modification times.
+from prompt_validator.manifest import Manifest, rule_source_files # Import the incremental-run manifest.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+
+def setup_files(tmp_path): # Two prompts and a manifest path.
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("## Task:\nMail a@example.com\n", encoding="utf-8")
+    b.write_text("## Task:\nNothing here\n", encoding="utf-8")
+    return str(a), str(b), str(tmp_path / "manifest.json")
+
+def run(paths, manifest_path, rule_ids=("PII_CHECK",), changed=None): # One incremental run, saved like the CLI does.
+    manifest = Manifest.load(manifest_path)
+    results = PromptValidator(rule_ids=rule_ids).validate_incremental(paths, manifest, changed)
+    manifest.save()
+    return results, manifest.reused
+
+def test_unchanged_files_reuse_stored_issues(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    first, reused = run([a, b], manifest_path)
+    assert reused == 0 and first[a][0]["details"]["value"] == "a@example.com"
+    second, reused = run([a, b], manifest_path)
+    assert reused == 2 and second == first
+
+def test_changed_content_and_rules_are_revalidated(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    run([a, b], manifest_path)
+    with open(b, "a", encoding="utf-8") as f:
+        f.write("Call 555-123-4567\n")
+    results, reused = run([a, b], manifest_path)
+    assert reused == 1 and results[b][0]["details"]["pii_type"] == "PHONE_NUMBER"
+    _, reused = run([a, b], manifest_path, rule_ids=("PII_CHECK", "COMPLETENESS_CHECK"))
+    assert reused == 0 # A different rule set invalidates every entry.
+
+def test_touched_but_identical_files_are_reused(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    run([a, b], manifest_path)
+    os.utime(a, ns=(1, 1)) # New mtime, same content (e.g. a fresh checkout).
+    _, reused = run([a, b], manifest_path)
+    assert reused == 2
+
+def test_git_changed_set_overrides_metadata(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    run([a, b], manifest_path)
+    _, reused = run([a, b], manifest_path, changed={os.path.abspath(a)})
+    assert reused == 1 # Only b was trusted.
+
+def test_manifest_older_than_git_ref_is_not_trusted(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    run([a, b], manifest_path) # The manifest predates the commit below.
+    with open(a, "w", encoding="utf-8") as f: # Changed and committed, so git reports nothing since HEAD.
+        f.write("## Task:\nCall 555-123-4567\n")
+    results, reused = run([a, b], manifest_path, changed=set())
+    assert reused == 1 and results[a][0]["details"]["pii_type"] == "PHONE_NUMBER"
+
+def test_edits_during_validation_are_not_hidden(tmp_path):
+    a, b, manifest_path = setup_files(tmp_path)
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    read = validator._read_file
+    def read_then_edit(file_path): # The file is edited right after the validator read it.
+        content, errors = read(file_path)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("## Task:\nMail x@y.com\nCall 555-123-4567\n")
+        return content, errors
+    validator._read_file = read_then_edit
+    manifest = Manifest.load(manifest_path)
+    validator.validate_incremental([a], manifest)
+    manifest.save()
+    results, reused = run([a], manifest_path)
+    assert reused == 0 and [issue["details"]["value"] for issue in results[a]] == ["x@y.com", "555-123-4567"]
+
+def test_rules_version_covers_helper_modules():
+    rule = PromptValidator(llm_client=object(), rule_ids=["SEMANTIC_REDUNDANCY"]).rules[0]
+    names = {os.path.basename(path) for path in rule_source_files(rule)}
+    assert {"semantic.py", "similarity.py", "chunking.py"} <= names # The pre-filter and chunker shape its verdicts.
@@ -0,0 +1,42 @@
+# File: tests/test_parallel.py
+import pytest # Import the pytest framework.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+from prompt_validator.rules import LOCAL_RULES # Import the local rule registry.
+from prompt_validator.manifest import file_fingerprint, content_hash # Import file-state helpers.
+
+LOCAL_IDS = [Rule.rule_id for Rule in LOCAL_RULES] # Rules that need no LLM.
+
+def write_corpus(tmp_path, count): # Create prompts, every third one leaking an email.
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"prompt{i}.txt"
+        email = f"user{i}@example.com" if i % 3 == 0 else "nobody"
+        path.write_text(f"## Task:\nContact {email}.\n## Examples:\n- one\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+def test_parallel_matches_serial_validation(tmp_path):
+    validator = PromptValidator(rule_ids=LOCAL_IDS)
+    paths = write_corpus(tmp_path, 25)
+    parallel = dict(validator.validate_parallel(iter(paths), workers=2, chunk_size=4))
+    serial = {path: validator.validate_file(path)[1] for path in paths}
+    assert parallel == serial
+
+def test_parallel_ships_the_validated_file_state(tmp_path):
+    validator = PromptValidator(rule_ids=LOCAL_IDS)
+    paths = write_corpus(tmp_path, 5)
+    for path, issues, (fingerprint, digest) in validator.validate_parallel(paths, workers=2, chunk_size=2, with_state=True):
+        assert fingerprint == file_fingerprint(path) and digest == content_hash(open(path, encoding="utf-8").read())
+
+def test_rule_selection():
+    validator = PromptValidator(rule_ids=["PII_CHECK"])
+    assert [rule.rule_id for rule in validator.rules] == ["PII_CHECK"]
+    with pytest.raises(ValueError):
+        PromptValidator(rule_ids=["NOT_A_RULE"])
+    with pytest.raises(ValueError, match="no rules"): # Running nothing would report every file clean.
+        PromptValidator(rule_ids=[])
+
+def test_parallel_rejects_llm_rules():
+    validator = PromptValidator(llm_client=object(), rule_ids=["SEMANTIC_CONFLICT"])
+    with pytest.raises(ValueError):
+        validator.validate_parallel([])
@@ -0,0 +1,33 @@
+# File: tests/test_profiling.py
+import asyncio # Import asyncio to drive the async engine.
+from prompt_validator.profiling import Profiler, percentiles # Import run instrumentation.
+from prompt_validator.validator import PromptValidator # Import the main validator class.
+from .fake_llm import FakeLLM, respond # Import the fake LLM stub.
+
+def test_percentiles_use_nearest_rank():
+    summary = percentiles([float(value) for value in range(1, 101)])
+    assert (summary["count"], summary["total"], summary["p50"], summary["p95"], summary["p99"]) == (100, 5050.0, 50.0, 95.0, 99.0)
+    assert percentiles([]) == {"count": 0, "total": 0.0}
+
+def test_async_run_records_rules_files_tokens_and_retries(make_validator, write_prompts):
+    events = [] # Everything the export hook saw.
+    profiler = Profiler(hooks=[events.append], prompt_price_per_1k=1.0, completion_price_per_1k=2.0)
+    fake = FakeLLM(responder=respond, rate_limit_first=3)
+    validator = make_validator(fake, profiler=profiler)
+    asyncio.run(validator.validate_many(write_prompts(4), concurrency=1))
+
+    summary = profiler.summary()
+    assert summary["files"]["count"] == 4
+    assert {rule_id: timings["count"] for rule_id, timings in summary["rules"].items()} == {
+        "COMPLETENESS_CHECK": 4, "PII_CHECK": 4, "SEMANTIC_REDUNDANCY": 4, "SEMANTIC_CONFLICT": 4}
+    llm = summary["llm"]
+    assert (llm["queries"], llm["errors"]) == (8, 0) and llm["retries"] == fake.calls - 8 > 0 # Rate limits were retried.
+    assert llm["attempt_seconds"]["count"] == fake.calls and llm["prompt_tokens"] > 0
+    assert llm["estimated_cost"] == round(llm["prompt_tokens"] / 1000 + llm["completion_tokens"] / 1000 * 2, 6)
+    assert len(events) == 4 + 16 + 8 and {event["event"] for event in events} == {"file", "rule", "llm"}
+
+def test_parallel_workers_report_to_the_parent(write_prompts):
+    profiler = Profiler()
+    validator = PromptValidator(rule_ids=["PII_CHECK"], profiler=profiler)
+    list(validator.validate_parallel(write_prompts(6), workers=2, chunk_size=2))
+    assert profiler.summary()["rules"]["PII_CHECK"]["count"] == 6 and profiler.summary()["files"]["count"] == 6
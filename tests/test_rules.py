@@ -0,0 +1,52 @@
+# File: tests/test_rules.py
+import re # Import re to reproduce the per-pattern scan.
+from prompt_validator.rules.pii import PIIRule # Import the PII rule.
+from prompt_validator.rules.completeness import CompletenessRule # Import the completeness rule.
+
+TEXT = (
+    "## Task:\nEmail jane.doe@example.org or call +1 555-123-4567.\n"
+    "Use token sk_ABCDEFGHIJKLMNOPQRSTUVWX and reach bob@corp.io later.\n"
+    "## examples\n- none\n"
+)
+
+def per_pattern_scan(content): # The original one-pass-per-pattern behaviour.
+    return [(pii_type, match.group(0)) for pii_type, pattern in PIIRule.PII_PATTERNS.items()
+            for match in re.finditer(pattern, content)]
+
+def test_single_pass_scanner_matches_per_pattern_scan():
+    found = [(issue["details"]["pii_type"], issue["details"]["value"]) for issue in PIIRule().validate(TEXT)]
+    assert found == per_pattern_scan(TEXT)
+    assert [pii_type for pii_type, _ in found] == ["EMAIL", "EMAIL", "PHONE_NUMBER", "GENERIC_SECRET"]
+
+def test_prefilter_skips_impossible_patterns():
+    rule = PIIRule()
+    assert rule.scanner("plain words only") is None
+    assert rule.scanner("mail me at a@b.co").groupindex.keys() == {"EMAIL"}
+    assert rule.validate("no secrets in sk-like text") == []
+
+def test_completeness_single_pass_reports_missing_in_order():
+    issues = CompletenessRule().validate(TEXT)
+    assert [issue["details"]["missing_section"] for issue in issues] == ["Success Criteria"]
+    assert [issue["details"]["missing_section"] for issue in CompletenessRule().validate("")] == CompletenessRule.REQUIRED_SECTIONS
+
+def test_line_windows_keep_matches_that_wrap_lines():
+    text = "intro\n" * 50 + "Call 555\n123\n4567 today.\n" + "outro\n" * 50
+    values = [issue["details"]["value"] for issue in PIIRule().validate(text)]
+    assert values == ["555\n123\n4567"]
+
+def test_overlapping_findings_of_different_types_are_all_reported():
+    for text in ("Text me at 5551234567@vtext.com", "Send to token_ABCDEFGHIJKLMNOPQRSTUVWX@corp.example.com now.",
+                 "ids 555-123-4567@x.io and sk_ABCDEFGHIJKLMNOPQRSTUVWXYZ\n"):
+        found = [(issue["details"]["pii_type"], issue["details"]["value"]) for issue in PIIRule().validate(text)]
+        assert found == per_pattern_scan(text)
+    types = [issue["details"]["pii_type"] for issue in PIIRule().validate("Text me at 5551234567@vtext.com")]
+    assert types == ["EMAIL", "PHONE_NUMBER"]
+
+def test_subclass_can_add_a_pattern_without_prefilter_tables():
+    class SSNRule(PIIRule): # An extra type with no TRIGGER_CHARS or FIRST_CHARS entry.
+        PII_PATTERNS = {**PIIRule.PII_PATTERNS, "SSN": r"\b\d{3}-\d{2}-\d{4}\b"}
+    text = "intro\n" * 20 + "SSN 123-45-6789, mail a@b.co or call 555-123-4567.\n"
+    found = [(issue["details"]["pii_type"], issue["details"]["value"]) for issue in SSNRule().validate(text)]
+    assert found == [(pii_type, match.group(0)) for pii_type, pattern in SSNRule.PII_PATTERNS.items()
+                     for match in re.finditer(pattern, text)]
+    assert ("SSN", "123-45-6789") in found
@@ -0,0 +1,99 @@
+# File: tests/test_server.py
+import json # Import json to inspect HTTP responses.
+import time # Import time to wait for queued work.
+import socket # Import socket to hold a port that never answers.
+import threading # Import threading to fire concurrent requests.
+import urllib.error # Import urllib errors to read error responses.
+import urllib.request # Import urllib to call the server.
+import pytest # Import pytest for assertions on exceptions.
+from prompt_validator.cache import VerdictCache # Import the verdict cache.
+from prompt_validator.server import ValidationServer, ServerUnavailable, request_validation # Import the server.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+PROMPT = "## Task:\nSummarize.\n## Success Criteria:\n- ok\n## Examples:\n- one\nEmail a@b.com\n"
+
+@pytest.fixture
+def make_server(make_validator): # Factory for servers on a free port, wired to the fake LLM.
+    def make(fake, **options):
+        validator = make_validator(fake, cache=VerdictCache(VerdictCache.MEMORY))
+        return ValidationServer(validator, port=0, **options).start()
+    return make
+
+def test_validate_reuses_warm_validator_and_cache(tmp_path, make_server):
+    fake = FakeLLM()
+    server = make_server(fake, read_root=str(tmp_path))
+    try:
+        disk = tmp_path / "disk.txt"
+        disk.write_text(PROMPT, encoding="utf-8")
+        first = request_validation(server.url, [{"path": "a.txt", "content": PROMPT}])
+        assert [issue["type"] for issue in first["a.txt"]] == ["PII_CHECK"]
+        assert fake.calls == 2 # One query per semantic rule.
+
+        results = request_validation(server.url, [{"path": str(disk)}, {"path": "b.txt", "content": PROMPT}])
+        assert results[str(disk)] == results["b.txt"] == first["a.txt"] # Files without content are read by the server.
+        assert fake.calls == 2 # Verdicts came from the in-memory cache kept between requests.
+        with urllib.request.urlopen(server.url + "/health") as response:
+            health = json.loads(response.read())
+        assert health["files"] == 3 and health["cache"]["hits"] == 4
+    finally:
+        server.shutdown()
+
+def test_full_queue_is_rejected_with_retry_after(make_server):
+    fake = FakeLLM(latency=0.3)
+    server = make_server(fake, queue_size=1, concurrency=1)
+    try:
+        files = [{"path": f"{i}.txt", "content": f"Prompt {i}."} for i in range(2)] # Larger than the queue, but it is empty.
+        first = threading.Thread(target=request_validation, args=(server.url, files))
+        first.start()
+        while server._queue is None or server._queue.qsize() == 0: # One file validating, one waiting.
+            time.sleep(0.01)
+        request = urllib.request.Request(server.url + "/validate", headers={"Content-Type": "application/json"},
+                                         data=json.dumps({"files": [{"path": "c.txt", "content": "C."}]}).encode())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 503 and error.value.headers["Retry-After"] == "1"
+        first.join()
+        assert server.rejected == 1 and server.files == 2
+    finally:
+        server.shutdown()
+
+def test_bad_request_and_unreachable_server(make_server):
+    server = make_server(FakeLLM())
+    try:
+        request = urllib.request.Request(server.url + "/validate", data=b'{"files": [{"content": "x"}]}')
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+    with pytest.raises(ServerUnavailable): # Nothing listens on the port any more.
+        request_validation(server.url, [{"path": "a.txt", "content": "x"}])
+
+def test_disk_reads_stay_inside_read_root(tmp_path, make_server):
+    inside, outside = tmp_path / "root", tmp_path / "secret.txt"
+    inside.mkdir()
+    (inside / "a.txt").write_text("Mail a@b.com\n", encoding="utf-8")
+    outside.write_text("Mail c@d.com\n", encoding="utf-8")
+    for read_root in (None, str(inside)):
+        server = make_server(FakeLLM(), read_root=read_root)
+        try:
+            escape = str(inside / ".." / "secret.txt")
+            results = request_validation(server.url, [{"path": str(inside / "a.txt")}, {"path": escape}])
+            assert [issue["type"] for issue in results[escape]] == ["FILE_ERROR"]
+            found = {issue["type"] for issue in results[str(inside / "a.txt")]}
+            assert found == ({"FILE_ERROR"} if read_root is None else {"COMPLETENESS_CHECK", "PII_CHECK"}) # No root, no disk reads.
+        finally:
+            server.shutdown()
+
+def test_remote_hosts_need_allow_remote(make_validator):
+    with pytest.raises(ValueError):
+        ValidationServer(make_validator(FakeLLM()), host="0.0.0.0", port=0)
+    server = ValidationServer(make_validator(FakeLLM()), host="0.0.0.0", port=0, allow_remote=True)
+    server.httpd.server_close()
+
+def test_read_timeout_is_an_error_not_a_missing_server():
+    with socket.socket() as silent: # Accepts connections but never answers.
+        silent.bind(("127.0.0.1", 0))
+        silent.listen()
+        with pytest.raises(RuntimeError, match="did not answer"): # It took the request, so no local fallback.
+            request_validation("http://127.0.0.1:%d" % silent.getsockname()[1], [{"path": "a.txt", "content": "x"}], timeout=0.2)
@@ -0,0 +1,105 @@
+# File: tests/test_similarity.py
+import random # Import random to build a long prompt.
+import asyncio # Import asyncio to drive the async pre-filter.
+import threading # Import threading to see where the pre-filter runs.
+from prompt_validator import similarity # Import the local near-duplicate detector.
+from prompt_validator.llm_client import LLMClient # Import the LLM client.
+from prompt_validator.rules.semantic import RedundancyRule # Import the redundancy rule.
+from benchmarks.corpus import generate_prompt # Import the synthetic prompt generator.
+from .fake_llm import FakeLLM # Import the fake LLM stub.
+
+REDUNDANT = (
+    "## Task:\nWrite a detailed guide about planting tomatoes.\n"
+    "Keep the tone friendly for beginners.\n"
+    "Ensure the guide is extremely detailed with many details.\n"
+)
+CLEAN = "## Task:\nWrite an email to the customer.\nInclude the order number and delivery date.\n"
+
+def test_only_near_duplicate_sentences_are_candidates():
+    assert similarity.redundancy_candidates(REDUNDANT, 0.3) == [
+        "Write a detailed guide about planting tomatoes.",
+        "Ensure the guide is extremely detailed with many details.",
+    ]
+    assert similarity.redundancy_candidates(CLEAN, 0.3) == []
+
+def test_long_prompts_use_lsh_and_still_find_duplicates():
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abcdefghijklmnop") for _ in range(7)) for _ in range(5000)]
+    sentences = [" ".join(rng.choice(words) for _ in range(10)) + "." for _ in range(600)]
+    sentences.append(sentences[42].replace(".", " please."))
+    assert len(sentences) > similarity.LSH_MIN_SENTENCES
+    assert similarity.near_duplicates(sentences, 0.3) == {42, 600}
+
+def test_prefilter_skips_clean_prompts_and_narrows_the_rest():
+    sent = [] # User messages that reached the LLM.
+    fake = FakeLLM(responder=lambda system, user: sent.append(user) or "None", is_async=False)
+    rule = RedundancyRule(llm_client=LLMClient(client=fake), similarity_threshold=0.3)
+    assert rule.validate(CLEAN) == []
+    assert rule.validate(REDUNDANT) == []
+    assert fake.calls == 1 and rule.llm_calls_avoided == 1
+    assert sent == ["# Similar sentences 1\nWrite a detailed guide about planting tomatoes.\n"
+                    "Ensure the guide is extremely detailed with many details."]
+
+def test_each_group_of_duplicates_is_sent_in_one_chunk():
+    topics = ["tomatoes garden", "invoices customers", "rockets orbit", "violins orchestra", "glaciers climate",
+              "bakery bread", "routers network", "museums painting", "chess openings", "volcanoes lava"]
+    first = [f"Write notes about {topic} today." for topic in topics]
+    second = [f"Always write notes about {topic} later." for topic in topics]
+    content = "## Task:\n" + "\n".join(first + second) + "\n" # Each sentence's duplicate is ten sentences away.
+    assert similarity.redundancy_clusters(content, 0.3) == [[a, b] for a, b in zip(first, second)]
+    sent = [] # User messages that reached the LLM.
+    fake = FakeLLM(responder=lambda system, user: sent.append(user) or "None", is_async=False)
+    rule = RedundancyRule(llm_client=LLMClient(client=fake), similarity_threshold=0.3, max_chunk_tokens=40)
+    assert rule.validate(content) == []
+    assert len(sent) > 1 # The candidates did not fit one request.
+    for a, b in zip(first, second):
+        assert [chunk for chunk in sent if a in chunk] == [chunk for chunk in sent if b in chunk] # Always shown together.
+
+def test_short_instructions_are_candidates():
+    assert similarity.redundancy_candidates("Be detailed. Be very detailed.", 0.3) == ["Be detailed.", "Be very detailed."]
+    assert similarity.redundancy_candidates("Be concise. Be brief.", 0.3) == ["Be concise.", "Be brief."] # Synonyms share no terms.
+    assert similarity.redundancy_candidates("## Task:\n## Success Criteria:\n- ok\nBe concise.\n", 0.3) == [] # Headers and markers never pair.
+    assert similarity.redundancy_candidates("Summarize the article. Cite sources.", 0.3) == [] # Short, but unrelated.
+
+def test_sentences_do_not_split_inside_emails_urls_or_numbers():
+    content = "Email john.smith@example.com explaining the delay. See https://example.com/faq.html for version 2.5 details."
+    assert [text for _, _, text in similarity.split_sentences(content)] == [
+        "Email john.smith@example.com explaining the delay.", "See https://example.com/faq.html for version 2.5 details."]
+
+def exhaustive(sentences, threshold): # Every sentence with a partner, comparing all pairs.
+    unit_vectors = similarity.vectors(sentences)
+    return {index for index in range(len(sentences)) for other in range(len(sentences))
+            if index != other and similarity.cosine(unit_vectors[index], unit_vectors[other]) >= threshold}
+
+def test_planted_duplicates_are_all_recalled():
+    for size in (4000, 40000): # Shared stems, then MinHash LSH.
+        content = generate_prompt(random.Random(size), size, pii_per_kb=0, duplicate_rate=0.05)
+        sentences = [text for _, _, text in similarity.split_sentences(content)]
+        found = similarity.near_duplicates(sentences, 0.3)
+        planted = [index for index, text in enumerate(sentences) if text.endswith(" again.")]
+        originals = [sentences.index(sentences[index][:-len(" again.")] + ".") for index in planted]
+        assert planted and set(planted + originals) <= found
+        assert found <= exhaustive(sentences, 0.3) # Nothing below the threshold is reported.
+
+def test_common_stems_and_comparison_cap_keep_the_best_candidate():
+    rng = random.Random(1)
+    filler = lambda: " ".join("".join(rng.choice("bcdfghjklm") for _ in range(8)) for _ in range(6))
+    common = [f"Answer the customer {filler()}." for _ in range(60)] # 'customer' is too common to pair on.
+    pair = ["Answer the customer about refunds within fourteen days.", "Refunds within fourteen days for the customer."]
+    assert similarity.near_duplicates(common + pair, 0.3) == {60, 61}
+
+    terms = [filler().split()[0] for _ in range(2 * similarity.MAX_COMPARISONS)]
+    sentence = " ".join(terms) + "." # Shares one stem with each of many unrelated sentences.
+    others = [f"{term} {filler()}." for term in terms]
+    duplicate = " ".join(terms[:-2]) + " please."
+    assert similarity.near_duplicates([sentence] + others + [duplicate], 0.3) == {0, len(terms) + 1}
+
+def test_prefilter_runs_off_the_event_loop_and_skips_huge_prompts():
+    rule = RedundancyRule(llm_client=LLMClient(client=FakeLLM(is_async=False)), similarity_threshold=0.3)
+    threads = [] # Threads the pre-filter ran on.
+    prepare = rule.prepare_content
+    rule.prepare_content = lambda content: threads.append(threading.get_ident()) or prepare(content)
+    assert asyncio.run(rule.text_for_llm_async(CLEAN)) is None and rule.llm_calls_avoided == 1
+    assert threads and threads[0] != threading.get_ident()
+    huge = CLEAN * (rule.PREFILTER_MAX_CHARS // len(CLEAN) + 1)
+    assert rule.prepare_content(huge) == huge # Sent whole rather than stalling on the pre-filter.